@@ -52,10 +52,12 @@ MONTH_MAP = {
 class FreshThymeAdapter(BaseAdapter):
     retailer_key = "freshthyme"
     display_name = "FreshThyme"
+    source_folder = "FreshThyme"
+    source_patterns = ("FreshThyme/FreshThyme_*.xlsx",)
 
     # ── extract ─────────────────────────────────────────────────────────
     def extract(self):
-        ft_dir = os.path.join(self.source_dir, "FreshThyme")
+        ft_dir = os.path.join(self.source_dir, self.source_folder)
         if not os.path.isdir(ft_dir):
             raise FileNotFoundError(f"FreshThyme directory not found: {ft_dir}")
 
@@ -78,6 +80,7 @@ class FreshThymeAdapter(BaseAdapter):
             raise FileNotFoundError(f"No FreshThyme_*.xlsx files found in {ft_dir}")
 
         file_entries.sort()
+        self.source_files = [fpath for _, fpath in file_entries]
         self.raw_data = {"file_entries": file_entries}
         print(f"  [FreshThyme] Found {len(file_entries)} monthly files")
 
@@ -86,95 +89,20 @@ class FreshThymeAdapter(BaseAdapter):
         products_map = {}
         periods = {}
 
-        for ym, fpath in self.raw_data["file_entries"]:
-            try:
-                df = pd.read_excel(fpath)
-            except Exception as e:
-                print(f"  [FreshThyme] WARNING: Could not read {fpath}: {e}")
+        file_entries = self.raw_data["file_entries"]
+        reports = self._map_files(
+            (fpath, "report", self._read_report, (fpath, ym), [ym])
+            for ym, fpath in file_entries
+        )
+        for (ym, _), report in zip(file_entries, reports):
+            if report is None:
                 continue
 
-            print(f"  [FreshThyme] Processing {os.path.basename(fpath)}: "
-                  f"{len(df)} rows -> {ym}")
-
-            # Skip Grand Total row (row 0 where Unnamed: 0 == "Grand Total")
-            first_col = df.columns[0]
-            df = df[df[first_col] != "Grand Total"].copy()
-
-            # Parse UPC from "Unnamed: 1" — format "NNNNNNNNNNN PRODUCT NAME"
-            upc_name_col = "Unnamed: 1"
-            if upc_name_col not in df.columns:
-                # Fallback: try second column
-                upc_name_col = df.columns[1]
-
-            df["upc_raw"] = df[upc_name_col].astype(str).apply(self._extract_upc)
-            df["product_short_name"] = df[upc_name_col].astype(str).apply(
-                self._extract_name
-            )
-            df = df[df["upc_raw"] != ""].copy()
-            df["upc_clean"] = df["upc_raw"].apply(self.normalize_upc)
-
-            # Map known column names (some have trailing spaces)
-            col_map = {}
-            for c in df.columns:
-                cs = str(c).strip().lower()
-                if cs == "sales ty":
-                    col_map["dollars"] = c
-                elif cs.startswith("sales vs ly"):
-                    col_map["dollars_yoy_pct"] = c
-                elif cs == "volume ty":
-                    col_map["units"] = c
-                elif cs.startswith("volume vs ly"):
-                    col_map["units_yoy_pct"] = c
-                elif cs == "my sales ly":
-                    col_map["dollars_yago"] = c
-                elif cs == "my volume ly":
-                    col_map["units_yago"] = c
-                elif cs == "acv":
-                    col_map["acv"] = c
-                elif cs == "stores selling ty":
-                    col_map["store_count"] = c
-
-            # Numeric conversion
-            for key in ["dollars", "units", "dollars_yago", "units_yago",
-                        "dollars_yoy_pct", "units_yoy_pct", "acv", "store_count"]:
-                if key in col_map:
-                    df[key] = pd.to_numeric(df[col_map[key]], errors="coerce").fillna(0)
-                else:
-                    df[key] = 0
-
-            # Category columns
-            cat_col = "Unnamed: 2" if "Unnamed: 2" in df.columns else df.columns[2]
-            subcat_col = "Unnamed: 3" if "Unnamed: 3" in df.columns else df.columns[3]
-            brand_col = "Unnamed: 5" if "Unnamed: 5" in df.columns else df.columns[5]
-
-            period_data = {}
-            for _, row in df.iterrows():
-                upc = row["upc_clean"]
-                if upc == "0000000000000":
-                    continue
-
-                # Product info — update with latest data
-                brand_val = str(row.get(brand_col, "")).strip()
-                cat_val = str(row.get(cat_col, "")).strip()
-                subcat_val = str(row.get(subcat_col, "")).strip()
-                desc = row.get("product_short_name", "")
-
-                # Build full description from col 0 if available
-                full_desc = str(row.get(df.columns[0], "")).strip()
-                if full_desc == "nan" or not full_desc:
-                    full_desc = desc
-
-                acv_val = round(float(row.get("acv", 0)), 4)
-                store_count_val = int(row.get("store_count", 0))
-
+            # Replay rows in file order: first occurrence sets the product,
+            # later non-zero ACV / store counts overwrite earlier ones
+            for upc, info, acv_val, store_count_val in report["rows"]:
                 if upc not in products_map:
-                    products_map[upc] = {
-                        "upc": upc,
-                        "product_name": full_desc,
-                        "brand": brand_val if brand_val != "nan" else "",
-                        "category": cat_val if cat_val != "nan" else "",
-                        "subcategory": subcat_val if subcat_val != "nan" else "",
-                    }
+                    products_map[upc] = info
 
                 # Add ACV and store count if available (for distribution_acv feature)
                 if acv_val:
@@ -182,26 +110,8 @@ class FreshThymeAdapter(BaseAdapter):
                 if store_count_val:
                     products_map[upc]["store_count"] = store_count_val
 
-                dollars = round(float(row.get("dollars", 0)), 2)
-                units = round(float(row.get("units", 0)), 2)
-                dollars_yago = round(float(row.get("dollars_yago", 0)), 2)
-                units_yago = round(float(row.get("units_yago", 0)), 2)
-
-                # Compute YoY pct
-                dollars_yoy_pct = round(float(row.get("dollars_yoy_pct", 0)) * 100, 2)
-                units_yoy_pct = round(float(row.get("units_yoy_pct", 0)) * 100, 2)
-
-                period_data[upc] = {
-                    "dollars": dollars,
-                    "units": units,
-                    "dollars_yago": dollars_yago,
-                    "units_yago": units_yago,
-                    "dollars_yoy_pct": dollars_yoy_pct,
-                    "units_yoy_pct": units_yoy_pct,
-                }
-
-            if period_data:
-                periods[ym] = period_data
+            if report["period_data"]:
+                periods[ym] = report["period_data"]
 
         self.pos_data = {
             "retailer": "FreshThyme",
@@ -211,6 +121,106 @@ class FreshThymeAdapter(BaseAdapter):
             "periods": periods,
         }
 
+    # ── report reader ───────────────────────────────────────────────────
+    def _read_report(self, fpath, ym):
+        """Parse one monthly report into per-row product info and period data."""
+        try:
+            df = self._read_excel(fpath)
+        except Exception as e:
+            print(f"  [FreshThyme] WARNING: Could not read {fpath}: {e}")
+            return None
+
+        print(f"  [FreshThyme] Processing {os.path.basename(fpath)}: "
+              f"{len(df)} rows -> {ym}")
+
+        # Skip Grand Total row (row 0 where Unnamed: 0 == "Grand Total")
+        first_col = df.columns[0]
+        df = self.keep_rows(df, df[first_col] != "Grand Total", "total row")
+
+        # Parse UPC from "Unnamed: 1" — format "NNNNNNNNNNN PRODUCT NAME"
+        upc_name_col = "Unnamed: 1"
+        if upc_name_col not in df.columns:
+            # Fallback: try second column
+            upc_name_col = df.columns[1]
+
+        df["upc_raw"] = df[upc_name_col].astype(str).apply(self._extract_upc)
+        df["product_short_name"] = df[upc_name_col].astype(str).apply(
+            self._extract_name
+        )
+        df = self.keep_rows(df, df["upc_raw"] != "", "no UPC")
+        df["upc_clean"] = self.normalize_upc_series(df["upc_raw"])
+
+        # Map known column names (some have trailing spaces)
+        col_map = {}
+        for c in df.columns:
+            cs = str(c).strip().lower()
+            if cs == "sales ty":
+                col_map["dollars"] = c
+            elif cs.startswith("sales vs ly"):
+                col_map["dollars_yoy_pct"] = c
+            elif cs == "volume ty":
+                col_map["units"] = c
+            elif cs.startswith("volume vs ly"):
+                col_map["units_yoy_pct"] = c
+            elif cs == "my sales ly":
+                col_map["dollars_yago"] = c
+            elif cs == "my volume ly":
+                col_map["units_yago"] = c
+            elif cs == "acv":
+                col_map["acv"] = c
+            elif cs == "stores selling ty":
+                col_map["store_count"] = c
+
+        # Numeric conversion
+        for key in ["dollars", "units", "dollars_yago", "units_yago",
+                    "dollars_yoy_pct", "units_yoy_pct", "acv", "store_count"]:
+            if key in col_map:
+                df[key] = pd.to_numeric(df[col_map[key]], errors="coerce").fillna(0)
+            else:
+                df[key] = 0
+
+        # Category columns
+        cat_col = "Unnamed: 2" if "Unnamed: 2" in df.columns else df.columns[2]
+        subcat_col = "Unnamed: 3" if "Unnamed: 3" in df.columns else df.columns[3]
+        brand_col = "Unnamed: 5" if "Unnamed: 5" in df.columns else df.columns[5]
+
+        df = self.keep_rows(df, df["upc_clean"] != "0000000000000", "no UPC")
+
+        # Product info — update with latest data
+        def clean(values):
+            return values.where(values != "nan", "")
+
+        # Build full description from col 0 if available
+        full_desc = self.text_column(df, df.columns[0])
+        short_name = df["product_short_name"].astype(object)
+        full_desc = full_desc.where((full_desc != "nan") & (full_desc != ""), short_name)
+
+        infos = self.build_records({
+            "upc": df["upc_clean"],
+            "product_name": full_desc,
+            "brand": clean(self.text_column(df, brand_col)),
+            "category": clean(self.text_column(df, cat_col)),
+            "subcategory": clean(self.text_column(df, subcat_col)),
+        })
+        acv_vals = self.round_values(df["acv"], 4)
+        store_counts = df["store_count"].astype(float).astype(int).tolist()
+        rows = [
+            [info["upc"], info, acv_val, store_count_val]
+            for info, acv_val, store_count_val in zip(infos, acv_vals, store_counts)
+        ]
+
+        # YoY pct columns are fractions in the source
+        period_data = self.build_periods([ym] * len(df), df["upc_clean"], {
+            "dollars": self.round_values(df["dollars"]),
+            "units": self.round_values(df["units"]),
+            "dollars_yago": self.round_values(df["dollars_yago"]),
+            "units_yago": self.round_values(df["units_yago"]),
+            "dollars_yoy_pct": self.round_values(df["dollars_yoy_pct"].astype(float) * 100),
+            "units_yoy_pct": self.round_values(df["units_yoy_pct"].astype(float) * 100),
+        }).get(ym, {})
+
+        return {"rows": rows, "period_data": period_data}
+
     # ── helpers ─────────────────────────────────────────────────────────
     @staticmethod
     def _extract_upc(val):
@@ -19,6 +19,7 @@ import os
 import re
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 from etl.base_adapter import BaseAdapter
@@ -27,6 +28,14 @@ from etl.base_adapter import BaseAdapter
 class IHerbAdapter(BaseAdapter):
     retailer_key = "iherb"
     display_name = "iHerb"
+    source_folder = "iHerb"
+    source_patterns = ("iHerb/*/*_IRW.csv",)
+
+    @staticmethod
+    def _category_mapping_path():
+        return os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), "category_mapping.json"
+        )
 
     def _load_category_mapping(self):
         """Load the IN brand category mapping from etl/category_mapping.json.
@@ -34,9 +43,7 @@ class IHerbAdapter(BaseAdapter):
         The mapping is built from the Irwin Naturals Promotional Calendar
         and maps UPCs and iHerb SKUs (Part Numbers) to official IN categories.
         """
-        mapping_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), "category_mapping.json"
-        )
+        mapping_path = self._category_mapping_path()
         if os.path.exists(mapping_path):
             with open(mapping_path, "r") as f:
                 data = json.load(f)
@@ -45,9 +52,14 @@ class IHerbAdapter(BaseAdapter):
         print("  [iHerb] WARNING: category_mapping.json not found, categories will be empty")
         return {"by_upc": {}, "by_sku": {}}
 
+    @staticmethod
+    def _unit_periods(parsed):
+        """Periods a parsed CSV contributes units to."""
+        return sorted({ym for _, ym, _ in parsed["units"]})
+
     # ── extract ─────────────────────────────────────────────────────────
     def extract(self):
-        iherb_dir = os.path.join(self.source_dir, "iHerb")
+        iherb_dir = os.path.join(self.source_dir, self.source_folder)
         csv_files = []
 
         for year_dir in ["2024", "2025"]:
@@ -64,14 +76,11 @@ class IHerbAdapter(BaseAdapter):
         # Sort by filename so newest comes last
         csv_files.sort()
 
-        self.raw_data = {"csv_files": csv_files, "frames": []}
-        for fpath in csv_files:
-            try:
-                df = pd.read_csv(fpath)
-                self.raw_data["frames"].append((fpath, df))
-                print(f"  [iHerb] Loaded {os.path.basename(fpath)}: {len(df)} rows")
-            except Exception as e:
-                print(f"  [iHerb] WARNING: Could not read {fpath}: {e}")
+        self.source_files = list(csv_files)
+        mapping_path = self._category_mapping_path()
+        if os.path.exists(mapping_path):
+            self.source_files.append(mapping_path)
+        self.raw_data = {"csv_files": csv_files}
 
     # ── transform ───────────────────────────────────────────────────────
     def transform(self):
@@ -84,95 +93,31 @@ class IHerbAdapter(BaseAdapter):
         ltoos_records = []     # for ltoos_history.json
         inventory_records = [] # for inventory.json
 
-        # Metadata columns (non-month columns)
-        meta_cols = {
-            "Part Number", "UPCCode", "Vendor_Code", "Vendor Name",
-            "Brand Code", "Brand Name", "Product Description",
-            "Status Name", "LTOOS", "Days on LTOOS", "Quantity Available",
-        }
-
-        for fpath, df in self.raw_data["frames"]:
-            df = df.copy()
-
-            # Parse the file date from filename: e.g. 202501_IRW.csv -> 2025-01
-            basename = os.path.basename(fpath)
-            file_match = re.match(r"(\d{4})(\d{2})_IRW\.csv", basename)
-            file_year_month = None
-            if file_match:
-                file_year_month = f"{file_match.group(1)}-{file_match.group(2)}"
-
-            # Normalize UPC
-            df["upc_clean"] = (
-                df["UPCCode"]
-                .astype(str)
-                .str.strip()
-                .str.replace(r"\.0$", "", regex=True)
-                .apply(self.normalize_upc)
-            )
-
-            # Identify monthly columns (format YYYY-MM)
-            month_cols = [
-                c for c in df.columns
-                if re.match(r"^\d{4}-\d{2}$", str(c).strip())
-            ]
-
-            # Build products from this file
-            for _, row in df.iterrows():
-                upc = row["upc_clean"]
-                if upc == "0000000000000":
-                    continue
+        csv_files = self.raw_data["csv_files"]
+        # LTOOS and inventory come from the LATEST file only
+        latest_flags = [fpath == csv_files[-1] for fpath in csv_files]
+        parsed_files = self._map_files(
+            (fpath, "latest" if is_latest else "units", self._read_csv_file,
+             (fpath, is_latest), self._unit_periods)
+            for fpath, is_latest in zip(csv_files, latest_flags)
+        )
+        for is_latest, parsed in zip(latest_flags, parsed_files):
+            if parsed is None:
+                continue
 
+            for upc, part_num, info in parsed["products"]:
                 if upc not in products_map:
                     # Look up category: try UPC first, then iHerb Part Number (SKU)
-                    part_num = str(row.get("Part Number", "")).strip()
-                    category = upc_cats.get(upc) or sku_cats.get(part_num, "")
-                    products_map[upc] = {
-                        "upc": upc,
-                        "product_name": str(row.get("Product Description", "")).strip(),
-                        "brand": str(row.get("Brand Name", "")).strip(),
-                        "category": category,
-                        "subcategory": "",
-                    }
-
-                # Extract monthly units
-                for mc in month_cols:
-                    val = pd.to_numeric(row.get(mc), errors="coerce")
-                    if pd.notna(val):
-                        key = (upc, str(mc).strip())
-                        # Later files overwrite earlier ones (more accurate)
-                        units_timeline[key] = int(val)
-
-            # LTOOS and inventory from the LATEST file only
-            if fpath == self.raw_data["csv_files"][-1]:
-                for _, row in df.iterrows():
-                    upc = row["upc_clean"]
-                    if upc == "0000000000000":
-                        continue
-
-                    # LTOOS
-                    ltoos_flag = str(row.get("LTOOS", "")).strip()
-                    days_ltoos = pd.to_numeric(row.get("Days on LTOOS"), errors="coerce")
-                    if ltoos_flag.lower() == "yes":
-                        ltoos_records.append({
-                            "upc": upc,
-                            "product_name": str(row.get("Product Description", "")).strip(),
-                            "ltoos": True,
-                            "days_on_ltoos": int(days_ltoos) if pd.notna(days_ltoos) else 0,
-                            "as_of": file_year_month or datetime.now().strftime("%Y-%m"),
-                        })
-
-                    # Inventory
-                    qty = pd.to_numeric(row.get("Quantity Available"), errors="coerce")
-                    status = str(row.get("Status Name", "")).strip()
-                    inventory_records.append({
-                        "upc": upc,
-                        "product_name": str(row.get("Product Description", "")).strip(),
-                        "quantity_available": int(qty) if pd.notna(qty) else 0,
-                        "status": status if status != "nan" else "",
-                        "ltoos": ltoos_flag.lower() == "yes",
-                        "days_on_ltoos": int(days_ltoos) if pd.notna(days_ltoos) else 0,
-                        "as_of": file_year_month or datetime.now().strftime("%Y-%m"),
-                    })
+                    info["category"] = upc_cats.get(upc) or sku_cats.get(part_num, "")
+                    products_map[upc] = info
+
+            for upc, ym, units in parsed["units"]:
+                # Later files overwrite earlier ones (more accurate)
+                units_timeline[(upc, ym)] = units
+
+            if is_latest:
+                ltoos_records.extend(parsed["ltoos"])
+                inventory_records.extend(parsed["inventory"])
 
         # --- Build periods ---
         periods = {}
@@ -189,24 +134,7 @@ class IHerbAdapter(BaseAdapter):
             }
 
         # Compute YoY for units where possible (month - 12 months)
-        all_months = sorted(periods.keys())
-        for ym in all_months:
-            # Derive YAGO month
-            try:
-                dt = datetime.strptime(ym, "%Y-%m")
-                yago_dt = dt.replace(year=dt.year - 1)
-                yago_ym = yago_dt.strftime("%Y-%m")
-            except Exception:
-                continue
-
-            if yago_ym in periods:
-                for upc, metrics in periods[ym].items():
-                    yago_units = periods[yago_ym].get(upc, {}).get("units", 0)
-                    metrics["units_yago"] = yago_units
-                    if yago_units:
-                        metrics["units_yoy_pct"] = round(
-                            (metrics["units"] - yago_units) / yago_units * 100, 2
-                        )
+        self.fill_yoy(periods, ("units",), ndigits=None)
 
         self.pos_data = {
             "retailer": "iHerb",
@@ -230,3 +158,110 @@ class IHerbAdapter(BaseAdapter):
                 "last_updated": datetime.now().strftime("%Y-%m-%d"),
                 "records": inventory_records,
             }
+
+    # ── file reader ─────────────────────────────────────────────────────
+    def _read_csv_file(self, fpath, is_latest):
+        """Parse one *_IRW.csv into products and (upc, month, units) rows.
+
+        For the latest file the LTOOS and inventory records are included too.
+        """
+        try:
+            df = self._read_csv(fpath)
+            print(f"  [iHerb] Loaded {os.path.basename(fpath)}: {len(df)} rows")
+        except Exception as e:
+            print(f"  [iHerb] WARNING: Could not read {fpath}: {e}")
+            return None
+
+        # Metadata columns (non-month columns)
+        meta_cols = {
+            "Part Number", "UPCCode", "Vendor_Code", "Vendor Name",
+            "Brand Code", "Brand Name", "Product Description",
+            "Status Name", "LTOOS", "Days on LTOOS", "Quantity Available",
+        }
+
+        # Parse the file date from filename: e.g. 202501_IRW.csv -> 2025-01
+        basename = os.path.basename(fpath)
+        file_match = re.match(r"(\d{4})(\d{2})_IRW\.csv", basename)
+        file_year_month = None
+        if file_match:
+            file_year_month = f"{file_match.group(1)}-{file_match.group(2)}"
+
+        # Normalize UPC
+        df["upc_clean"] = self.normalize_upc_series(df["UPCCode"], strip_float_suffix=True)
+
+        # Identify monthly columns (format YYYY-MM)
+        month_cols = [
+            c for c in df.columns
+            if re.match(r"^\d{4}-\d{2}$", str(c).strip())
+        ]
+
+        df = self.keep_rows(df, df["upc_clean"] != "0000000000000", "no UPC")
+        upcs = df["upc_clean"].tolist()
+
+        # Products: first occurrence per UPC in this file
+        first = df.drop_duplicates(subset=["upc_clean"])
+        products = [
+            [rec["upc"], part_num, rec]
+            for part_num, rec in zip(
+                self.text_column(first, "Part Number").tolist(),
+                self.build_records({
+                    "upc": first["upc_clean"],
+                    "product_name": self.text_column(first, "Product Description"),
+                    "brand": self.text_column(first, "Brand Name"),
+                    "category": "",
+                    "subcategory": "",
+                }),
+            )
+        ]
+
+        # Monthly units, row-major (row by row, month columns in order)
+        units = []
+        if month_cols and upcs:
+            values = np.column_stack([
+                pd.to_numeric(df[mc], errors="coerce").to_numpy(dtype=float)
+                for mc in month_cols
+            ])
+            months = [str(mc).strip() for mc in month_cols]
+            rows, cols = np.nonzero(~np.isnan(values))
+            units = [
+                [upcs[r], months[c], int(v)]
+                for r, c, v in zip(rows.tolist(), cols.tolist(), values[rows, cols].tolist())
+            ]
+
+        parsed = {"products": products, "units": units}
+        if not is_latest:
+            return parsed
+
+        as_of = file_year_month or datetime.now().strftime("%Y-%m")
+        product_names = self.text_column(df, "Product Description")
+        ltoos_flags = (self.text_column(df, "LTOOS").str.lower() == "yes").tolist()
+        days_ltoos = self.numeric_column(df, "Days on LTOOS")
+        days_ltoos = [int(v) if v == v else 0 for v in days_ltoos.tolist()]
+        qty = self.numeric_column(df, "Quantity Available")
+        statuses = self.text_column(df, "Status Name")
+
+        # LTOOS
+        ltoos_records = [
+            rec for rec, flag in zip(self.build_records({
+                "upc": upcs,
+                "product_name": product_names,
+                "ltoos": True,
+                "days_on_ltoos": days_ltoos,
+                "as_of": as_of,
+            }), ltoos_flags) if flag
+        ]
+
+        # Inventory
+        inventory_records = self.build_records({
+            "upc": upcs,
+            "product_name": product_names,
+            "quantity_available": [int(v) if v == v else 0 for v in qty.tolist()],
+            "status": statuses.where(statuses != "nan", ""),
+            "ltoos": ltoos_flags,
+            "days_on_ltoos": days_ltoos,
+            "as_of": as_of,
+        })
+
+        parsed["ltoos"] = ltoos_records
+        parsed["inventory"] = inventory_records
+        return parsed
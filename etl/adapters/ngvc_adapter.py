@@ -14,32 +14,59 @@ from datetime import datetime
 import pandas as pd
 
 from etl.base_adapter import BaseAdapter
+from etl.period_rollup import PERIOD_KEYS, PeriodRollup, merge_periods
+
+# Schema metric -> SPINS column summed into it
+SUM_COLUMNS = {
+    "dollars": "Dollars",
+    "units": "Units",
+    "dollars_yago": "Dollars, Yago",
+    "units_yago": "Units, Yago",
+}
+
+# SPINS columns the transform reads (all that lean mode keeps) and the
+# repeated text among them
+SPINS_COLUMNS = ("UPC", "Time Period End Date", "Description", "Brand", "Category",
+                 "Subcategory", *SUM_COLUMNS.values())
+SPINS_TEXT_COLUMNS = ("UPC", "Description", "Brand", "Category", "Subcategory")
 
 
 class NGVCAdapter(BaseAdapter):
     retailer_key = "ngvc"
     display_name = "NGVC"
+    source_folder = "NGVC"
+    source_patterns = (
+        "NGVC/Irwin_Naturals_NGVC.xlsx",
+        "NGVC/P12 - Irwin_Naturals_Pull.xlsx",
+        "NGVC/Irwin Naturals Units*.xlsx",
+    )
 
     # ── extract ─────────────────────────────────────────────────────────
     def extract(self):
-        ngvc_dir = os.path.join(self.source_dir, "NGVC")
+        ngvc_dir = os.path.join(self.source_dir, self.source_folder)
         self.raw_data = {}
 
         # QUAD file
         quad_path = os.path.join(ngvc_dir, "Irwin_Naturals_NGVC.xlsx")
         if os.path.isfile(quad_path):
+            self.source_files.append(quad_path)
             try:
-                self.raw_data["quad"] = pd.read_excel(quad_path)
-                print(f"  [NGVC] Loaded QUAD file: {len(self.raw_data['quad'])} rows")
+                self.raw_data["quad"] = self._read_excel_batches(
+                    quad_path, SPINS_COLUMNS, SPINS_TEXT_COLUMNS)
+                print(f"  [NGVC] Loaded QUAD file: "
+                      f"{self.describe_batches(self.raw_data['quad'])}")
             except Exception as e:
                 print(f"  [NGVC] WARNING: Could not read QUAD file: {e}")
 
         # WEEK file
         week_path = os.path.join(ngvc_dir, "P12 - Irwin_Naturals_Pull.xlsx")
         if os.path.isfile(week_path):
+            self.source_files.append(week_path)
             try:
-                self.raw_data["week"] = pd.read_excel(week_path)
-                print(f"  [NGVC] Loaded WEEK file: {len(self.raw_data['week'])} rows")
+                self.raw_data["week"] = self._read_excel_batches(
+                    week_path, SPINS_COLUMNS, SPINS_TEXT_COLUMNS)
+                print(f"  [NGVC] Loaded WEEK file: "
+                      f"{self.describe_batches(self.raw_data['week'])}")
             except Exception as e:
                 print(f"  [NGVC] WARNING: Could not read WEEK file: {e}")
 
@@ -50,8 +77,9 @@ class NGVCAdapter(BaseAdapter):
         ] if os.path.isdir(ngvc_dir) else []
         if units_files:
             units_path = os.path.join(ngvc_dir, sorted(units_files)[-1])  # latest
+            self.source_files.append(units_path)
             try:
-                self.raw_data["units"] = pd.read_excel(units_path)
+                self.raw_data["units"] = self._read_excel(units_path)
                 print(f"  [NGVC] Loaded units file: {units_path}")
             except Exception as e:
                 print(f"  [NGVC] WARNING: Could not read units file: {e}")
@@ -65,19 +93,24 @@ class NGVCAdapter(BaseAdapter):
     # ── transform ───────────────────────────────────────────────────────
     def transform(self):
         products_map = {}   # upc -> product dict
-        periods = {}        # YYYY-MM -> {upc -> metrics}
+        periods = {}        # pos_data key -> {period -> {upc -> metrics}}
 
         # --- Process QUAD data (primary) ---
         if "quad" in self.raw_data and self.raw_data["quad"] is not None:
             self._process_spins_data(self.raw_data["quad"], products_map, periods)
 
-        # --- Process WEEK data (fills gaps / adds granularity) ---
+        # --- Process WEEK data (fills gaps / adds granularity and the weekly view) ---
         if "week" in self.raw_data and self.raw_data["week"] is not None:
-            self._process_spins_data(self.raw_data["week"], products_map, periods)
+            self._process_spins_data(self.raw_data["week"], products_map, periods,
+                                     weekly=True)
 
         # --- Merge set_status + units data from units file ---
         if "units" in self.raw_data and self.raw_data["units"] is not None:
-            self._merge_set_status(products_map, periods)
+            self._merge_set_status(products_map, periods.setdefault("periods", {}))
+
+        # --- Quarters and years, summed from the final months (units file included) ---
+        if self.calendar_periods:
+            periods.update(self.calendar_grains(periods.get("periods", {})))
 
         # --- Build universal schema ---
         self.pos_data = {
@@ -85,109 +118,74 @@ class NGVCAdapter(BaseAdapter):
             "last_updated": datetime.now().strftime("%Y-%m-%d"),
             "time_grain": "monthly",
             "products": list(products_map.values()),
-            "periods": periods,
+            "periods": periods.get("periods", {}),
         }
-
-    def _process_spins_data(self, df, products_map, periods):
-        """Process a SPINS dataframe (QUAD or WEEK) into products_map and periods."""
-        df = df.copy()
+        for key in PERIOD_KEYS.values():
+            if key != "periods" and periods.get(key):
+                self.pos_data[key] = periods[key]
+
+    def _process_spins_data(self, batches, products_map, periods, weekly=False):
+        """Process a SPINS file (QUAD or WEEK) into products_map and periods.
+
+        ``batches`` is the file as one or more DataFrames (several when
+        streaming).  Rows are summed once per (UPC, period end date) and
+        rolled up to months (and weeks for the WEEK file); ``periods`` maps
+        pos_data keys ("periods", "weekly_periods") to their blocks.
+        Quarters and years are summed from the final months in transform().
+        """
+        rollup = PeriodRollup("upc_clean", "period_end", SUM_COLUMNS.values())
+        for df in batches:
+            df = self._prepare_spins(df)
+
+            # Build products from the raw data (take first occurrence per UPC)
+            self.build_products(df, "upc_clean", {
+                "product_name": "Description",
+                "brand": "Brand",
+                "category": "Category",
+                "subcategory": "Subcategory",
+            }, existing=products_map)
+
+            rollup.add(df)
+
+        grains = ("monthly", "weekly") if weekly else ("monthly",)
+        rolled_up = self.rollup_periods(rollup, grains, SUM_COLUMNS, calendar=False)
+        for key, new_periods in rolled_up.items():
+            # Accumulate where both files have a UPC (e.g. QUAD + WEEK overlap)
+            merge_periods(periods.setdefault(key, {}), new_periods, SUM_COLUMNS)
+
+    def _prepare_spins(self, df):
+        """Clean UPCs, derive the period end date and coerce metric columns of one batch."""
+        # Shallow: new columns never write into the source frame's arrays
+        df = self.lean_frame(df, SPINS_COLUMNS, SPINS_TEXT_COLUMNS).copy(deep=False)
 
         # Clean UPC
-        df["upc_clean"] = df["UPC"].astype(str).apply(self.normalize_upc)
+        df["upc_clean"] = self.normalize_upc_series(df["UPC"])
 
-        # Parse month from Time Period End Date
+        # Parse Time Period End Date
         df["Time Period End Date"] = pd.to_datetime(
             df["Time Period End Date"], errors="coerce"
         )
-        df = df.dropna(subset=["Time Period End Date"])
-        df["year_month"] = df["Time Period End Date"].dt.strftime("%Y-%m")
+        df = self.keep_rows(df, df["Time Period End Date"].notna(), "no period date")
+        df["period_end"] = df["Time Period End Date"].dt.strftime("%Y-%m-%d")
 
         # Numeric columns
         for col in ["Dollars", "Dollars, Yago", "Units", "Units, Yago",
                      "Dollars % Chg, Yago", "Units % Chg, Yago"]:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-        # Aggregate by (upc_clean, year_month): sum dollars/units
-        grouped = df.groupby(["upc_clean", "year_month"]).agg({
-            "Dollars": "sum",
-            "Dollars, Yago": "sum",
-            "Units": "sum",
-            "Units, Yago": "sum",
-        }).reset_index()
-
-        # Build products from the raw data (take first occurrence per UPC)
-        product_info = (
-            df.drop_duplicates(subset=["upc_clean"])
-            .set_index("upc_clean")[["Description", "Brand", "Category", "Subcategory"]]
-        )
-
-        for _, row in product_info.iterrows():
-            upc = row.name
-            if upc not in products_map:
-                products_map[upc] = {
-                    "upc": upc,
-                    "product_name": str(row.get("Description", "")).strip(),
-                    "brand": str(row.get("Brand", "")).strip(),
-                    "category": str(row.get("Category", "")).strip(),
-                    "subcategory": str(row.get("Subcategory", "")).strip(),
-                }
-
-        # Build periods
-        for _, row in grouped.iterrows():
-            upc = row["upc_clean"]
-            ym = row["year_month"]
-            dollars = round(float(row["Dollars"]), 2)
-            units = round(float(row["Units"]), 2)
-            dollars_yago = round(float(row["Dollars, Yago"]), 2)
-            units_yago = round(float(row["Units, Yago"]), 2)
-
-            dollars_yoy_pct = (
-                round((dollars - dollars_yago) / dollars_yago * 100, 2)
-                if dollars_yago else 0.0
-            )
-            units_yoy_pct = (
-                round((units - units_yago) / units_yago * 100, 2)
-                if units_yago else 0.0
-            )
-
-            if ym not in periods:
-                periods[ym] = {}
-
-            if upc in periods[ym]:
-                # Accumulate if already present (e.g. QUAD + WEEK overlap)
-                existing = periods[ym][upc]
-                existing["dollars"] = round(existing["dollars"] + dollars, 2)
-                existing["units"] = round(existing["units"] + units, 2)
-                existing["dollars_yago"] = round(existing["dollars_yago"] + dollars_yago, 2)
-                existing["units_yago"] = round(existing["units_yago"] + units_yago, 2)
-            else:
-                periods[ym][upc] = {
-                    "dollars": dollars,
-                    "units": units,
-                    "dollars_yago": dollars_yago,
-                    "units_yago": units_yago,
-                    "dollars_yoy_pct": dollars_yoy_pct,
-                    "units_yoy_pct": units_yoy_pct,
-                }
+                df[col] = self.numeric_column(df, col).fillna(0)
+        return df
 
     def _merge_set_status(self, products_map, periods):
         """Merge set_status and units data from the units file into products/periods."""
-        df = self.raw_data["units"].copy()
+        df = self.raw_data["units"].copy(deep=False)
 
         # The UPC column has leading/trailing spaces and is numeric
         upc_col = [c for c in df.columns if "UPC" in c.upper()][0]
-        df["upc_clean"] = (
-            df[upc_col]
-            .astype(str)
-            .str.strip()
-            .str.replace(r"\.0$", "", regex=True)
-            .apply(self.normalize_upc)
-        )
+        df["upc_clean"] = self.normalize_upc_series(df[upc_col], strip_float_suffix=True)
 
         # Drop NaN UPCs
-        df = df.dropna(subset=[upc_col])
-        df = df[df["upc_clean"] != "0000000000000"]
+        df = self.keep_rows(df, df[upc_col].notna(), "no UPC")
+        df = self.keep_rows(df, df["upc_clean"] != "0000000000000", "no UPC")
 
         # Detect units column and parse period from its name
         # e.g. "Units sold in January 2026" → "2026-01"
@@ -208,19 +206,21 @@ class NGVCAdapter(BaseAdapter):
                     print(f"  [NGVC] Found units column '{col}' → period {units_period}")
                     break
 
-        for _, row in df.iterrows():
-            upc = row["upc_clean"]
-            set_status = str(row.get("Set Status", "")).strip()
-            if not set_status or set_status == "nan":
-                set_status = None
+        set_statuses = [
+            None if not v or v == "nan" else v
+            for v in self.text_column(df, "Set Status").tolist()
+        ]
+        descs = self.text_column(df, "Description").tolist()
+        brands = self.text_column(df, "Brand Name").tolist()
 
+        for upc, set_status, desc, brand in zip(
+            df["upc_clean"].tolist(), set_statuses, descs, brands
+        ):
             if upc in products_map:
                 if set_status:
                     products_map[upc]["set_status"] = set_status
             else:
                 # Product exists in units file but not in SPINS data — add it
-                desc = str(row.get("Description", "")).strip()
-                brand = str(row.get("Brand Name", "")).strip()
                 products_map[upc] = {
                     "upc": upc,
                     "product_name": desc if desc != "nan" else "",
@@ -231,20 +231,22 @@ class NGVCAdapter(BaseAdapter):
                 if set_status:
                     products_map[upc]["set_status"] = set_status
 
-            # Add units data as a period if we detected a units column
-            if units_col and units_period:
-                units_val = pd.to_numeric(row.get(units_col, 0), errors="coerce")
-                if pd.isna(units_val):
-                    units_val = 0
-                units_val = round(float(units_val), 2)
-                if units_val > 0:
-                    if units_period not in periods:
-                        periods[units_period] = {}
-                    periods[units_period][upc] = {
+        # Add units data as a period if we detected a units column
+        if units_col and units_period:
+            units_vals = self.round_values(self.numeric_column(df, units_col).fillna(0))
+            positive = [(upc, u) for upc, u in zip(df["upc_clean"].tolist(), units_vals)
+                        if u > 0]
+            if positive:
+                self.build_periods(
+                    [units_period] * len(positive),
+                    [upc for upc, _ in positive],
+                    {
                         "dollars": 0,
-                        "units": units_val,
+                        "units": [u for _, u in positive],
                         "dollars_yago": 0,
                         "units_yago": 0,
                         "dollars_yoy_pct": 0,
                         "units_yoy_pct": 0,
-                    }
+                    },
+                    periods=periods,
+                )
@@ -8,161 +8,97 @@ Source:
 """
 
 import os
-import re
 from datetime import datetime
 
 import pandas as pd
 
 from etl.base_adapter import BaseAdapter
+from etl.period_rollup import PeriodRollup
+
+# Schema metric -> SPINS column summed into it
+SUM_COLUMNS = {
+    "dollars": "Dollars",
+    "units": "Units",
+    "dollars_yago": "Dollars, Yago",
+    "units_yago": "Units, Yago",
+}
+
+# Columns the transform reads (all that lean mode keeps) and the repeated text among them
+SPINS_COLUMNS = ("TIME FRAME", "UPC", "DESCRIPTION", "BRAND", "CATEGORY", "SUBCATEGORY",
+                 *SUM_COLUMNS.values())
+SPINS_TEXT_COLUMNS = ("TIME FRAME", "UPC", "DESCRIPTION", "BRAND", "CATEGORY", "SUBCATEGORY")
 
 
 class SproutsAdapter(BaseAdapter):
     retailer_key = "sprouts"
     display_name = "Sprouts"
+    source_folder = "Sprouts"
+    source_patterns = ("Sprouts/45934e10-2794-4865-a52a-d2c5b10f6374.xlsx",)
 
     # ── extract ─────────────────────────────────────────────────────────
     def extract(self):
-        sprouts_dir = os.path.join(self.source_dir, "Sprouts")
+        sprouts_dir = os.path.join(self.source_dir, self.source_folder)
         xlsx_path = os.path.join(sprouts_dir, "45934e10-2794-4865-a52a-d2c5b10f6374.xlsx")
 
         if not os.path.isfile(xlsx_path):
             raise FileNotFoundError(f"Sprouts data file not found: {xlsx_path}")
+        self.source_files = [xlsx_path]
 
         try:
-            self.raw_data = pd.read_excel(xlsx_path)
-            print(f"  [Sprouts] Loaded {len(self.raw_data)} rows")
+            self.raw_data = self._read_excel_batches(xlsx_path, SPINS_COLUMNS,
+                                                     SPINS_TEXT_COLUMNS)
+            print(f"  [Sprouts] Loaded {self.describe_batches(self.raw_data)}")
         except Exception as e:
             raise RuntimeError(f"Failed to read Sprouts file: {e}")
 
     # ── transform ───────────────────────────────────────────────────────
     def transform(self):
-        df = self.raw_data.copy()
-
-        # --- Parse month from TIME FRAME ---
-        # Format: "WEEK End MM/DD/YYYY"
-        df["parsed_date"] = df["TIME FRAME"].astype(str).apply(self._parse_time_frame)
-        df = df.dropna(subset=["parsed_date"])
-        df["year_month"] = df["parsed_date"].dt.strftime("%Y-%m")
-
-        # --- Clean UPC ---
-        df["upc_clean"] = df["UPC"].astype(str).apply(self.normalize_upc)
+        products = {}
+        rollup = PeriodRollup("upc_clean", "week_end_date", SUM_COLUMNS.values())
+        for df in self.raw_data:
+            df = self._prepare(df)
 
-        # --- Numeric columns ---
-        for col in ["Dollars", "Dollars, Yago", "Units", "Units, Yago"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-        # --- Aggregate by (UPC, YYYY-MM) ---
-        grouped = df.groupby(["upc_clean", "year_month"]).agg({
-            "Dollars": "sum",
-            "Dollars, Yago": "sum",
-            "Units": "sum",
-            "Units, Yago": "sum",
-        }).reset_index()
-
-        # --- Build products ---
-        product_info = (
-            df.drop_duplicates(subset=["upc_clean"])
-            .set_index("upc_clean")[["DESCRIPTION", "BRAND", "CATEGORY", "SUBCATEGORY"]]
-        )
+            # --- Build products ---
+            self.build_products(df, "upc_clean", {
+                "product_name": "DESCRIPTION",
+                "brand": "BRAND",
+                "category": "CATEGORY",
+                "subcategory": "SUBCATEGORY",
+            }, existing=products)
 
-        products = {}
-        for upc, row in product_info.iterrows():
-            products[upc] = {
-                "upc": upc,
-                "product_name": str(row.get("DESCRIPTION", "")).strip(),
-                "brand": str(row.get("BRAND", "")).strip(),
-                "category": str(row.get("CATEGORY", "")).strip(),
-                "subcategory": str(row.get("SUBCATEGORY", "")).strip(),
-            }
-
-        # --- Build periods ---
-        periods = {}
-        for _, row in grouped.iterrows():
-            upc = row["upc_clean"]
-            ym = row["year_month"]
-            dollars = round(float(row["Dollars"]), 2)
-            units = round(float(row["Units"]), 2)
-            dollars_yago = round(float(row["Dollars, Yago"]), 2)
-            units_yago = round(float(row["Units, Yago"]), 2)
-
-            dollars_yoy_pct = (
-                round((dollars - dollars_yago) / dollars_yago * 100, 2)
-                if dollars_yago else 0.0
-            )
-            units_yoy_pct = (
-                round((units - units_yago) / units_yago * 100, 2)
-                if units_yago else 0.0
-            )
-
-            if ym not in periods:
-                periods[ym] = {}
-
-            periods[ym][upc] = {
-                "dollars": dollars,
-                "units": units,
-                "dollars_yago": dollars_yago,
-                "units_yago": units_yago,
-                "dollars_yoy_pct": dollars_yoy_pct,
-                "units_yoy_pct": units_yoy_pct,
-            }
-
-        # --- Also aggregate by (UPC, week_end_date) for weekly view ---
-        df["week_end_date"] = df["parsed_date"].dt.strftime("%Y-%m-%d")
-        weekly_grouped = df.groupby(["upc_clean", "week_end_date"]).agg({
-            "Dollars": "sum",
-            "Dollars, Yago": "sum",
-            "Units": "sum",
-            "Units, Yago": "sum",
-        }).reset_index()
-
-        weekly_periods = {}
-        for _, row in weekly_grouped.iterrows():
-            upc = row["upc_clean"]
-            wk = row["week_end_date"]
-            dollars = round(float(row["Dollars"]), 2)
-            units = round(float(row["Units"]), 2)
-            dollars_yago = round(float(row["Dollars, Yago"]), 2)
-            units_yago = round(float(row["Units, Yago"]), 2)
-
-            dollars_yoy_pct = (
-                round((dollars - dollars_yago) / dollars_yago * 100, 2)
-                if dollars_yago else 0.0
-            )
-            units_yoy_pct = (
-                round((units - units_yago) / units_yago * 100, 2)
-                if units_yago else 0.0
-            )
-
-            if wk not in weekly_periods:
-                weekly_periods[wk] = {}
-
-            weekly_periods[wk][upc] = {
-                "dollars": dollars,
-                "units": units,
-                "dollars_yago": dollars_yago,
-                "units_yago": units_yago,
-                "dollars_yoy_pct": dollars_yoy_pct,
-                "units_yoy_pct": units_yoy_pct,
-            }
+            # --- Sum by (UPC, week_end_date); months are rolled up from the weeks ---
+            rollup.add(df)
 
         self.pos_data = {
             "retailer": "Sprouts",
             "last_updated": datetime.now().strftime("%Y-%m-%d"),
             "time_grain": "monthly",
             "products": list(products.values()),
-            "periods": periods,
-            "weekly_periods": weekly_periods,
         }
+        self.pos_data.update(
+            self.rollup_periods(rollup, ("monthly", "weekly"), SUM_COLUMNS)
+        )
+
+    def _prepare(self, df):
+        """Parse dates, clean UPCs and coerce metric columns of one batch."""
+        # Shallow: new columns never write into the source frame's arrays
+        df = self.lean_frame(df, SPINS_COLUMNS, SPINS_TEXT_COLUMNS).copy(deep=False)
+
+        # --- Parse week-ending date from TIME FRAME ---
+        # Format: "WEEK End MM/DD/YYYY"
+        df["parsed_date"] = pd.to_datetime(
+            df["TIME FRAME"].astype(str).str.extract(r"(\d{2}/\d{2}/\d{4})", expand=False),
+            format="%m/%d/%Y",
+            errors="coerce",
+        )
+        df = self.keep_rows(df, df["parsed_date"].notna(), "no period date")
+        df["week_end_date"] = df["parsed_date"].dt.strftime("%Y-%m-%d")
+
+        # --- Clean UPC ---
+        df["upc_clean"] = self.normalize_upc_series(df["UPC"])
 
-    # ── helpers ─────────────────────────────────────────────────────────
-    @staticmethod
-    def _parse_time_frame(tf):
-        """Parse 'WEEK End MM/DD/YYYY' into a datetime, or return None."""
-        match = re.search(r"(\d{2}/\d{2}/\d{4})", str(tf))
-        if match:
-            try:
-                return pd.to_datetime(match.group(1), format="%m/%d/%Y")
-            except Exception:
-                return None
-        return None
+        # --- Numeric columns ---
+        for col in ["Dollars", "Dollars, Yago", "Units", "Units, Yago"]:
+            if col in df.columns:
+                df[col] = self.numeric_column(df, col).fillna(0)
+        return df
@@ -26,10 +26,12 @@ from etl.base_adapter import BaseAdapter
 class TVSAdapter(BaseAdapter):
     retailer_key = "tvs"
     display_name = "TVS"
+    source_folder = "TVS"
+    source_patterns = ("TVS/Irwin Naturals_All In Stock*.xlsx",)
 
     # ── extract ─────────────────────────────────────────────────────────
     def extract(self):
-        tvs_dir = os.path.join(self.source_dir, "TVS")
+        tvs_dir = os.path.join(self.source_dir, self.source_folder)
         if not os.path.isdir(tvs_dir):
             raise FileNotFoundError(f"TVS directory not found: {tvs_dir}")
 
@@ -66,6 +68,7 @@ class TVSAdapter(BaseAdapter):
             # Overwrite — since sorted ascending, the last one per month wins
             monthly_files[ym] = (file_date, fpath)
 
+        self.source_files = [fpath for _, fpath in monthly_files.values()]
         self.raw_data = {"monthly_files": monthly_files}
         print(f"  [TVS] Found {len(monthly_files)} monthly snapshots "
               f"from {len(file_entries)} files")
@@ -76,123 +79,24 @@ class TVSAdapter(BaseAdapter):
         periods = {}
         inventory_records = []
 
-        for ym, (file_date, fpath) in sorted(self.raw_data["monthly_files"].items()):
-            try:
-                df = pd.read_excel(fpath)
-            except Exception as e:
-                print(f"  [TVS] WARNING: Could not read {fpath}: {e}")
-                continue
-
-            print(f"  [TVS] Processing {os.path.basename(fpath)}: {len(df)} rows -> {ym}")
-
-            # Column name mapping — TVS files have inconsistent column names
-            col_map = {}
-            cols_lower = {c.lower().strip(): c for c in df.columns}
-            def find_col(*candidates):
-                for c in candidates:
-                    if c in df.columns:
-                        return c
-                    if c.lower() in cols_lower:
-                        return cols_lower[c.lower()]
-                return None
-
-            upc_col = find_col("UPC ID", "UPC")
-            desc_col = find_col("SKU DESC", "Description")
-            brand_col = find_col("Brand Name ID", "Brand")
-            dept_col = find_col("Department DESC", "Dept")
-            subdept_col = find_col("Sub Department DESC", "Sub-Dept")
-            status_col = find_col("Overall Status ID", "Item Status")
-            store_ct_col = find_col("Store Counts", "Store Ct")
-            instock_col = find_col("InStock %", "Instock %")
-            avg_units_col = find_col("Avg 08 Weeks Sales Units", "Last 8 Wks Avg Sales ", "Last 8 Wks Avg Sales")
-            store_wos_col = find_col("Store WOS (8 Weeks) Units", "Store WOS")
-            oh_store_col = find_col("OH Units Store", "Store OH")
-            oh_dc_col = find_col("OH Units DC", "DC OH")
-            oh_total_col = find_col("OH Units")
-
-            if not upc_col:
-                print(f"  [TVS] WARNING: No UPC column found in {os.path.basename(fpath)}, skipping")
+        monthly_files = sorted(self.raw_data["monthly_files"].items())
+        snapshots = self._map_files(
+            (fpath, "snapshot", self._read_snapshot, (fpath, ym, file_date), [ym])
+            for ym, (file_date, fpath) in monthly_files
+        )
+        for (ym, _), snapshot in zip(monthly_files, snapshots):
+            if snapshot is None:
                 continue
 
-            # Normalize UPC
-            df["upc_clean"] = (
-                df[upc_col]
-                .astype(str)
-                .str.strip()
-                .str.replace(r"\.0$", "", regex=True)
-                .apply(self.normalize_upc)
-            )
-
-            # Numeric columns
-            for col in [avg_units_col, store_ct_col, instock_col,
-                        store_wos_col, oh_store_col, oh_dc_col, oh_total_col]:
-                if col and col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-            period_data = {}
-            for _, row in df.iterrows():
-                upc = row["upc_clean"]
-                if upc == "0000000000000":
-                    continue
-
-                # Product info
+            for upc, info in snapshot["products"].items():
                 if upc not in products_map:
-                    products_map[upc] = {
-                        "upc": upc,
-                        "product_name": str(row.get(desc_col, "")).strip() if desc_col else "",
-                        "brand": str(row.get(brand_col, "")).strip() if brand_col else "Irwin Naturals",
-                        "category": str(row.get(dept_col, "")).strip() if dept_col else "",
-                        "subcategory": str(row.get(subdept_col, "")).strip() if subdept_col else "",
-                    }
-
-                # Units — use avg 8 weeks sales as proxy
-                avg_units = float(row.get(avg_units_col, 0)) if avg_units_col else 0
-                period_data[upc] = {
-                    "dollars": 0,
-                    "units": round(avg_units, 2),
-                    "dollars_yago": 0,
-                    "units_yago": 0,
-                    "dollars_yoy_pct": 0.0,
-                    "units_yoy_pct": 0.0,
-                }
-
-                # Inventory record
-                instock_val = float(row.get(instock_col, 0)) if instock_col else 0
-                inventory_records.append({
-                    "upc": upc,
-                    "product_name": str(row.get(desc_col, "")).strip() if desc_col else "",
-                    "period": ym,
-                    "store_counts": int(row.get(store_ct_col, 0)) if store_ct_col else 0,
-                    "instock_pct": round(instock_val * 100, 2) if instock_val <= 1 else round(instock_val, 2),
-                    "store_wos_8wk": round(float(row.get(store_wos_col, 0)), 2) if store_wos_col else 0,
-                    "oh_units_store": int(row.get(oh_store_col, 0)) if oh_store_col else 0,
-                    "oh_units_dc": int(row.get(oh_dc_col, 0)) if oh_dc_col else 0,
-                    "oh_units_total": int(row.get(oh_total_col, 0)) if oh_total_col else 0,
-                    "overall_status": str(row.get(status_col, "")).strip() if status_col else "",
-                    "as_of": file_date.strftime("%Y-%m-%d"),
-                })
-
-            if period_data:
-                periods[ym] = period_data
+                    products_map[upc] = info
+            inventory_records.extend(snapshot["inventory"])
+            if snapshot["period_data"]:
+                periods[ym] = snapshot["period_data"]
 
         # Compute YoY where we have data 12 months apart
-        all_months = sorted(periods.keys())
-        for ym in all_months:
-            try:
-                dt = datetime.strptime(ym, "%Y-%m")
-                yago_dt = dt.replace(year=dt.year - 1)
-                yago_ym = yago_dt.strftime("%Y-%m")
-            except Exception:
-                continue
-
-            if yago_ym in periods:
-                for upc, metrics in periods[ym].items():
-                    yago_units = periods[yago_ym].get(upc, {}).get("units", 0)
-                    metrics["units_yago"] = round(yago_units, 2)
-                    if yago_units:
-                        metrics["units_yoy_pct"] = round(
-                            (metrics["units"] - yago_units) / yago_units * 100, 2
-                        )
+        self.fill_yoy(periods, ("units",))
 
         self.pos_data = {
             "retailer": "TVS",
@@ -208,3 +112,102 @@ class TVSAdapter(BaseAdapter):
                 "last_updated": datetime.now().strftime("%Y-%m-%d"),
                 "records": inventory_records,
             }
+
+    # ── snapshot reader ─────────────────────────────────────────────────
+    def _read_snapshot(self, fpath, ym, file_date):
+        """Parse one All In Stock snapshot into products, period data and inventory."""
+        try:
+            df = self._read_excel(fpath)
+        except Exception as e:
+            print(f"  [TVS] WARNING: Could not read {fpath}: {e}")
+            return None
+
+        print(f"  [TVS] Processing {os.path.basename(fpath)}: {len(df)} rows -> {ym}")
+
+        # Column name mapping — TVS files have inconsistent column names
+        col_map = {}
+        cols_lower = {c.lower().strip(): c for c in df.columns}
+        def find_col(*candidates):
+            for c in candidates:
+                if c in df.columns:
+                    return c
+                if c.lower() in cols_lower:
+                    return cols_lower[c.lower()]
+            return None
+
+        upc_col = find_col("UPC ID", "UPC")
+        desc_col = find_col("SKU DESC", "Description")
+        brand_col = find_col("Brand Name ID", "Brand")
+        dept_col = find_col("Department DESC", "Dept")
+        subdept_col = find_col("Sub Department DESC", "Sub-Dept")
+        status_col = find_col("Overall Status ID", "Item Status")
+        store_ct_col = find_col("Store Counts", "Store Ct")
+        instock_col = find_col("InStock %", "Instock %")
+        avg_units_col = find_col("Avg 08 Weeks Sales Units", "Last 8 Wks Avg Sales ", "Last 8 Wks Avg Sales")
+        store_wos_col = find_col("Store WOS (8 Weeks) Units", "Store WOS")
+        oh_store_col = find_col("OH Units Store", "Store OH")
+        oh_dc_col = find_col("OH Units DC", "DC OH")
+        oh_total_col = find_col("OH Units")
+
+        if not upc_col:
+            print(f"  [TVS] WARNING: No UPC column found in {os.path.basename(fpath)}, skipping")
+            return None
+
+        # Normalize UPC
+        df["upc_clean"] = self.normalize_upc_series(df[upc_col], strip_float_suffix=True)
+
+        # Numeric columns
+        for col in [avg_units_col, store_ct_col, instock_col,
+                    store_wos_col, oh_store_col, oh_dc_col, oh_total_col]:
+            if col and col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+        df = self.keep_rows(df, df["upc_clean"] != "0000000000000", "no UPC")
+        upcs = df["upc_clean"]
+
+        def num(col):
+            # Numeric columns were coerced above; absent ones read as 0
+            return df[col] if col else pd.Series(0, index=df.index)
+
+        # Product info
+        products = self.build_products(df, "upc_clean", {
+            "product_name": desc_col,
+            "brand": brand_col,
+            "category": dept_col,
+            "subcategory": subdept_col,
+        }, defaults={"brand": "Irwin Naturals"})
+
+        # Units — use avg 8 weeks sales as proxy
+        period_data = self.build_periods([ym] * len(df), upcs, {
+            "dollars": 0,
+            "units": self.round_values(num(avg_units_col)) if avg_units_col else 0,
+            "dollars_yago": 0,
+            "units_yago": 0,
+            "dollars_yoy_pct": 0.0,
+            "units_yoy_pct": 0.0,
+        }).get(ym, {})
+
+        # Inventory records
+        instock_pct = 0
+        if instock_col:
+            instock = num(instock_col).astype(float)
+            instock_pct = self.round_values(instock.where(instock > 1, instock * 100))
+        inventory_records = self.build_records({
+            "upc": upcs,
+            "product_name": self.text_column(df, desc_col),
+            "period": ym,
+            "store_counts": num(store_ct_col).astype(int),
+            "instock_pct": instock_pct,
+            "store_wos_8wk": self.round_values(num(store_wos_col)) if store_wos_col else 0,
+            "oh_units_store": num(oh_store_col).astype(int),
+            "oh_units_dc": num(oh_dc_col).astype(int),
+            "oh_units_total": num(oh_total_col).astype(int),
+            "overall_status": self.text_column(df, status_col),
+            "as_of": file_date.strftime("%Y-%m-%d"),
+        })
+
+        return {
+            "products": products,
+            "period_data": period_data,
+            "inventory": inventory_records,
+        }
@@ -22,6 +22,7 @@ The Current Inventory- sheet has columns:
     LV PO On Order, MZ PO On Order, Inventory Date
 """
 
+import hashlib
 import os
 import re
 from datetime import datetime
@@ -30,14 +31,51 @@ import pandas as pd
 
 from etl.base_adapter import BaseAdapter
 
+MTD_SHEET = "MTD-"
+INVENTORY_SHEET = "Current Inventory-"
+
+# Header row is searched for within this many rows of the MTD- sheet
+HEADER_SCAN_ROWS = 10
+
+# MTD- columns the adapter consumes (matched stripped, case-insensitive;
+# the UPC column is matched exactly)
+MTD_COLUMNS = {
+    "net sales", "units", "brand id", "product name",
+    "category name", "secondary category",
+}
+
+# Current Inventory- columns the adapter consumes
+INVENTORY_COLUMNS = {
+    "UPC", "Description", "BrandName", "VITACOST Status", "STH Status",
+    "NC OnHand", "LV OnHand", "MZ OnHand",
+}
+
+
+def _source_hash():
+    """Hash of this module, so cached sheets are re-read when the columns or reader change."""
+    with open(__file__, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# Parse-cache options for _load_sheets(): the column lists are spelled out,
+# the source hash covers everything else that shapes the cached frames
+SHEET_CACHE_OPTIONS = {
+    "mtd_columns": sorted(MTD_COLUMNS),
+    "inventory_columns": sorted(INVENTORY_COLUMNS),
+    "header_scan_rows": HEADER_SCAN_ROWS,
+    "source": _source_hash(),
+}
+
 
 class VitacostAdapter(BaseAdapter):
     retailer_key = "vitacost"
     display_name = "Vitacost"
+    source_folder = "Vitacost"
+    source_patterns = ("Vitacost/History/*OMNI*.xlsx",)
 
     # ── extract ─────────────────────────────────────────────────────────
     def extract(self):
-        history_dir = os.path.join(self.source_dir, "Vitacost", "History")
+        history_dir = os.path.join(self.source_dir, self.source_folder, "History")
         if not os.path.isdir(history_dir):
             raise FileNotFoundError(f"Vitacost History directory not found: {history_dir}")
 
@@ -83,6 +121,8 @@ class VitacostAdapter(BaseAdapter):
             )
 
         weekly_files.sort()
+        self.source_files = [fpath for _, fpath in monthly_files.values()]
+        self.source_files += [fpath for _, fpath in weekly_files]
         self.raw_data = {
             "monthly_files": monthly_files,
             "weekly_files": weekly_files,
@@ -97,8 +137,12 @@ class VitacostAdapter(BaseAdapter):
         inventory_records = []
 
         # --- Process monthly files (primary) ---
-        for ym, (file_date, fpath) in sorted(self.raw_data["monthly_files"].items()):
-            mtd_data = self._read_mtd_sheet(fpath, ym)
+        monthly_files = sorted(self.raw_data["monthly_files"].items())
+        results = self._map_files(
+            self._file_call(fpath, ym) for ym, (_, fpath) in monthly_files
+        )
+        for (ym, _), data in zip(monthly_files, results):
+            mtd_data = data["mtd"]
             if mtd_data is not None:
                 for rec in mtd_data:
                     upc = rec["upc"]
@@ -122,7 +166,7 @@ class VitacostAdapter(BaseAdapter):
                     }
 
             # Read inventory from latest monthly file
-            inv = self._read_inventory_sheet(fpath, ym)
+            inv = data["inventory"]
             if inv:
                 inventory_records.extend(inv)
 
@@ -134,14 +178,29 @@ class VitacostAdapter(BaseAdapter):
                 weekly_by_month[ym] = []
             weekly_by_month[ym].append((file_date, fpath))
 
-        for ym, files in sorted(weekly_by_month.items()):
-            if ym in periods:
-                # Monthly file already covers this month — skip weekly
-                continue
+        # Monthly files already cover some months — skip weekly for those
+        weekly_months = [
+            (ym, files) for ym, files in sorted(weekly_by_month.items())
+            if ym not in periods
+        ]
+        # Inventory is only needed from the latest weekly file of each month
+        results = iter(self._map_files(
+            self._file_call(fpath, ym, inventory=(file_date, fpath) == sorted(files)[-1])
+            for ym, files in weekly_months
+            for file_date, fpath in files
+        ))
+
+        for ym, files in weekly_months:
+            latest_file = sorted(files)[-1]
+            latest_data = None
 
             month_accum = {}  # upc -> {dollars, units}
             for file_date, fpath in files:
-                mtd_data = self._read_mtd_sheet(fpath, ym)
+                is_latest = (file_date, fpath) == latest_file
+                data = next(results)
+                if is_latest:
+                    latest_data = data
+                mtd_data = data["mtd"]
                 if mtd_data is None:
                     continue
                 for rec in mtd_data:
@@ -161,8 +220,7 @@ class VitacostAdapter(BaseAdapter):
 
             # For weekly MTD sheets: the MTD value in the latest weekly file
             # of the month is the cumulative MTD — use that instead of summing
-            latest_file = sorted(files)[-1]
-            mtd_data = self._read_mtd_sheet(latest_file[1], ym)
+            mtd_data = latest_data["mtd"]
             if mtd_data:
                 period_data = {}
                 for rec in mtd_data:
@@ -179,34 +237,12 @@ class VitacostAdapter(BaseAdapter):
                     periods[ym] = period_data
 
             # Read inventory from latest weekly file of the month
-            latest_weekly = sorted(files)[-1]
-            inv = self._read_inventory_sheet(latest_weekly[1], ym)
+            inv = latest_data["inventory"]
             if inv:
                 inventory_records.extend(inv)
 
         # Compute YoY where possible
-        all_months = sorted(periods.keys())
-        for ym in all_months:
-            try:
-                dt = datetime.strptime(ym, "%Y-%m")
-                yago_ym = dt.replace(year=dt.year - 1).strftime("%Y-%m")
-            except Exception:
-                continue
-            if yago_ym in periods:
-                for upc, metrics in periods[ym].items():
-                    yago_data = periods[yago_ym].get(upc, {})
-                    yago_dollars = yago_data.get("dollars", 0)
-                    yago_units = yago_data.get("units", 0)
-                    metrics["dollars_yago"] = round(yago_dollars, 2)
-                    metrics["units_yago"] = round(yago_units, 2)
-                    if yago_dollars:
-                        metrics["dollars_yoy_pct"] = round(
-                            (metrics["dollars"] - yago_dollars) / yago_dollars * 100, 2
-                        )
-                    if yago_units:
-                        metrics["units_yoy_pct"] = round(
-                            (metrics["units"] - yago_units) / yago_units * 100, 2
-                        )
+        self.fill_yoy(periods, ("dollars", "units"))
 
         self.pos_data = {
             "retailer": "Vitacost",
@@ -223,35 +259,94 @@ class VitacostAdapter(BaseAdapter):
                 "records": inventory_records,
             }
 
-    # ── sheet readers ───────────────────────────────────────────────────
-    def _read_mtd_sheet(self, fpath, ym):
+    # ── workbook reader ─────────────────────────────────────────────────
+    def _file_call(self, fpath, ym, inventory=True):
+        """_map_files() entry reading MTD- (and optionally Current Inventory-).
+
+        Each result is {"mtd": records or None, "inventory": records or None},
+        reused across incremental runs while the file is unchanged.
+        """
+        return (fpath, "omni" if inventory else "mtd", self._parse_file,
+                (fpath, ym, inventory), [ym])
+
+    def _parse_file(self, fpath, ym, inventory):
+        result = {"mtd": None, "inventory": None}
+        try:
+            sheets = self._parse_cached(
+                fpath, "vitacost_omni", {**SHEET_CACHE_OPTIONS, "inventory": inventory},
+                lambda: self._load_sheets(fpath, inventory),
+            )
+        except Exception as e:
+            print(f"  [Vitacost] WARNING: Could not open {os.path.basename(fpath)}: {e}")
+            return result
+
+        for sheet, error in sheets["errors"].items():
+            print(f"  [Vitacost] WARNING: No {sheet} sheet in "
+                  f"{os.path.basename(fpath)}: {error}")
+        if sheets["mtd"] is not None:
+            header_idx, df = sheets["mtd"]
+            result["mtd"] = self._mtd_records(df, header_idx, fpath, ym)
+        if sheets["inventory"] is not None:
+            result["inventory"] = self._inventory_records(sheets["inventory"], ym)
+        return result
+
+    @staticmethod
+    def _load_sheets(fpath, inventory):
+        """Open an OMNI workbook once and read only the sheets and columns used.
+
+        pandas opens the workbook read-only, so the YesterDay-, WTD-, YTD-
+        and Glossary- sheets are never parsed.  The MTD- header row is
+        located from the first rows alone, then only the consumed columns
+        are read.  Missing sheets are reported in "errors".
         """
-        Read the MTD- sheet.  Header row is at row index 3 (0-indexed).
+        sheets = {"mtd": None, "inventory": None, "errors": {}}
+        with pd.ExcelFile(fpath) as xl:
+            try:
+                head = xl.parse(MTD_SHEET, header=None, nrows=HEADER_SCAN_ROWS * 2)
+                header_idx = None
+                for i in range(min(HEADER_SCAN_ROWS, len(head))):
+                    row_vals = [str(v).strip() for v in head.iloc[i].values]
+                    if "UPC" in row_vals and "Net Sales" in row_vals:
+                        header_idx = i
+                        break
+
+                if header_idx is None:
+                    # Fallback: assume row 3 and read every column
+                    sheets["mtd"] = (3, xl.parse(MTD_SHEET, header=None))
+                else:
+                    usecols = [
+                        i for i, v in enumerate(head.iloc[header_idx].values)
+                        if str(v).strip() == "UPC"
+                        or str(v).strip().lower() in MTD_COLUMNS
+                    ]
+                    sheets["mtd"] = (
+                        header_idx,
+                        xl.parse(MTD_SHEET, header=None, usecols=usecols),
+                    )
+            except Exception as e:
+                sheets["errors"][MTD_SHEET] = str(e)
+
+            if inventory:
+                try:
+                    sheets["inventory"] = xl.parse(
+                        INVENTORY_SHEET, header=0,
+                        usecols=lambda c: c in INVENTORY_COLUMNS,
+                    )
+                except Exception as e:
+                    sheets["errors"][INVENTORY_SHEET] = str(e)
+        return sheets
+
+    # ── sheet records ───────────────────────────────────────────────────
+    def _mtd_records(self, df, header_idx, fpath, ym):
+        """
+        Records from the MTD- sheet.  Header row is at row index 3 (0-indexed).
         Columns: Category Name, Secondary Category, Third Category, Vendor ID,
                  Product, Brand ID, Kroger GTIN, Product Name, UPC,
                  Net Sales, Units, Orders, AOV, ASP, Avg Cost, Product Margin%
         """
-        try:
-            df = pd.read_excel(fpath, sheet_name="MTD-", header=None)
-        except Exception as e:
-            print(f"  [Vitacost] WARNING: No MTD- sheet in {os.path.basename(fpath)}: {e}")
-            return None
-
-        # Find header row — look for a row containing "UPC" and "Net Sales"
-        header_idx = None
-        for i in range(min(10, len(df))):
-            row_vals = [str(v).strip() for v in df.iloc[i].values]
-            if "UPC" in row_vals and ("Net Sales" in row_vals or "Net Sales " in row_vals):
-                header_idx = i
-                break
-
-        if header_idx is None:
-            # Fallback: assume row 3
-            header_idx = 3
-
         # Set header and slice data
         headers = [str(v).strip() for v in df.iloc[header_idx].values]
-        data_df = df.iloc[header_idx + 1:].copy()
+        data_df = df.iloc[header_idx + 1:].copy(deep=False)
         data_df.columns = headers
 
         # Clean up
@@ -259,13 +354,7 @@ class VitacostAdapter(BaseAdapter):
             print(f"  [Vitacost] WARNING: No UPC column found in {os.path.basename(fpath)}")
             return None
 
-        data_df["upc_clean"] = (
-            data_df["UPC"]
-            .astype(str)
-            .str.strip()
-            .str.replace(r"\.0$", "", regex=True)
-            .apply(self.normalize_upc)
-        )
+        data_df["upc_clean"] = self.normalize_upc_series(data_df["UPC"], strip_float_suffix=True)
 
         # Find Net Sales and Units columns
         net_sales_col = None
@@ -290,82 +379,68 @@ class VitacostAdapter(BaseAdapter):
             elif cl == "secondary category":
                 subcat_col = c
 
-        records = []
-        for _, row in data_df.iterrows():
-            upc = row.get("upc_clean", "")
-            if not upc or upc == "0000000000000":
-                continue
+        data_df = self.keep_rows(
+            data_df,
+            (data_df["upc_clean"] != "") & (data_df["upc_clean"] != "0000000000000"),
+            "no UPC",
+        )
 
-            dollars = pd.to_numeric(row.get(net_sales_col), errors="coerce") if net_sales_col else 0
-            units = pd.to_numeric(row.get(units_col), errors="coerce") if units_col else 0
-
-            records.append({
-                "upc": upc,
-                "product_name": str(row.get(product_name_col, "")).strip()
-                    if product_name_col else "",
-                "brand": str(row.get(brand_col, "")).strip()
-                    if brand_col else "Irwin Naturals",
-                "category": str(row.get(cat_col, "")).strip()
-                    if cat_col else "",
-                "subcategory": str(row.get(subcat_col, "")).strip()
-                    if subcat_col else "",
-                "dollars": round(float(dollars), 2) if pd.notna(dollars) else 0,
-                "units": int(units) if pd.notna(units) else 0,
-            })
+        dollars = 0.0
+        if net_sales_col:
+            dollars = [0 if v != v else v for v in
+                       self.round_values(self.numeric_column(data_df, net_sales_col))]
+        units = 0
+        if units_col:
+            units = self.numeric_column(data_df, units_col)
+            units = [int(v) if v == v else 0 for v in units.tolist()]
+
+        records = self.build_records({
+            "upc": data_df["upc_clean"],
+            "product_name": self.text_column(data_df, product_name_col),
+            "brand": self.text_column(data_df, brand_col, "Irwin Naturals"),
+            "category": self.text_column(data_df, cat_col),
+            "subcategory": self.text_column(data_df, subcat_col),
+            "dollars": dollars,
+            "units": units,
+        })
 
         print(f"  [Vitacost] MTD {ym}: {len(records)} products from "
               f"{os.path.basename(fpath)}")
         return records if records else None
 
-    def _read_inventory_sheet(self, fpath, ym):
+    def _inventory_records(self, df, ym):
         """
-        Read Current Inventory- sheet.
+        Records from the Current Inventory- sheet.
         Columns: UPC, GTIN, Description, BrandName, Primary Vendor,
                  VITACOST Status, STH Status, NC OnHand, LV OnHand, MZ OnHand,
                  NC PO On Order, LV PO On Order, MZ PO On Order, Inventory Date
         """
-        try:
-            df = pd.read_excel(fpath, sheet_name="Current Inventory-", header=0)
-        except Exception as e:
-            print(f"  [Vitacost] WARNING: No Current Inventory- sheet in "
-                  f"{os.path.basename(fpath)}: {e}")
-            return None
-
         if "UPC" not in df.columns:
             return None
 
-        df["upc_clean"] = (
-            df["UPC"]
-            .astype(str)
-            .str.strip()
-            .str.replace(r"\.0$", "", regex=True)
-            .apply(self.normalize_upc)
-        )
-
-        records = []
-        for _, row in df.iterrows():
-            upc = row.get("upc_clean", "")
-            if not upc or upc == "0000000000000":
-                continue
-
-            nc = pd.to_numeric(row.get("NC OnHand"), errors="coerce")
-            lv = pd.to_numeric(row.get("LV OnHand"), errors="coerce")
-            mz = pd.to_numeric(row.get("MZ OnHand"), errors="coerce")
-            nc = int(nc) if pd.notna(nc) else 0
-            lv = int(lv) if pd.notna(lv) else 0
-            mz = int(mz) if pd.notna(mz) else 0
-
-            records.append({
-                "upc": upc,
-                "product_name": str(row.get("Description", "")).strip(),
-                "brand": str(row.get("BrandName", "")).strip(),
-                "vitacost_status": str(row.get("VITACOST Status", "")).strip(),
-                "sth_status": str(row.get("STH Status", "")).strip(),
-                "on_hand_nc": nc,
-                "on_hand_lv": lv,
-                "on_hand_mz": mz,
-                "on_hand_total": nc + lv + mz,
-                "period": ym,
-            })
+        df["upc_clean"] = self.normalize_upc_series(df["UPC"], strip_float_suffix=True)
+
+        df = self.keep_rows(df, (df["upc_clean"] != "") & (df["upc_clean"] != "0000000000000"),
+                            "no UPC")
+
+        def on_hand(col):
+            return [int(v) if v == v else 0 for v in self.numeric_column(df, col).tolist()]
+
+        nc = on_hand("NC OnHand")
+        lv = on_hand("LV OnHand")
+        mz = on_hand("MZ OnHand")
+
+        records = self.build_records({
+            "upc": df["upc_clean"],
+            "product_name": self.text_column(df, "Description"),
+            "brand": self.text_column(df, "BrandName"),
+            "vitacost_status": self.text_column(df, "VITACOST Status"),
+            "sth_status": self.text_column(df, "STH Status"),
+            "on_hand_nc": nc,
+            "on_hand_lv": lv,
+            "on_hand_mz": mz,
+            "on_hand_total": [a + b + c for a, b, c in zip(nc, lv, mz)],
+            "period": ym,
+        })
 
         return records if records else None
@@ -1,39 +1,158 @@
 """
 Base adapter — abstract interface that every retailer adapter implements.
 """
-import json
+import contextlib
+import inspect
+import io
+import itertools
 import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
+from etl.columnar import SCHEMA_VERSION as COLUMNAR_SCHEMA_VERSION, to_columnar
+from etl.cube import write_cube
+from etl.content_hash import content_hash, file_info, prune_hashed_copies, write_hashed_copy
+from etl.incremental import MISSING, IncrementalState
+from etl.json_writer import write_json
+from etl.metrics import AdapterMetrics
+from etl.parse_cache import ParseCache
+from etl.period_rollup import PERIOD_KEYS, PeriodRollup
+from etl.rollups import build_rollups
+from etl.sharding import (
+    INDEX_FILE, SHARD_DIR, remove_stale_shards, shard_file, shard_pos_data,
+)
+from etl.timeseries import TimeSeriesGrid, yoy_pct
+from etl.xlsx_stream import XlsxBatchReader
+
+# Bound on the shared raw -> clean UPC memo (cleared when exceeded)
+UPC_MEMO_MAX = 100_000
+
+# Fewest significant digits a well-formed code has (UPC-E / EAN-8)
+MIN_UPC_DIGITS = 8
+
+# Raw values that mean "no UPC" and are not reported as malformed
+_MISSING_UPC_VALUES = ("", "nan", "None", "<NA>")
+
+# In lean mode, text columns with at most this share of distinct values
+# are stored as categoricals
+LEAN_CATEGORY_RATIO = 0.5
+
+# Per-UPC metric keys of the universal schema, in output order
+METRIC_FIELDS = (
+    "dollars", "units", "dollars_yago", "units_yago",
+    "dollars_yoy_pct", "units_yoy_pct",
+)
+
 
 class BaseAdapter(ABC):
     """Every retailer adapter must implement extract(), transform(), and load()."""
 
     retailer_key = ""       # e.g. "ngvc"
     display_name = ""       # e.g. "NGVC"
+    source_folder = ""      # folder under source_dir (and SharePoint), e.g. "NGVC"
+    source_patterns = ()    # input globs relative to source_dir, for --watch
 
-    def __init__(self, source_dir, output_dir):
+    # (raw value, strip_float_suffix) -> (clean UPC, malformed flag),
+    # shared by all adapters in the process
+    _upc_memo = {}
+
+    def __init__(self, source_dir, output_dir, cache_dir=None, incremental=False,
+                 stream_batch_size=None, compact_json=False, compression=(),
+                 columnar=False, file_workers=1, calendar_periods=False, shard_by=None,
+                 hashed_copies=False, lean=False, cube=False):
         self.source_dir = source_dir
         self.output_dir = os.path.join(output_dir, self.retailer_key)
         os.makedirs(self.output_dir, exist_ok=True)
+        self.parse_cache = ParseCache(cache_dir) if cache_dir else None
+        self.state = None
+        if incremental and cache_dir:
+            code_files = [__file__, inspect.getsourcefile(type(self))]
+            self.state = IncrementalState(
+                os.path.join(cache_dir, "state"), self.retailer_key, code_files
+            )
+        self.stream_batch_size = stream_batch_size  # rows per batch, None = off
+        self.compact_json = compact_json            # minified output JSON
+        self.compression = tuple(compression)       # precompressed siblings, e.g. ("gz",)
+        self.columnar = columnar                    # also write pos_data.v2.json
+        self.file_workers = file_workers            # processes for _map_files()
+        self.calendar_periods = calendar_periods    # also quarterly/yearly_periods
+        self.shard_by = shard_by                    # "year" / "period" shards, None = off
+        self.hashed_copies = hashed_copies          # also write <name>.<hash>.json links
+        self.lean = lean                            # slim source frames, see lean_frame()
+        self.cube = cube                            # also write cube/ (etl/cube.py)
+        # Enough to rebuild a stateless twin of this adapter in a worker
+        self._worker_options = {
+            "source_dir": source_dir, "output_dir": output_dir,
+            "cache_dir": cache_dir, "stream_batch_size": stream_batch_size,
+            "lean": lean,
+        }
         self.raw_data = None
         self.pos_data = None      # universal schema dict
         self.supplemental = {}    # e.g. {"inventory": {...}, "ecommerce": {...}}
+        self.source_files = []    # every input file, set by extract()
+        self.malformed_upcs = {}  # raw code -> padded UPC, see normalize_upc_series()
+        self.file_info = {}       # filename -> {sha256, bytes, rows} of files written
+        self.metrics = AdapterMetrics(self.retailer_key)  # timings and row counters
 
     # ── public API ────────────────────────────────────────────────────
     def run(self):
-        """Full ETL pipeline."""
-        print(f"[{self.display_name}] Extracting from {self.source_dir} ...")
-        self.extract()
-        print(f"[{self.display_name}] Transforming ...")
-        self.transform()
-        print(f"[{self.display_name}] Loading to {self.output_dir} ...")
-        manifest_entry = self.load()
+        """Full ETL pipeline, timed per stage in self.metrics."""
+        with self.metrics.stage("extract"):
+            print(f"[{self.display_name}] Extracting from {self.source_dir} ...")
+            self.extract()
+        if self.state is not None:
+            entry = self.state.reusable_entry(self.source_files, self.output_dir,
+                                              self.output_options())
+            if entry is not None:
+                print(f"[{self.display_name}] No source changes since last run — "
+                      f"keeping existing output")
+                self.metrics.status = "reused"
+                return entry
+        with self.metrics.stage("transform"):
+            print(f"[{self.display_name}] Transforming ...")
+            self.transform()
+        if self.malformed_upcs:
+            examples = ", ".join(repr(raw) for raw in list(self.malformed_upcs)[:5])
+            print(f"[{self.display_name}] WARNING: {len(self.malformed_upcs)} malformed "
+                  f"UPC code(s) were padded to 13 digits, e.g. {examples}")
+        with self.metrics.stage("load"):
+            print(f"[{self.display_name}] Loading to {self.output_dir} ...")
+            manifest_entry = self.load()
+            if self.state is not None:
+                self.state.save(self.source_files, self.output_dir, manifest_entry,
+                                self.output_options())
+        if self.state is not None:
+            print(f"[{self.display_name}] Incremental: {self.state.summary()}")
+        if self.parse_cache is not None:
+            print(f"[{self.display_name}] Parse cache: {self.parse_cache.hits} hits, "
+                  f"{self.parse_cache.misses} misses")
+        self.metrics.finish(self.pos_data, self.file_info)
+        counters = self.metrics.counters
+        peak = self.metrics.as_dict()["peak_rss_bytes"]
         print(f"[{self.display_name}] Done — {len(self.pos_data.get('products', []))} products, "
-              f"{len(self.pos_data.get('periods', {}))} periods")
+              f"{len(self.pos_data.get('periods', {}))} periods "
+              f"({counters['rows_parsed']} rows parsed, {counters['rows_dropped']} dropped; "
+              + ", ".join(f"{name} {s['seconds']:.2f}s"
+                          for name, s in self.metrics.stages.items())
+              + (f"; peak RSS {peak / 2**20:.0f} MB" if peak else "") + ")")
         return manifest_entry
 
+    def output_options(self):
+        """The options that decide which output files load() writes (JSON-ready)."""
+        return {
+            "compact_json": self.compact_json,
+            "compression": sorted(self.compression),
+            "columnar": self.columnar,
+            "calendar_periods": self.calendar_periods,
+            "shard_by": self.shard_by,
+            "hashed_copies": self.hashed_copies,
+            "cube": self.cube,
+        }
+
     @abstractmethod
     def extract(self):
         """Read raw files into self.raw_data."""
@@ -48,6 +167,31 @@ class BaseAdapter(ABC):
         self._write_json("pos_data.json", self.pos_data)
         data_files = ["pos_data.json"]
 
+        # Columnar copy (schema v2) for loaders that understand it
+        if self.columnar:
+            self._write_json("pos_data.v2.json", to_columnar(self.pos_data, METRIC_FIELDS))
+            data_files.append("pos_data.v2.json")
+
+        # Index + per-year / per-period shards for clients that load lazily
+        shards = None
+        shard_files = []
+        if self.shard_by:
+            index, shard_docs = shard_pos_data(self.pos_data, self.shard_by)
+            os.makedirs(os.path.join(self.output_dir, SHARD_DIR), exist_ok=True)
+            for name, doc in shard_docs.items():
+                self._write_json(shard_file(name), doc)
+                shard_files.append(shard_file(name))
+            self._write_json(INDEX_FILE, index)
+            data_files.append(INDEX_FILE)
+            data_files.extend(shard_files)
+            shards = {"by": self.shard_by, "index": INDEX_FILE, "names": list(shard_docs)}
+        remove_stale_shards(self.output_dir, data_files)
+
+        # Quarter / YTD rollups the dashboard looks up instead of recomputing
+        if self.pos_data.get("periods"):
+            self._write_json("rollups.json", build_rollups(self.pos_data["periods"]))
+            data_files.append("rollups.json")
+
         # Write supplemental files
         for name, payload in self.supplemental.items():
             fname = f"{name}.json"
@@ -76,6 +220,27 @@ class BaseAdapter(ABC):
         if self.pos_data.get("weekly_periods"):
             entry["has_weekly"] = True
 
+        if self.columnar:
+            entry["schema_version"] = COLUMNAR_SCHEMA_VERSION
+
+        if shards is not None:
+            entry["shards"] = shards
+
+        # Memory-mapped period × UPC × metric arrays for PosCube
+        if self.cube:
+            entry["cube"] = write_cube(self.output_dir, self.pos_data, METRIC_FIELDS,
+                                       self.file_info["pos_data.json"]["sha256"])
+
+        # Cache validators, and immutable hash-named copies when enabled
+        files = {fname: dict(self.file_info[fname]) for fname in data_files}
+        if self.hashed_copies:
+            for fname, info in files.items():
+                info["hashed"] = write_hashed_copy(self.output_dir, fname, info["sha256"],
+                                                   self.compression)
+        prune_hashed_copies(self.output_dir, files)
+        entry["files"] = files
+        entry["content_hash"] = content_hash(files)
+
         return entry
 
     # ── helpers ───────────────────────────────────────────────────────
@@ -87,15 +252,377 @@ class BaseAdapter(ABC):
         s = s.lstrip("0") or "0"
         return s.zfill(13)
 
+    def normalize_upc_series(self, values, strip_float_suffix=False):
+        """Column version of normalize_upc().
+
+        Same result as ``values.astype(str).apply(normalize_upc)``; with
+        ``strip_float_suffix`` a trailing ".0" (UPCs read as floats) is
+        removed first, as in ``.str.strip().str.replace(r"\.0$", "")``.
+        Only the distinct raw values are cleaned, with pandas string ops,
+        and results are memoized across calls.  Codes that are not 13
+        digits with at least MIN_UPC_DIGITS significant digits are still
+        padded as before but also recorded in ``self.malformed_upcs``.
+        """
+        strs = values.astype(str)
+        codes, uniques = pd.factorize(strs, use_na_sentinel=False)
+        raw = [str(v) for v in uniques]
+
+        memo = BaseAdapter._upc_memo
+        todo = [r for r in dict.fromkeys(raw) if (r, strip_float_suffix) not in memo]
+        if todo:
+            s = pd.Series(todo, dtype=object).str.strip()
+            if strip_float_suffix:
+                s = s.str.replace(r"\.0$", "", regex=True).str.strip()
+            s = s.str.replace(" ", "", regex=False).str.replace("-", "", regex=False)
+            significant = s.str.lstrip("0")
+            significant = significant.where(significant != "", "0")
+            clean = significant.str.zfill(13)
+            malformed = (
+                ~clean.str.fullmatch(r"\d{13}")
+                | (significant.str.len() < MIN_UPC_DIGITS)
+            )
+            # Blank and all-zero codes mean "no UPC"; adapters drop those rows
+            malformed &= (clean != "0" * 13) & ~pd.Series(todo, dtype=object).str.strip().isin(
+                _MISSING_UPC_VALUES
+            )
+
+            if len(memo) + len(todo) > UPC_MEMO_MAX:
+                memo.clear()
+            for r, c, bad in zip(todo, clean.tolist(), malformed.tolist()):
+                memo[(r, strip_float_suffix)] = (c, bad)
+
+        results = [memo[(r, strip_float_suffix)] for r in raw]
+        for r, (c, bad) in zip(raw, results):
+            if bad:
+                self.malformed_upcs.setdefault(r, c)
+        clean_uniques = np.array([c for c, _ in results], dtype=object)
+        return pd.Series(clean_uniques[codes], index=values.index, dtype=object)
+
     @staticmethod
     def to_yyyy_mm(year, month):
         """Return 'YYYY-MM' string."""
         return f"{int(year):04d}-{int(month):02d}"
 
+    # ── vectorized record builder ─────────────────────────────────────
+    # Column-level equivalents of the per-row idioms the adapters used with
+    # iterrows(); each one produces exactly the same Python values.
+    @staticmethod
+    def text_column(df, col, default=""):
+        """Column equivalent of str(row.get(col, default)).strip() (NaN -> "nan")."""
+        if col is None or col not in df.columns:
+            return pd.Series(str(default).strip(), index=df.index, dtype=object)
+        return df[col].astype(object).map(str).str.strip()
+
+    @staticmethod
+    def numeric_column(df, col):
+        """pd.to_numeric(errors="coerce") on a column; all-NaN when it is absent.
+
+        Columns downcast by lean_frame() come back as 64-bit, so sums and
+        rounding see exactly the values a full-width read would give.
+        """
+        if col is None or col not in df.columns:
+            return pd.Series(np.nan, index=df.index, dtype=float)
+        values = pd.to_numeric(df[col], errors="coerce")
+        if values.dtype.kind in "fi" and values.dtype.itemsize < 8:
+            values = values.astype(np.float64 if values.dtype.kind == "f" else np.int64)
+        return values
+
+    # ── memory-lean frames ────────────────────────────────────────────
+    def lean_frame(self, df, columns, categories=()):
+        """``df`` slimmed for lean mode; ``df`` itself when lean mode is off.
+
+        Keeps only ``columns`` (those present), stores the ``categories``
+        text columns as categoricals when their values repeat, and narrows
+        numeric columns to 32 bits where every value survives the round
+        trip — so the adapters' results are unchanged.
+        """
+        if not self.lean:
+            return df
+        wanted = set(columns)
+        keep = [i for i, col in enumerate(df.columns) if col in wanted]
+        df = df.take(keep, axis=1) if len(keep) < df.shape[1] else df.copy(deep=False)
+        for col in df.columns:
+            values = df[col]
+            if col in categories and (values.dtype == object
+                                      or isinstance(values.dtype, pd.StringDtype)):
+                missing = values.isna()
+                # None and NaN would both become NaN; keep object columns holding None
+                if (values.dtype == object and missing.any()
+                        and values[missing].map(type).ne(float).any()):
+                    continue
+                cat = values.astype("category")
+                if len(cat.cat.categories) <= LEAN_CATEGORY_RATIO * len(values):
+                    df[col] = cat
+            elif values.dtype.kind in "fi" and values.dtype.itemsize == 8:
+                df[col] = self._downcast(values)
+        return df
+
+    @staticmethod
+    def _downcast(values):
+        """A float64/int64 Series as float32/int32 if that is lossless, else unchanged."""
+        if values.dtype.kind == "i":
+            info = np.iinfo(np.int32)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                return values
+            return values.astype(np.int32)
+        narrow = values.astype(np.float32)
+        same = (narrow.to_numpy(dtype=np.float64) == values.to_numpy()) | values.isna().to_numpy()
+        return narrow if same.all() else values
+
+    @staticmethod
+    def round_values(values, ndigits=2):
+        """[round(float(v), ndigits) ...] — Python rounding, not numpy's.
+
+        np.round scales by 10**ndigits and can land on the other side of a
+        tie (e.g. 2.675), so the builtin is applied per value to keep output
+        identical to the per-row code.
+        """
+        return [round(v, ndigits) for v in np.asarray(values, dtype=float).tolist()]
+
+    @staticmethod
+    def yoy_pct(current, yago):
+        """round((cur - yago) / yago * 100, 2) where yago is truthy, else 0.0."""
+        return yoy_pct(current, yago)
+
+    @staticmethod
+    def fill_yoy(periods, fields, ndigits=2):
+        """Fill {field}_yago / {field}_yoy_pct from the same month a year earlier.
+
+        Applies to months whose year-ago month is in ``periods``; see
+        TimeSeriesGrid.fill_yoy for the exact rules.
+        """
+        grid = TimeSeriesGrid(periods, fields)
+        for name in fields:
+            grid.fill_yoy(name, ndigits)
+
+    @staticmethod
+    def build_records(columns):
+        """Row dicts from an ordered {key: column} mapping.
+
+        Columns may be lists, Series or arrays (converted with tolist() so
+        values are native Python types); any other value is a constant
+        repeated on every row.  At least one column must be list-like.
+        """
+        keys = list(columns)
+        cols = []
+        for value in columns.values():
+            if isinstance(value, (pd.Series, pd.Index, np.ndarray)):
+                cols.append(value.tolist())
+            elif isinstance(value, list):
+                cols.append(value)
+            else:
+                cols.append(itertools.repeat(value))
+        return [dict(zip(keys, row)) for row in zip(*cols)]
+
+    @classmethod
+    def build_periods(cls, period_keys, upcs, metrics, periods=None):
+        """Nest per-row metrics into periods[period][upc] = {METRIC_FIELDS...}.
+
+        ``metrics`` maps every name in METRIC_FIELDS to a column or constant
+        (see build_records).  Rows are applied in order, so a repeated
+        (period, upc) keeps its first position and its last values, exactly
+        like the dict-building loops it replaces.
+        """
+        periods = {} if periods is None else periods
+        records = cls.build_records({f: metrics[f] for f in METRIC_FIELDS})
+        for ym, upc, rec in zip(list(period_keys), list(upcs), records):
+            if ym not in periods:
+                periods[ym] = {}
+            periods[ym][upc] = rec
+        return periods
+
+    def rollup_periods(self, rollup, grains, columns, calendar=True):
+        """{pos_data key: periods} for each grain of a PeriodRollup.
+
+        ``columns`` maps dollars / units / dollars_yago / units_yago to the
+        summed columns; YoY % is computed from the summed values.  With
+        calendar_periods on, quarterly and yearly grains are added unless
+        ``calendar`` is False (see calendar_grains()).
+        """
+        grains = list(grains)
+        if self.calendar_periods and calendar:
+            grains += [g for g in ("quarterly", "yearly") if g not in grains]
+        result = {}
+        for grain in grains:
+            grouped = rollup.frame(grain)
+            if grouped is None:
+                result[PERIOD_KEYS[grain]] = {}
+                continue
+            dollars = self.round_values(grouped[columns["dollars"]])
+            units = self.round_values(grouped[columns["units"]])
+            dollars_yago = self.round_values(grouped[columns["dollars_yago"]])
+            units_yago = self.round_values(grouped[columns["units_yago"]])
+            result[PERIOD_KEYS[grain]] = self.build_periods(
+                grouped["period"], grouped[rollup.key], {
+                    "dollars": dollars,
+                    "units": units,
+                    "dollars_yago": dollars_yago,
+                    "units_yago": units_yago,
+                    "dollars_yoy_pct": self.yoy_pct(dollars, dollars_yago),
+                    "units_yoy_pct": self.yoy_pct(units, units_yago),
+                })
+        return result
+
+    def calendar_grains(self, periods):
+        """{pos_data key: periods} for the quarterly and yearly grains of a monthly block.
+
+        For adapters that change months after rolling up their source rows
+        (e.g. NGVC's units file), so quarters and years stay the sums of
+        the months actually published.
+        """
+        sums = ("dollars", "units", "dollars_yago", "units_yago")
+        rows = [(upc, month, *(metrics[f] for f in sums))
+                for month, upc_metrics in periods.items()
+                for upc, metrics in upc_metrics.items()]
+        rollup = PeriodRollup("upc", "month", sums)
+        if rows:
+            rollup.add(pd.DataFrame(rows, columns=["upc", "month", *sums]))
+        return self.rollup_periods(rollup, ("quarterly", "yearly"),
+                                   {f: f for f in sums}, calendar=False)
+
+    @classmethod
+    def build_products(cls, df, upc_col, fields, existing=None, defaults=None):
+        """First-occurrence product dicts per UPC.
+
+        ``fields`` maps output keys (after "upc") to source columns, e.g.
+        {"product_name": "Description", ...}; a column of None yields the
+        key's entry in ``defaults`` (or "").  UPCs already in ``existing``
+        are left untouched.
+        """
+        defaults = defaults or {}
+        products = {} if existing is None else existing
+        first = df.drop_duplicates(subset=[upc_col])
+        columns = {"upc": first[upc_col]}
+        for key, col in fields.items():
+            columns[key] = cls.text_column(first, col, defaults.get(key, ""))
+        for rec in cls.build_records(columns):
+            if rec["upc"] not in products:
+                products[rec["upc"]] = rec
+        return products
+
+    def _per_file(self, path, part, compute, args=(), periods=()):
+        """Return compute(*args) for one source file.
+
+        In incremental mode the result is stored per (file, part) and reused
+        on later runs while the file is unchanged, so ``compute`` must return
+        plain JSON-serializable data.  ``periods`` (a list, or a callable on
+        the result) records which periods the file feeds.
+        """
+        if self.state is None:
+            return compute(*args)
+        return self.state.cached(path, part, lambda: compute(*args), periods)
+
+    def _map_files(self, calls):
+        """_per_file() over many source files, yielding the results in order.
+
+        ``calls`` holds (path, part, compute, args, periods) tuples where
+        ``compute`` is a method of this adapter.  With file_workers > 1 every
+        file without a reusable incremental result is parsed in a process
+        pool by a fresh copy of the adapter.  Each result, with the file's
+        log output, malformed UPCs and parse-cache counts, is still handed
+        back in input order, so the caller's merge sees what a serial run
+        would.
+        """
+        calls = list(calls)
+        if self.file_workers <= 1 or len(calls) < 2:
+            for path, part, compute, args, periods in calls:
+                yield self._per_file(path, part, compute, args, periods)
+            return
+
+        reused = {}
+        todo = []
+        for i, (path, part, _, _, _) in enumerate(calls):
+            value = MISSING if self.state is None else self.state.get(path, part)
+            if value is MISSING:
+                todo.append(i)
+            else:
+                reused[i] = value
+
+        pool = None
+        futures = {}
+        try:
+            if todo:
+                pool = ProcessPoolExecutor(max_workers=min(self.file_workers, len(todo)))
+                for i in todo:
+                    _, _, compute, args, _ = calls[i]
+                    futures[i] = pool.submit(
+                        _compute_in_worker, type(self), self._worker_options,
+                        compute.__name__, args,
+                    )
+            for i, (path, part, _, _, periods) in enumerate(calls):
+                if i in reused:
+                    yield reused.pop(i)
+                    continue
+                value, log, malformed, hits, misses, counters = futures.pop(i).result()
+                print(log, end="")
+                self.metrics.merge(counters)
+                for raw, clean in malformed.items():
+                    self.malformed_upcs.setdefault(raw, clean)
+                if self.parse_cache is not None:
+                    self.parse_cache.hits += hits
+                    self.parse_cache.misses += misses
+                if self.state is not None:
+                    self.state.put(path, part, value, periods)
+                yield value
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _parse_cached(self, path, kind, options, parse):
+        """parse() for a source file, served from the parse cache when enabled."""
+        if self.parse_cache is not None:
+            return self.metrics.parsed(self.parse_cache.cached(path, kind, options, parse))
+        return self.metrics.parsed(parse())
+
+    def _read_excel(self, path, **kwargs):
+        """pd.read_excel, served from the parse cache when enabled."""
+        if self.parse_cache is not None:
+            return self.metrics.parsed(self.parse_cache.read_excel(path, **kwargs))
+        return self.metrics.parsed(pd.read_excel(path, **kwargs))
+
+    def _read_excel_batches(self, path, columns=None, categories=()):
+        """First sheet of an XLSX file as an iterable of DataFrames.
+
+        With streaming enabled this is an XlsxBatchReader yielding at most
+        stream_batch_size rows at a time (never cached, so memory stays
+        bounded); otherwise a one-element list with the whole sheet, passed
+        through lean_frame(columns, categories) when ``columns`` is given.
+        """
+        if self.stream_batch_size:
+            reader = XlsxBatchReader(path, batch_size=self.stream_batch_size)
+            self.metrics.streams.append(reader)
+            return reader
+        df = self._read_excel(path)
+        return [df if columns is None else self.lean_frame(df, columns, categories)]
+
+    @staticmethod
+    def describe_batches(batches):
+        """Row count for a loaded sheet, or the batch size when streaming."""
+        if isinstance(batches, XlsxBatchReader):
+            return f"streaming, {batches.batch_size} rows per batch"
+        return f"{sum(len(df) for df in batches)} rows"
+
+    def _read_csv(self, path, **kwargs):
+        """pd.read_csv, served from the parse cache when enabled."""
+        if self.parse_cache is not None:
+            return self.metrics.parsed(self.parse_cache.read_csv(path, **kwargs))
+        return self.metrics.parsed(pd.read_csv(path, **kwargs))
+
+    def keep_rows(self, df, mask, reason):
+        """``df[mask]``, counting the rows left out as dropped for ``reason``.
+
+        The result is a new frame of its own (not flagged as a slice of
+        ``df``), so callers can add columns to it without copying it first.
+        """
+        kept = df.take(np.flatnonzero(np.asarray(mask, dtype=bool)))
+        self.metrics.dropped(reason, len(df) - len(kept))
+        return kept
+
     def _write_json(self, filename, data):
         path = os.path.join(self.output_dir, filename)
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2, default=str)
+        payload = write_json(path, data, compact=self.compact_json,
+                             compression=self.compression, stamp_key="last_updated")
+        self.file_info[filename] = file_info(payload, data)
 
     def _detect_features(self):
         """Auto-detect which dashboard features this retailer supports."""
@@ -178,3 +705,19 @@ class BaseAdapter(ABC):
                 break
 
         return features
+
+
+def _compute_in_worker(adapter_cls, options, method, args):
+    """Worker side of BaseAdapter._map_files(): run one per-file method.
+
+    Returns (result, log text, malformed UPCs, parse-cache hits, misses,
+    metric counters).
+    """
+    adapter = adapter_cls(**options)
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        value = getattr(adapter, method)(*args)
+    cache = adapter.parse_cache
+    return (value, buf.getvalue(), adapter.malformed_upcs,
+            cache.hits if cache else 0, cache.misses if cache else 0,
+            adapter.metrics.snapshot())
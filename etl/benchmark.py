@@ -0,0 +1,203 @@
+"""
+Adapter benchmarks on synthetic data, compared against a stored baseline.
+
+For each scale the synthetic source tree (etl/synthetic.py) is generated
+once and reused; every adapter then runs ``--repeat`` times and the fastest
+extract / transform / load times are kept (AdapterMetrics, see
+etl/metrics.py):
+
+    python -m etl.benchmark                          # 1x, 10x, 100x, all adapters
+    python -m etl.benchmark --scales 1 10 --retailer ngvc sprouts
+    python -m etl.benchmark --save-baseline          # record the current numbers
+    python -m etl.benchmark --lean                   # adapters in memory-lean mode
+
+Results go to <bench dir>/results.json:
+
+    {"generated_at", "git_commit", "python", "platform", "repeat",
+     "results": {"10x": {"ngvc": {"extract", "transform", "load", "total",
+                                  "rows_parsed", "rows_per_second",
+                                  "peak_rss_bytes"}}}}
+
+When a baseline exists every (scale, adapter, stage) time is compared with
+it; a stage slower by more than ``--threshold`` (and by at least
+``--min-seconds``, to ignore timer noise on tiny stages) is a regression,
+and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from etl.run_etl import ADAPTER_REGISTRY, run_adapter
+from etl.synthetic import BASE_UPCS, generate
+
+DEFAULT_BENCH_DIR = os.path.join(PROJECT_ROOT, ".etl_bench")
+DEFAULT_SCALES = (1, 10, 100)
+STAGES = ("extract", "transform", "load")
+
+
+def scale_label(scale):
+    return f"{scale:g}x"
+
+
+def bench_adapter(key, source_dir, repeat=3, **options):
+    """Best-of-``repeat`` stage times (seconds) and counters for one adapter.
+
+    ``options`` go to the adapter constructor (e.g. lean=True).
+    """
+    best = None
+    for _ in range(repeat):
+        output_dir = tempfile.mkdtemp(prefix="etl_bench_")
+        try:
+            _, metrics = run_adapter(key, source_dir, output_dir, **options)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        if metrics["status"] == "failed":
+            raise RuntimeError(f"{key} failed on {source_dir}")
+        run = {stage: metrics["stages"][stage]["seconds"] for stage in STAGES}
+        if best is None:
+            best = run
+            best["peak_rss_bytes"] = metrics["peak_rss_bytes"]
+            best["rows_parsed"] = metrics["counters"]["rows_parsed"]
+        else:
+            for stage in STAGES:
+                best[stage] = min(best[stage], run[stage])
+    best["total"] = round(sum(best[stage] for stage in STAGES), 4)
+    best["rows_per_second"] = (round(best["rows_parsed"] / best["total"], 1)
+                               if best["total"] else None)
+    return best
+
+
+def compare(results, baseline, threshold, min_seconds):
+    """Regressions against ``baseline``: [(scale, adapter, stage, base, now)]."""
+    regressions = []
+    for scale, adapters in results.items():
+        for key, now in adapters.items():
+            base = baseline.get(scale, {}).get(key)
+            if not base:
+                continue
+            for stage in STAGES + ("total",):
+                if stage not in base:
+                    continue
+                if (now[stage] > base[stage] * (1 + threshold)
+                        and now[stage] - base[stage] >= min_seconds):
+                    regressions.append((scale, key, stage, base[stage], now[stage]))
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(results, baseline):
+    print(f"\n{'scale':>6}  {'adapter':<11}" + "".join(f"{s:>11}" for s in STAGES)
+          + f"{'total':>11}{'rows/s':>12}{'vs base':>9}")
+    for scale, adapters in results.items():
+        for key, r in adapters.items():
+            base = baseline.get(scale, {}).get(key)
+            delta = (f"{(r['total'] / base['total'] - 1) * 100:+.0f}%"
+                     if base and base.get("total") else "")
+            print(f"{scale:>6}  {key:<11}" + "".join(f"{r[s]:>10.3f}s" for s in STAGES)
+                  + f"{r['total']:>10.3f}s{r['rows_per_second'] or 0:>12,.0f}{delta:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ETL adapters on synthetic data")
+    parser.add_argument("--scales", nargs="+", type=float, default=list(DEFAULT_SCALES),
+                        help=f"Data scales to run ({BASE_UPCS} UPCs at 1x; default: 1 10 100)")
+    parser.add_argument("--retailer", nargs="+", default=["all"],
+                        help=f'Adapters to run, or "all". Available: '
+                             f'{", ".join(ADAPTER_REGISTRY)}')
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per adapter; the fastest stage times are kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lean", action="store_true",
+                        help="Run the adapters in memory-lean mode (see run_etl --lean)")
+    parser.add_argument("--bench-dir", default=DEFAULT_BENCH_DIR,
+                        help="Synthetic data, results and baseline location "
+                             f"(default: {DEFAULT_BENCH_DIR})")
+    parser.add_argument("--baseline", default=None,
+                        help="Baseline file (default: <bench dir>/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown ratio counted as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this (default: 0.05)")
+    args = parser.parse_args(argv)
+
+    keys = list(ADAPTER_REGISTRY) if "all" in args.retailer else args.retailer
+    unknown = [key for key in keys if key not in ADAPTER_REGISTRY]
+    if unknown:
+        parser.error(f"unknown retailer(s): {', '.join(unknown)}")
+    bench_dir = os.path.abspath(args.bench_dir)
+    baseline_path = args.baseline or os.path.join(bench_dir, "baseline.json")
+    baseline = {}
+    if os.path.isfile(baseline_path):
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for scale in args.scales:
+        label = scale_label(scale)
+        source_dir = os.path.join(bench_dir, "data", f"{label}-seed{args.seed}")
+        started = time.perf_counter()
+        generate(source_dir, scale, args.seed, keys)
+        print(f"\n== {label}: {int(BASE_UPCS * scale)} UPCs, synthetic data ready in "
+              f"{time.perf_counter() - started:.1f}s ({source_dir})")
+        results[label] = {}
+        for key in keys:
+            print(f"\n── {key} @ {label}")
+            results[label][key] = bench_adapter(key, source_dir, args.repeat, lean=args.lean)
+
+    _print_table(results, baseline)
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "lean": args.lean,
+        "results": results,
+    }
+    os.makedirs(bench_dir, exist_ok=True)
+    with open(os.path.join(bench_dir, "results.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    regressions = compare(results, baseline, args.threshold, args.min_seconds)
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+    elif not baseline:
+        print(f"\nNo baseline at {baseline_path} — run with --save-baseline to store one")
+
+    if regressions:
+        print(f"\nREGRESSIONS (> {args.threshold:.0%} slower than baseline):")
+        for scale, key, stage, base, now in regressions:
+            print(f"  {scale:>6} {key:<11} {stage:<10} {base:.3f}s → {now:.3f}s "
+                  f"({(now / base - 1) * 100:+.0f}%)")
+        return 1 if not args.save_baseline else 0
+    if baseline:
+        print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
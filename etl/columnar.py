@@ -0,0 +1,104 @@
+"""
+Columnar pos_data (schema v2) — dense per-metric arrays instead of nested dicts.
+
+The universal schema (v1) stores periods[YYYY-MM][upc] = {six metrics},
+repeating every key string for every cell.  Schema v2 keeps the same
+information as one ordered UPC list, one ordered period list, and one
+period × UPC array per metric, with null where a UPC has no data for a
+period:
+
+    {
+      "schema_version": 2,
+      "retailer": ..., "last_updated": ..., "time_grain": ..., "products": [...],
+      "upcs": ["0071036...", ...],
+      "metric_fields": ["dollars", "units", ...],
+      "periods": ["2024-01", ...],
+      "metrics": {"dollars": [[12.5, null, ...], ...], ...},
+      "weekly_periods": [...], "weekly_metrics": {...}      (weekly SPINS data)
+      "quarterly_periods" / "yearly_periods" likewise      (--calendar-periods)
+    }
+
+Metric values keep their exact v1 Python values, so from_columnar() restores
+the v1 document.
+"""
+
+SCHEMA_VERSION = 2
+
+# v1 keys holding {period: {upc: metrics}} and their v2 metrics key
+PERIOD_BLOCKS = {
+    "periods": "metrics",
+    "weekly_periods": "weekly_metrics",
+    "quarterly_periods": "quarterly_metrics",
+    "yearly_periods": "yearly_metrics",
+}
+
+
+def to_columnar(pos_data, fields=()):
+    """Convert a v1 pos_data dict to the v2 columnar layout.
+
+    ``fields`` fixes the leading metric order (e.g. METRIC_FIELDS); any
+    other metric keys found in the records follow in first-seen order.
+    """
+    blocks = {key: pos_data[key] for key in PERIOD_BLOCKS if key in pos_data}
+
+    # UPCs: product order first, then any UPC only seen in period data
+    upcs = {p["upc"]: None for p in pos_data.get("products", [])}
+    fields = dict.fromkeys(fields)
+    for periods in blocks.values():
+        for upc_metrics in periods.values():
+            for upc, rec in upc_metrics.items():
+                upcs.setdefault(upc)
+                for name in rec:
+                    fields.setdefault(name)
+    upcs = list(upcs)
+    fields = list(fields)
+
+    doc = {"schema_version": SCHEMA_VERSION}
+    for key, value in pos_data.items():
+        if key not in PERIOD_BLOCKS:
+            doc[key] = value
+    doc["upcs"] = upcs
+    doc["metric_fields"] = fields
+
+    for key, periods in blocks.items():
+        labels = sorted(periods)
+        metrics = {name: [] for name in fields}
+        for label in labels:
+            upc_metrics = periods[label]
+            rows = [upc_metrics.get(upc) for upc in upcs]
+            for name in fields:
+                metrics[name].append(
+                    [None if rec is None else rec.get(name) for rec in rows]
+                )
+        doc[key] = labels
+        doc[PERIOD_BLOCKS[key]] = metrics
+    return doc
+
+
+def from_columnar(doc):
+    """Inverse of to_columnar(): rebuild the v1 nested pos_data dict."""
+    upcs = doc["upcs"]
+    fields = doc["metric_fields"]
+    skip = {"schema_version", "upcs", "metric_fields"}
+    skip.update(PERIOD_BLOCKS)
+    skip.update(PERIOD_BLOCKS.values())
+
+    pos_data = {key: value for key, value in doc.items() if key not in skip}
+
+    for key, metrics_key in PERIOD_BLOCKS.items():
+        if key not in doc:
+            continue
+        metrics = doc[metrics_key]
+        periods = {}
+        for pi, label in enumerate(doc[key]):
+            upc_metrics = {}
+            columns = [metrics[name][pi] for name in fields]
+            for ui, upc in enumerate(upcs):
+                values = [col[ui] for col in columns]
+                if any(v is not None for v in values):
+                    upc_metrics[upc] = {
+                        name: v for name, v in zip(fields, values) if v is not None
+                    }
+            periods[label] = upc_metrics
+        pos_data[key] = periods
+    return pos_data
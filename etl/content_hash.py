@@ -0,0 +1,107 @@
+"""
+Content hashes and cache validators for the files in data_files.
+
+Each manifest entry gets a "files" map with the SHA-256, byte size and row
+count of every data file, and a "content_hash" over all of them, so a
+client can tell without downloading anything whether a retailer changed:
+
+    "files": {
+      "pos_data.json": {"sha256": "3f2a…", "bytes": 1048576, "rows": 5120,
+                        "hashed": "pos_data.3f2a9c1b7d4e.json"},
+      ...
+    },
+    "content_hash": "9b1e…"
+
+With hashed copies on, each file is also linked under a name carrying its
+hash ("hashed"), which never changes content and can be served with
+Cache-Control: immutable.  Hash-named copies that are no longer current
+are removed on the next run.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+
+from etl.columnar import PERIOD_BLOCKS
+
+# Hex digits of the hash used in hashed file names
+HASH_CHARS = 12
+
+
+def file_info(payload, data):
+    """Manifest validator for one written file (``payload`` = its JSON bytes)."""
+    info = {"sha256": hashlib.sha256(payload).hexdigest(), "bytes": len(payload)}
+    rows = count_rows(data)
+    if rows is not None:
+        info["rows"] = rows
+    return info
+
+
+def content_hash(files):
+    """One hash over a {filename: file_info} map (order-independent)."""
+    digest = hashlib.sha256()
+    for fname in sorted(files):
+        digest.update(f"{fname}\0{files[fname]['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def count_rows(data):
+    """Rows in a data file: records, UPC×period cells or products; None if n/a."""
+    if isinstance(data, list):
+        return len(data)
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get("records"), list):
+        return len(data["records"])
+    if "metric_fields" in data:
+        # Columnar (v2): cells where any metric is set
+        rows = 0
+        for metrics_key in PERIOD_BLOCKS.values():
+            metrics = data.get(metrics_key)
+            if not metrics:
+                continue
+            columns = list(metrics.values())
+            for per_period in zip(*columns):
+                rows += sum(any(v is not None for v in cell) for cell in zip(*per_period))
+        return rows
+    blocks = [data[key] for key in PERIOD_BLOCKS if isinstance(data.get(key), dict)]
+    if blocks:
+        return sum(len(upc_metrics) for block in blocks for upc_metrics in block.values())
+    if isinstance(data.get("products"), list):
+        return len(data["products"])
+    return None
+
+
+def hashed_name(fname, sha256):
+    """"shards/pos_data.2025.json" -> "shards/pos_data.2025.<hash>.json"."""
+    stem, ext = os.path.splitext(fname)
+    return f"{stem}.{sha256[:HASH_CHARS]}{ext}"
+
+
+def write_hashed_copy(output_dir, fname, sha256, compression=()):
+    """Link ``fname`` (and its .gz/.br siblings) under its hashed name; return it."""
+    hashed = hashed_name(fname, sha256)
+    for suffix in [""] + [f".{encoding}" for encoding in compression]:
+        src = os.path.join(output_dir, fname + suffix)
+        dst = os.path.join(output_dir, hashed + suffix)
+        if os.path.exists(src) and not os.path.exists(dst):
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+    return hashed
+
+
+def prune_hashed_copies(output_dir, files):
+    """Remove hash-named copies that are not current for ``files`` ({fname: info})."""
+    current = {info["hashed"] for info in files.values() if "hashed" in info}
+    pattern = re.compile(r".+\.[0-9a-f]{%d}\.json(\.gz|\.br)?$" % HASH_CHARS)
+    for subdir in {""} | {os.path.dirname(fname) for fname in files}:
+        directory = os.path.join(output_dir, subdir)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            rel = os.path.join(subdir, name) if subdir else name
+            if pattern.match(name) and re.sub(r"\.(gz|br)$", "", rel) not in current:
+                os.remove(os.path.join(directory, name))
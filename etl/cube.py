@@ -0,0 +1,296 @@
+"""
+Period cube — pos_data metrics as memory-mapped numpy arrays.
+
+With --cube each retailer directory also gets a cube/ folder: one .npy
+array per period block, shaped period × UPC × metric (float64, NaN where a
+UPC has no record for a period), plus a small JSON index:
+
+    cube/cube.json         {"version", "source_sha256", "metric_fields", "upcs",
+                            "products": {upc: {product_name, brand, category, ...}},
+                            "blocks": {"periods": {"file", "labels", "shape"}, ...}}
+    cube/periods.npy       monthly block
+    cube/weekly_periods.npy, quarterly_periods.npy, ...   when present
+
+PosCube opens the arrays with mmap_mode="r", so opening costs the index
+parse only and a query reads just the pages it touches:
+
+    cube = PosCube("public/data/sprouts")
+    q = cube.select(start="2025-01", end="2025-06", brand="Irwin Naturals")
+    q.total("dollars")                  # per-period totals of the selection
+    q.sum("units", by="upc")            # per-UPC totals over the range
+    q.yoy("dollars")                    # (current, year ago, %) per period
+    q.top("dollars", 10)                # [(upc, value), ...]
+
+Sums treat missing cells as 0, as the dashboard does.  Arrays are replaced
+by rename, so a reader holding an older mapping keeps a consistent view.
+"""
+
+import io
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+CUBE_DIR = "cube"
+INDEX_FILE = "cube.json"
+CUBE_VERSION = 1
+
+# pos_data keys holding periods[period][upc] blocks
+BLOCKS = ("periods", "weekly_periods", "quarterly_periods", "yearly_periods")
+
+# Product attributes copied into the index for filtering
+PRODUCT_FIELDS = ("product_name", "brand", "category", "subcategory")
+
+
+# ── writing ───────────────────────────────────────────────────────────
+def build_cube(pos_data, fields):
+    """(index, {block: array}) for a pos_data dict; ``fields`` orders the metrics."""
+    blocks = {key: pos_data[key] for key in BLOCKS if pos_data.get(key)}
+
+    # UPCs: product order first, then any UPC only seen in period data
+    upcs = {p["upc"]: None for p in pos_data.get("products", [])}
+    for periods in blocks.values():
+        for upc_metrics in periods.values():
+            for upc in upc_metrics:
+                upcs.setdefault(upc)
+    position = {upc: i for i, upc in enumerate(upcs)}
+    fields = list(fields)
+
+    arrays = {}
+    index_blocks = {}
+    for key, periods in blocks.items():
+        labels = sorted(periods)
+        cube = np.full((len(labels), len(position), len(fields)), np.nan)
+        for p, label in enumerate(labels):
+            upc_metrics = periods[label]
+            if not upc_metrics:
+                continue
+            cols = [position[upc] for upc in upc_metrics]
+            cube[p, cols] = np.array(
+                [[np.nan if rec.get(name) is None else rec[name] for name in fields]
+                 for rec in upc_metrics.values()],
+                dtype=float,
+            )
+        arrays[key] = cube
+        index_blocks[key] = {"file": f"{key}.npy", "labels": labels, "shape": list(cube.shape)}
+
+    products = {
+        p["upc"]: {name: p.get(name, "") for name in PRODUCT_FIELDS}
+        for p in pos_data.get("products", [])
+    }
+    index = {
+        "version": CUBE_VERSION,
+        "retailer": pos_data.get("retailer"),
+        "metric_fields": fields,
+        "upcs": list(position),
+        "products": products,
+        "blocks": index_blocks,
+    }
+    return index, arrays
+
+
+def write_cube(retailer_dir, pos_data, fields, source_sha256=None):
+    """Write cube/ for one retailer; return the index path relative to ``retailer_dir``.
+
+    Arrays whose bytes are unchanged are left alone; blocks no longer in
+    pos_data are removed.
+    """
+    cube_dir = os.path.join(retailer_dir, CUBE_DIR)
+    os.makedirs(cube_dir, exist_ok=True)
+    index, arrays = build_cube(pos_data, fields)
+    index["source_sha256"] = source_sha256
+
+    for key, array in arrays.items():
+        buf = io.BytesIO()
+        np.save(buf, array, allow_pickle=False)
+        _write_if_changed(os.path.join(cube_dir, index["blocks"][key]["file"]), buf.getvalue())
+    for key in BLOCKS:
+        path = os.path.join(cube_dir, f"{key}.npy")
+        if key not in arrays and os.path.exists(path):
+            os.remove(path)
+    _write_if_changed(os.path.join(cube_dir, INDEX_FILE),
+                      json.dumps(index, ensure_ascii=False).encode("utf-8"))
+    return f"{CUBE_DIR}/{INDEX_FILE}"
+
+
+def _write_if_changed(path, payload):
+    """Atomically replace ``path`` with ``payload`` unless it already holds it."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == payload:
+                return
+    except OSError:
+        pass
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+# ── reading ───────────────────────────────────────────────────────────
+def year_ago(label, block="periods"):
+    """Period key one year before ``label`` (52 weeks for weekly blocks)."""
+    if block == "weekly_periods":
+        return (date.fromisoformat(label) - timedelta(weeks=52)).isoformat()
+    return f"{int(label[:4]) - 1:04d}{label[4:]}"
+
+
+class PosCube:
+    """Read-only, memory-mapped view of one retailer's cube/ directory."""
+
+    def __init__(self, path):
+        if os.path.isdir(os.path.join(path, CUBE_DIR)):
+            path = os.path.join(path, CUBE_DIR)
+        if os.path.isdir(path):
+            path = os.path.join(path, INDEX_FILE)
+        with open(path, "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.cube_dir = os.path.dirname(path)
+        self.metric_fields = self.index["metric_fields"]
+        self.upcs = self.index["upcs"]
+        self.products = self.index["products"]
+        self._metric = {name: i for i, name in enumerate(self.metric_fields)}
+        self._upc = {upc: i for i, upc in enumerate(self.upcs)}
+        self._arrays = {}
+
+    @property
+    def blocks(self):
+        return list(self.index["blocks"])
+
+    def labels(self, block="periods"):
+        return self.index["blocks"][block]["labels"]
+
+    def array(self, block="periods"):
+        """The block's period × UPC × metric array, memory-mapped on first use."""
+        if block not in self._arrays:
+            info = self.index["blocks"][block]
+            self._arrays[block] = np.load(os.path.join(self.cube_dir, info["file"]),
+                                          mmap_mode="r", allow_pickle=False)
+        return self._arrays[block]
+
+    def metric_index(self, metric):
+        try:
+            return self._metric[metric]
+        except KeyError:
+            raise KeyError(f"Unknown metric '{metric}' "
+                           f"(expected one of {self.metric_fields})") from None
+
+    def upc_positions(self, upcs=None, brand=None, category=None, subcategory=None):
+        """Sorted UPC positions matching every given filter (None = all UPCs).
+
+        ``brand``, ``category`` and ``subcategory`` take one value or a list
+        and compare case-insensitively.
+        """
+        if upcs is None and brand is None and category is None and subcategory is None:
+            return None
+        selected = np.ones(len(self.upcs), dtype=bool)
+        if upcs is not None:
+            wanted = np.zeros(len(self.upcs), dtype=bool)
+            wanted[[self._upc[u] for u in upcs if u in self._upc]] = True
+            selected &= wanted
+        for field, value in (("brand", brand), ("category", category),
+                             ("subcategory", subcategory)):
+            if value is None:
+                continue
+            values = {str(v).lower() for v in ([value] if isinstance(value, str) else value)}
+            selected &= np.array([
+                str(self.products.get(upc, {}).get(field, "")).lower() in values
+                for upc in self.upcs
+            ], dtype=bool)
+        return np.flatnonzero(selected)
+
+    def select(self, start=None, end=None, upcs=None, brand=None, category=None,
+               subcategory=None, block="periods"):
+        """A CubeSlice of the periods from ``start`` to ``end`` (inclusive) and matching UPCs."""
+        labels = self.labels(block)
+        lo = 0 if start is None else int(np.searchsorted(labels, start, side="left"))
+        hi = len(labels) if end is None else int(np.searchsorted(labels, end, side="right"))
+        return CubeSlice(self, block, slice(lo, hi),
+                         self.upc_positions(upcs, brand, category, subcategory))
+
+
+class CubeSlice:
+    """A period range × UPC selection of a PosCube block."""
+
+    def __init__(self, cube, block, periods, upc_positions):
+        self.cube = cube
+        self.block = block
+        self._periods = periods              # slice into the block's labels
+        self._upcs = upc_positions           # index array, or None for all UPCs
+
+    @property
+    def labels(self):
+        return self.cube.labels(self.block)[self._periods]
+
+    @property
+    def upcs(self):
+        if self._upcs is None:
+            return list(self.cube.upcs)
+        return [self.cube.upcs[i] for i in self._upcs.tolist()]
+
+    def values(self, metric, periods=None):
+        """period × UPC array of ``metric`` (NaN where a UPC has no record).
+
+        A view of the mapped file when every UPC is selected.
+        """
+        periods = self._periods if periods is None else periods
+        grid = self.cube.array(self.block)[periods, :, self.cube.metric_index(metric)]
+        return grid if self._upcs is None else grid[:, self._upcs]
+
+    def sum(self, metric, by=None):
+        """Total of ``metric`` over the slice; per period / per UPC with by="period"/"upc"."""
+        grid = self.values(metric)
+        if by is None:
+            return float(np.nansum(grid))
+        if by == "period":
+            return dict(zip(self.labels, np.nansum(grid, axis=1).tolist()))
+        if by == "upc":
+            return dict(zip(self.upcs, np.nansum(grid, axis=0).tolist()))
+        raise ValueError(f"by must be None, 'period' or 'upc', not {by!r}")
+
+    def total(self, metric):
+        """Per-period totals of ``metric`` over the selected UPCs."""
+        return self.sum(metric, by="period")
+
+    def yoy(self, metric, by="period"):
+        """{key: (current, year ago, YoY %)} per period, or per UPC with by="upc".
+
+        Year-ago values come from the same block, whether or not those
+        periods are in the slice.  Per UPC, only the slice's periods that
+        have a year-ago period are summed.  The % is None where the year-ago
+        value is 0 or the year-ago period is missing.
+        """
+        labels = self.labels
+        positions = {label: i for i, label in enumerate(self.cube.labels(self.block))}
+        prior = [positions.get(year_ago(label, self.block)) for label in labels]
+        current = np.nan_to_num(self.values(metric))
+        have = np.array([p is not None for p in prior], dtype=bool)
+        yago = np.zeros_like(current)
+        if have.any():
+            rows = [p for p in prior if p is not None]
+            yago[have] = np.nan_to_num(self.values(metric, periods=rows))
+
+        if by == "period":
+            keys, cur, prev = labels, current.sum(axis=1), yago.sum(axis=1)
+            valid = have
+        elif by == "upc":
+            # Only periods that have a year-ago period count, on both sides
+            keys, cur, prev = self.upcs, current[have].sum(axis=0), yago[have].sum(axis=0)
+            valid = np.full(len(keys), have.any())
+        else:
+            raise ValueError(f"by must be 'period' or 'upc', not {by!r}")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(valid & (prev != 0), (cur - prev) / prev * 100, np.nan)
+        return {
+            key: (c, p if v else None, None if q != q else q)
+            for key, c, p, v, q in zip(keys, cur.tolist(), prev.tolist(), valid.tolist(),
+                                       pct.tolist())
+        }
+
+    def top(self, metric, n=10, ascending=False):
+        """The ``n`` UPCs with the highest (or lowest) ``metric`` over the range."""
+        totals = np.nansum(self.values(metric), axis=0)
+        order = np.argsort(totals if ascending else -totals, kind="stable")[:n]
+        upcs = self.upcs
+        return [(upcs[i], float(totals[i])) for i in order.tolist()]
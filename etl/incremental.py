@@ -0,0 +1,177 @@
+"""
+Incremental ETL state — remember what each source file produced.
+
+For every retailer the state records, per source file, its size/mtime, the
+periods it contributed to, and the adapter's per-file intermediate results
+(parsed records, pre-aggregated period data).  On the next run an adapter
+asks the state for a file's result before parsing it; only new or changed
+files are processed again.  The cheap merge step (product lists, YoY) always
+runs over every file's result, so derived fields stay consistent and the
+output matches a full run exactly.
+
+Layout under the state directory:
+    <retailer>/state.json        index: files, periods, last manifest entry and
+                                 the output options it was written with
+    <retailer>/<sha1>.json       one stored result per (file, part)
+"""
+
+import hashlib
+import json
+import os
+
+STATE_VERSION = 1
+
+MISSING = object()
+
+
+def _signature(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _fingerprint(code_files):
+    """Hash the adapter source so stored results are dropped when code changes."""
+    h = hashlib.sha1(str(STATE_VERSION).encode("utf-8"))
+    for path in code_files:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class IncrementalState:
+    """Per-retailer record of source files and their stored results."""
+
+    def __init__(self, state_dir, retailer_key, code_files):
+        self.dir = os.path.join(state_dir, retailer_key)
+        os.makedirs(self.dir, exist_ok=True)
+        self.index_path = os.path.join(self.dir, "state.json")
+        self.fingerprint = _fingerprint(code_files)
+        self.recomputed = {}    # path -> periods recomputed this run
+        self.reused = set()     # paths whose stored result was used
+
+        index = None
+        if os.path.isfile(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if not index or index.get("fingerprint") != self.fingerprint:
+            index = {"fingerprint": self.fingerprint, "files": {}}
+        self.index = index
+
+    # ── per-file results ──────────────────────────────────────────────
+    def get(self, path, part):
+        """Return the stored result for (path, part), or MISSING if stale."""
+        rec = self.index["files"].get(os.path.abspath(path))
+        if not rec or rec.get("signature") != _signature(path):
+            return MISSING
+        fname = rec.get("parts", {}).get(part)
+        if not fname:
+            return MISSING
+        try:
+            with open(os.path.join(self.dir, fname), "r") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return MISSING
+        self.reused.add(os.path.abspath(path))
+        return value
+
+    def put(self, path, part, value, periods=()):
+        """Store the result for (path, part) along with the periods it feeds.
+
+        ``periods`` is either a list of periods or a callable that derives
+        them from the result.
+        """
+        if callable(periods):
+            periods = periods(value) if value is not None else ()
+        key = os.path.abspath(path)
+        sig = _signature(path)
+        rec = self.index["files"].get(key)
+        if not rec or rec.get("signature") != sig:
+            rec = {"signature": sig, "periods": [], "parts": {}}
+            self.index["files"][key] = rec
+
+        fname = hashlib.sha1(f"{key}\0{part}".encode("utf-8")).hexdigest() + ".json"
+        self._write(os.path.join(self.dir, fname), value)
+        rec["parts"][part] = fname
+        rec["periods"] = sorted(set(rec["periods"]) | set(periods))
+        self.recomputed.setdefault(key, set()).update(periods)
+
+    def cached(self, path, part, compute, periods=()):
+        """Return compute() for a source file, reusing the stored result if unchanged."""
+        value = self.get(path, part)
+        if value is not MISSING:
+            return value
+        value = compute()
+        self.put(path, part, value, periods)
+        return value
+
+    # ── whole-run bookkeeping ─────────────────────────────────────────
+    def reusable_entry(self, source_files, output_dir, output_options=None):
+        """Return last run's manifest entry if no source file changed, else None.
+
+        ``output_options`` must also match the ones the entry was written
+        with, so turning on e.g. --columnar still writes the new files.
+        """
+        entry = self.index.get("manifest_entry")
+        if not entry or not source_files:
+            return None
+        if self.index.get("output_dir") != os.path.abspath(output_dir):
+            return None
+        if self.index.get("output_options") != output_options:
+            return None
+
+        current = {os.path.abspath(p) for p in source_files}
+        if current != set(self.index["files"]):
+            return None
+        for path in current:
+            if self.index["files"][path].get("signature") != _signature(path):
+                return None
+        for fname in entry.get("data_files", []):
+            if not os.path.isfile(os.path.join(output_dir, fname)):
+                return None
+        return entry
+
+    def save(self, source_files, output_dir, manifest_entry, output_options=None):
+        """Record the file set, manifest entry and output options; prune removed files."""
+        current = {os.path.abspath(p) for p in source_files}
+        files = self.index["files"]
+
+        for path in list(files):
+            if path not in current:
+                for fname in files[path].get("parts", {}).values():
+                    fpath = os.path.join(self.dir, fname)
+                    if os.path.exists(fpath):
+                        os.remove(fpath)
+                del files[path]
+
+        for path in current:
+            sig = _signature(path)
+            if path not in files or files[path].get("signature") != sig:
+                files[path] = {"signature": sig, "periods": [], "parts": {}}
+
+        self.index["output_dir"] = os.path.abspath(output_dir)
+        self.index["manifest_entry"] = manifest_entry
+        self.index["output_options"] = output_options
+        self._write(self.index_path, self.index)
+
+    def summary(self):
+        """One-line description of what this run recomputed vs reused."""
+        if not self.recomputed and not self.reused:
+            return "no per-file state for this adapter; sources reprocessed in full"
+        periods = sorted({p for ps in self.recomputed.values() for p in ps})
+        reused = self.reused - set(self.recomputed)
+        line = (f"{len(self.recomputed)} file(s) processed, "
+                f"{len(reused)} reused from previous run")
+        if periods:
+            line += f"; periods recomputed: {', '.join(periods)}"
+        return line
+
+    # ── helpers ───────────────────────────────────────────────────────
+    @staticmethod
+    def _write(path, payload):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp_path, path)
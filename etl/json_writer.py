@@ -0,0 +1,131 @@
+"""
+JSON output writer — pretty or compact, atomic, optionally precompressed.
+
+The default output stays the indent=2 JSON the dashboard has always read.
+Compact mode drops the whitespace (which is most of pos_data.json's
+bytes) and serializes with orjson when it is installed, falling back to
+the stdlib encoder.  Every file is written to a temp file and renamed
+into place, so the dashboard never reads a half-written file.
+
+With compression enabled, precompressed siblings (pos_data.json.gz,
+pos_data.json.br) are written next to each file for a static server to
+hand out with Content-Encoding.  fetchJSON needs no change because the
+browser decompresses transparently.  Siblings for encodings that were not
+requested are removed, so a stale .gz can never shadow fresh JSON.
+
+A file whose bytes would not change is left untouched.  With ``stamp_key``
+(e.g. "last_updated") a file that differs only in that top-level stamp
+keeps its old stamp, so unchanged data keeps the same bytes, and the same
+content hash, from one nightly run to the next.
+"""
+
+import gzip
+import json
+import os
+import re
+
+try:
+    import orjson
+except ImportError:  # optional — stdlib json is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional — needed only for .br output
+    brotli = None
+
+# Supported precompressed sibling extensions
+COMPRESSIONS = ("gz", "br")
+
+
+def dumps(data, compact=False):
+    """Serialize ``data`` to UTF-8 JSON bytes.
+
+    Pretty output is byte-identical to json.dump(indent=2, default=str).
+    Compact output has no whitespace; values the encoder does not know are
+    passed through str() either way.
+    """
+    if not compact:
+        return json.dumps(data, indent=2, default=str).encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(
+            data, default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def compress(payload, encoding):
+    """Compress JSON bytes for a precompressed sibling ("gz" or "br")."""
+    if encoding == "gz":
+        # mtime=0 keeps the .gz byte-identical across runs with the same data
+        return gzip.compress(payload, compresslevel=9, mtime=0)
+    if encoding == "br":
+        if brotli is None:
+            raise RuntimeError("Brotli output needs the 'brotli' package")
+        return brotli.compress(payload, quality=11)
+    raise ValueError(f"Unknown compression '{encoding}' (expected one of {COMPRESSIONS})")
+
+
+def write_json(path, data, compact=False, compression=(), stamp_key=None):
+    """Atomically write ``data`` to ``path`` plus any precompressed siblings.
+
+    Returns the JSON bytes of the file (uncompressed).
+    """
+    payload = dumps(data, compact)
+    previous = _read_bytes(path)
+    if stamp_key and previous is not None and payload != previous:
+        old_stamp = _top_level_string(previous, stamp_key)
+        if old_stamp is not None and isinstance(data, dict) and stamp_key in data:
+            restamped = dumps({**data, stamp_key: old_stamp}, compact)
+            if restamped == previous:
+                payload = restamped
+
+    unchanged = payload == previous
+    if not unchanged:
+        _write_atomic(path, payload)
+    for encoding in COMPRESSIONS:
+        sibling = f"{path}.{encoding}"
+        if encoding in compression:
+            # An unchanged file keeps a sibling written after it
+            if not (unchanged and _newer_or_same(sibling, path)):
+                _write_atomic(sibling, compress(payload, encoding))
+        elif os.path.exists(sibling):
+            os.remove(sibling)
+    return payload
+
+
+def _read_bytes(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _newer_or_same(path, other):
+    try:
+        return os.path.getmtime(path) >= os.path.getmtime(other)
+    except OSError:
+        return False
+
+
+def _top_level_string(payload, key):
+    """First string value of ``key`` in JSON bytes, or None.
+
+    Every document with a stamp has it among its first keys; a wrong match
+    only means the restamped bytes differ and the file is rewritten.
+    """
+    match = re.search(rb'"' + re.escape(key.encode()) + rb'":\s*"([^"\\]*)"', payload)
+    return match.group(1).decode("utf-8") if match else None
+
+
+def _write_atomic(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,298 @@
+"""
+Run metrics — per-stage timings, row counters and peak memory per adapter.
+
+Every adapter carries an AdapterMetrics; BaseAdapter.run() times extract,
+transform and load with it, the read helpers count rows parsed, and
+keep_rows() counts rows dropped by reason.  run_etl writes the results next
+to the manifest as etl_metrics.json (and, with --metrics-prom, as a
+Prometheus textfile for node_exporter):
+
+    {
+      "generated_at": "...", "total_seconds": 12.3, "jobs": 1,
+      "retailers": {
+        "ngvc": {
+          "status": "ok", "seconds": 4.1, "rows_per_second": 51234.5,
+          "peak_rss_bytes": 312475648,
+          "stages": {"extract": {"seconds", "cpu_seconds", "peak_rss_bytes"}, ...},
+          "counters": {"rows_parsed": 210000, "rows_dropped": 120,
+                       "rows_dropped_by_reason": {"no UPC": 120},
+                       "upcs": 540, "periods": 36, "products": 540,
+                       "files_written": 3, "bytes_written": 1048576}
+        }
+      }
+    }
+
+Peak RSS is per adapter on Linux, where the kernel's high-water mark is
+reset before each adapter (/proc/self/clear_refs); elsewhere it is the
+process peak so far.  With --profile each adapter also runs under cProfile
+(or pyinstrument, when installed) and the profile path is recorded.
+"""
+
+import contextlib
+import os
+import platform
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # optional — only for --profile pyinstrument
+    PyinstrumentProfiler = None
+
+METRICS_FILE = "etl_metrics.json"
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+# ── memory ────────────────────────────────────────────────────────────
+def reset_peak_rss():
+    """Reset this process's peak-RSS high-water mark; False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process (since the last reset on Linux)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rows(parsed):
+    """Rows in a parsed frame, or in a dict/list of frames."""
+    if hasattr(parsed, "shape"):
+        return len(parsed)
+    if isinstance(parsed, dict):
+        return sum(_rows(v) for v in parsed.values())
+    if isinstance(parsed, (list, tuple)):
+        return sum(_rows(v) for v in parsed)
+    return 0
+
+
+# ── per-adapter metrics ───────────────────────────────────────────────
+class AdapterMetrics:
+    """Stage timings, counters and peak memory of one adapter run."""
+
+    def __init__(self, retailer_key):
+        self.retailer_key = retailer_key
+        self.stages = {}
+        self.counters = {"rows_parsed": 0, "rows_dropped": 0}
+        self.dropped_by_reason = {}
+        self.status = "ok"
+        self.profile = None
+        self.streams = []  # XlsxBatchReaders, counted once consumed
+        self._started = None
+        self._seconds = 0.0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time one stage (wall and CPU) and record the peak RSS reached."""
+        if self._started is None:
+            self._started = time.perf_counter()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.stages[name] = {
+                "seconds": round(time.perf_counter() - wall, 4),
+                "cpu_seconds": round(time.process_time() - cpu, 4),
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+            self._seconds = time.perf_counter() - self._started
+
+    def add(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def parsed(self, result):
+        """Count the rows of a freshly parsed frame (or dict of frames); return it."""
+        self.add("rows_parsed", _rows(result))
+        return result
+
+    def dropped(self, reason, n):
+        if n:
+            self.add("rows_dropped", n)
+            self.dropped_by_reason[reason] = self.dropped_by_reason.get(reason, 0) + n
+
+    def snapshot(self):
+        """Counters to ship back from a worker process (see merge())."""
+        self._count_streams()
+        return {"counters": dict(self.counters), "dropped": dict(self.dropped_by_reason)}
+
+    def merge(self, snapshot):
+        """Add a worker's snapshot() counters to these."""
+        for counter, n in snapshot["counters"].items():
+            self.add(counter, n)
+        for reason, n in snapshot["dropped"].items():
+            self.dropped_by_reason[reason] = self.dropped_by_reason.get(reason, 0) + n
+
+    def _count_streams(self):
+        for reader in self.streams:
+            self.add("rows_parsed", reader.rows_read)
+        self.streams = []
+
+    def finish(self, pos_data, file_info):
+        """Record output counts: UPCs, periods, products and files written."""
+        self._count_streams()
+        pos_data = pos_data or {}
+        periods = pos_data.get("periods", {})
+        upcs = set()
+        for block in ("periods", "weekly_periods"):
+            for upc_metrics in pos_data.get(block, {}).values():
+                upcs.update(upc_metrics)
+        self.counters.update({
+            "upcs": len(upcs),
+            "periods": len(periods),
+            "products": len(pos_data.get("products", [])),
+            "files_written": len(file_info),
+            "bytes_written": sum(info["bytes"] for info in file_info.values()),
+        })
+        if pos_data.get("weekly_periods"):
+            self.counters["weekly_periods"] = len(pos_data["weekly_periods"])
+
+    def as_dict(self):
+        self._count_streams()
+        seconds = round(self._seconds, 4)
+        rows = self.counters.get("rows_parsed", 0)
+        peaks = [s["peak_rss_bytes"] for s in self.stages.values()
+                 if s["peak_rss_bytes"] is not None]
+        result = {
+            "status": self.status,
+            "seconds": seconds,
+            "rows_per_second": round(rows / seconds, 1) if seconds and rows else None,
+            "peak_rss_bytes": max(peaks) if peaks else None,
+            "stages": self.stages,
+            "counters": dict(self.counters, rows_dropped_by_reason=self.dropped_by_reason),
+        }
+        if self.profile:
+            result["profile"] = self.profile
+        return result
+
+
+# ── profiling ─────────────────────────────────────────────────────────
+@contextlib.contextmanager
+def profiled(kind, profile_dir, name, metrics):
+    """Run the block under ``kind`` ("cprofile"/"pyinstrument"); None = off.
+
+    cProfile output goes to <profile_dir>/<name>.prof (open with snakeviz
+    or pstats), pyinstrument's to <profile_dir>/<name>.html.
+    """
+    if kind is None:
+        yield
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+    if kind == "pyinstrument":
+        if PyinstrumentProfiler is None:
+            raise RuntimeError("--profile pyinstrument needs the 'pyinstrument' package")
+        profiler = PyinstrumentProfiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path = os.path.join(profile_dir, f"{name}.html")
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+            metrics.profile = path
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        metrics.profile = path
+        print(f"[{name}] Profile written to {path}; top functions by cumulative time:")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(12)
+
+
+# ── run files ─────────────────────────────────────────────────────────
+def run_metrics(retailers, total_seconds, jobs):
+    """The etl_metrics.json document for one run."""
+    children = None
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        children = children if sys.platform == "darwin" else children * 1024
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "jobs": jobs,
+        "total_seconds": round(total_seconds, 4),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "children_peak_rss_bytes": children or None,
+        "retailers": retailers,
+    }
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(metrics):
+    """Prometheus text exposition of an etl_metrics.json document."""
+    lines = []
+
+    def gauge(name, help_text, samples):
+        lines.append(f"# HELP pos_etl_{name} {help_text}")
+        lines.append(f"# TYPE pos_etl_{name} gauge")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"pos_etl_{name}{{{label_text}}} {value}" if label_text
+                         else f"pos_etl_{name} {value}")
+
+    retailers = metrics["retailers"]
+    gauge("success", "1 if the retailer's last ETL run succeeded",
+          [({"retailer": k}, int(m["status"] != "failed")) for k, m in retailers.items()])
+    gauge("seconds", "Wall time of the retailer's ETL run",
+          [({"retailer": k}, m["seconds"]) for k, m in retailers.items()])
+    gauge("stage_seconds", "Wall time of one ETL stage",
+          [({"retailer": k, "stage": stage}, s["seconds"])
+           for k, m in retailers.items() for stage, s in m["stages"].items()])
+    gauge("stage_cpu_seconds", "CPU time of one ETL stage",
+          [({"retailer": k, "stage": stage}, s["cpu_seconds"])
+           for k, m in retailers.items() for stage, s in m["stages"].items()])
+    gauge("peak_rss_bytes", "Peak resident memory during the retailer's run",
+          [({"retailer": k}, m["peak_rss_bytes"]) for k, m in retailers.items()])
+    gauge("rows_per_second", "Source rows parsed per second",
+          [({"retailer": k}, m["rows_per_second"]) for k, m in retailers.items()])
+    for counter in ("rows_parsed", "rows_dropped", "upcs", "periods", "products",
+                    "bytes_written"):
+        gauge(counter, f"{counter.replace('_', ' ').capitalize()} in the last run",
+              [({"retailer": k}, m["counters"].get(counter)) for k, m in retailers.items()])
+    gauge("run_seconds", "Wall time of the whole ETL run", [({}, metrics["total_seconds"])])
+    gauge("last_run_timestamp_seconds", "When the last ETL run finished",
+          [({}, int(time.time()))])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, metrics):
+    """Write the textfile atomically, as node_exporter's collector requires."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text(metrics))
+    os.replace(tmp, path)
@@ -0,0 +1,88 @@
+"""
+Parse cache — reuse parsed Excel/CSV frames across ETL runs.
+
+Source workbooks in the SharePoint tree are almost never edited once they
+land (history folders only grow), yet every run re-parses all of them with
+openpyxl.  ParseCache stores each parsed sheet on disk keyed by the source
+file's path, size and mtime plus the exact read options, so later runs load
+the frame directly instead of re-reading the XLSX.
+
+Frames are stored with pandas' pickle format rather than Parquet/Feather:
+sheets read with header=None hold mixed str/number object columns that the
+Arrow formats cannot round-trip, and the cached frame must be identical to
+a fresh parse so adapter output does not change.
+"""
+
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+# Bump when the cache layout or key scheme changes to orphan old entries.
+CACHE_VERSION = 1
+
+
+class ParseCache:
+    """Disk cache of parsed DataFrames keyed by source file identity."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    # ── public API ────────────────────────────────────────────────────
+    def read_excel(self, path, **kwargs):
+        """Cached equivalent of pd.read_excel(path, **kwargs)."""
+        return self.cached(path, "excel", kwargs, lambda: pd.read_excel(path, **kwargs))
+
+    def read_csv(self, path, **kwargs):
+        """Cached equivalent of pd.read_csv(path, **kwargs)."""
+        return self.cached(path, "csv", kwargs, lambda: pd.read_csv(path, **kwargs))
+
+    def cached(self, path, kind, options, parse):
+        """Return parse() for ``path``, cached under (kind, options).
+
+        ``parse`` may return any picklable object (e.g. a dict of frames
+        from a multi-sheet reader); ``options`` must capture everything
+        besides the file itself that changes the result.
+        """
+        cache_path = os.path.join(self.cache_dir, f"{self._key(kind, path, options)}.pkl")
+
+        if os.path.isfile(cache_path):
+            try:
+                result = pd.read_pickle(cache_path)
+                self.hits += 1
+                return result
+            except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                # Truncated or stale entry — fall through and re-parse
+                pass
+
+        result = parse()
+        self.misses += 1
+
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            pd.to_pickle(result, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"  WARNING: Could not write parse cache entry for "
+                  f"{os.path.basename(path)}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return result
+
+    # ── helpers ───────────────────────────────────────────────────────
+    def _key(self, kind, path, kwargs):
+        st = os.stat(path)
+        parts = [
+            str(CACHE_VERSION),
+            pd.__version__,
+            kind,
+            os.path.abspath(path),
+            str(st.st_size),
+            str(st.st_mtime_ns),
+            repr(sorted(kwargs.items())),
+        ]
+        return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
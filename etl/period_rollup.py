@@ -0,0 +1,95 @@
+"""
+Period rollup — aggregate once at the finest grain, derive the coarser ones.
+
+SPINS rows carry a period end date (a week ending for weekly pulls).
+PeriodRollup sums the metric columns once per (UPC, end date), then
+builds each requested grain from that much smaller frame:
+
+    rollup = PeriodRollup("upc_clean", "week_end_date", SUM_COLUMNS)
+    for df in batches:
+        rollup.add(df)
+    rollup.frame("weekly")      # one row per (UPC, week ending)
+    rollup.frame("monthly")     # "YYYY-MM"
+    rollup.frame("quarterly")   # "YYYY-QN"
+    rollup.frame("yearly")      # "YYYY"
+
+Each frame has the key column, a "period" column and the summed metrics,
+sorted by (key, period).  Fine groups are summed in order of first
+appearance, so when every (UPC, end date) occurs once — the normal shape
+of a SPINS pull — a derived month adds the same values in the same order
+as a groupby over the raw rows and the sums match it bit for bit.
+"""
+
+from etl.xlsx_stream import GroupSums
+
+# Grain -> pos_data key holding its periods[period][upc] block
+PERIOD_KEYS = {
+    "monthly": "periods",
+    "weekly": "weekly_periods",
+    "quarterly": "quarterly_periods",
+    "yearly": "yearly_periods",
+}
+
+
+def period_labels(dates, grain):
+    """Period keys for a Series of "YYYY-MM-DD" end dates."""
+    if grain == "weekly":
+        return dates
+    if grain == "monthly":
+        return dates.str.slice(0, 7)
+    if grain == "yearly":
+        return dates.str.slice(0, 4)
+    if grain == "quarterly":
+        quarter = (dates.str.slice(5, 7).astype(int) + 2) // 3
+        return dates.str.slice(0, 4) + "-Q" + quarter.astype(str)
+    raise ValueError(f"Unknown grain '{grain}' (expected one of {list(PERIOD_KEYS)})")
+
+
+def merge_periods(periods, new_periods, sum_keys):
+    """Merge ``new_periods`` into ``periods``, adding ``sum_keys`` where both have a UPC.
+
+    Summed values are rounded to 2 decimals; other keys keep the first value.
+    """
+    for label, upc_metrics in new_periods.items():
+        if label not in periods:
+            periods[label] = upc_metrics
+            continue
+        for upc, metrics in upc_metrics.items():
+            existing = periods[label].get(upc)
+            if existing is None:
+                periods[label][upc] = metrics
+                continue
+            for key in sum_keys:
+                existing[key] = round(existing[key] + metrics[key], 2)
+
+
+class PeriodRollup:
+    """Sums of ``metrics`` per (key, end date), rolled up to any grain."""
+
+    def __init__(self, key, date_col, metrics):
+        self.key = key
+        self.date_col = date_col
+        self.metrics = list(metrics)
+        self._sums = GroupSums([key, date_col], self.metrics)
+        self._fine = None
+
+    def add(self, df):
+        """Fold one batch holding the key, end-date ("YYYY-MM-DD") and metric columns."""
+        self._sums.add(df)
+        self._fine = None
+
+    def frame(self, grain):
+        """Summed frame for ``grain`` with a "period" column, or None if empty."""
+        if self._fine is None:
+            self._fine = self._sums.frame(sort=False)
+        fine = self._fine
+        if fine is None:
+            return None
+
+        fine = fine.assign(period=period_labels(fine[self.date_col], grain))
+        if grain == "weekly":
+            return fine.sort_values([self.key, "period"], kind="stable",
+                                    ignore_index=True)
+        return fine.groupby([self.key, "period"]).agg(
+            {m: "sum" for m in self.metrics}
+        ).reset_index()
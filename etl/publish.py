@@ -0,0 +1,229 @@
+"""
+Staged publishing — swap a whole ETL run into place at once.
+
+Writing straight into public/data means a killed run, or a dashboard fetch
+during a run, can see a manifest that points at files from another run.
+With staged publishing each run writes into a staging directory seeded with
+the live output, the result is checked, and only then is it promoted to a
+numbered version and the output directory (a symlink) is flipped to it with
+a single rename:
+
+    public/data -> ../.etl_versions/20250301T101500-01
+    .etl_versions/
+        20250228T101500-01/     previous versions, kept for rollback
+        20250301T101500-01/     live
+        staging/                the run in progress
+        .lock                   pid of the run holding the staging dir
+
+Files are never modified in place (json_writer replaces them), so the seed
+copy uses hard links and costs almost nothing.  The first staged run moves
+an existing real output directory into the versions directory as the
+initial version.
+"""
+
+import errno
+import json
+import os
+import shutil
+from datetime import datetime
+
+STAGING_NAME = "staging"
+LOCK_NAME = ".lock"
+
+
+class PublishError(RuntimeError):
+    """Raised when a staged run cannot be started, validated or published."""
+
+
+class StagedPublisher:
+    """Versioned output directory with an atomic symlink flip."""
+
+    def __init__(self, output_dir, versions_dir, keep=5):
+        self.output_dir = os.path.abspath(output_dir)
+        self.versions_dir = os.path.abspath(versions_dir)
+        self.keep = max(1, keep)
+        self.staging_dir = os.path.join(self.versions_dir, STAGING_NAME)
+        self._lock_path = os.path.join(self.versions_dir, LOCK_NAME)
+        self._locked = False
+
+    # ── run lifecycle ─────────────────────────────────────────────────
+    def begin(self):
+        """Lock, create the staging directory seeded with the live output; return it."""
+        os.makedirs(self.versions_dir, exist_ok=True)
+        self._acquire_lock()
+        try:
+            self._adopt_real_output_dir()
+            if os.path.exists(self.staging_dir):
+                shutil.rmtree(self.staging_dir)   # left behind by a killed run
+            live = self.current_path()
+            if live is not None:
+                shutil.copytree(live, self.staging_dir, copy_function=_link_or_copy)
+            else:
+                os.makedirs(self.staging_dir)
+        except BaseException:
+            self._release_lock()
+            raise
+        return self.staging_dir
+
+    def validate(self, manifest):
+        """Return a list of problems with the staged output (empty when publishable)."""
+        problems = []
+        for key, entry in manifest.get("retailers", {}).items():
+            for fname in entry.get("data_files", []):
+                path = os.path.join(self.staging_dir, key, fname)
+                if not os.path.isfile(path):
+                    problems.append(f"{key}/{fname}: missing")
+                    continue
+                try:
+                    with open(path, "r") as f:
+                        json.load(f)
+                except (OSError, ValueError) as e:
+                    problems.append(f"{key}/{fname}: unreadable ({e})")
+        if not os.path.isfile(os.path.join(self.staging_dir, "data_manifest.json")):
+            problems.append("data_manifest.json: missing")
+        return problems
+
+    def commit(self):
+        """Promote the staging directory to a new version, flip to it and prune."""
+        try:
+            version = self._new_version_id()
+            target = os.path.join(self.versions_dir, version)
+            os.rename(self.staging_dir, target)
+            self._point_to(target)
+            self.prune()
+            return version
+        finally:
+            self._release_lock()
+
+    def abort(self):
+        """Drop the staging directory; the live output is left untouched."""
+        try:
+            if os.path.exists(self.staging_dir):
+                shutil.rmtree(self.staging_dir)
+        finally:
+            self._release_lock()
+
+    # ── versions ──────────────────────────────────────────────────────
+    def versions(self):
+        """Published version ids, oldest first."""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if name not in (STAGING_NAME, LOCK_NAME)
+            and os.path.isdir(os.path.join(self.versions_dir, name))
+        )
+
+    def current(self):
+        """Version id the output directory points at, or None."""
+        path = self.current_path()
+        if path is None or os.path.dirname(path) != self.versions_dir:
+            return None
+        return os.path.basename(path)
+
+    def current_path(self):
+        """Resolved live output directory, or None if there is none yet."""
+        if os.path.islink(self.output_dir) or os.path.isdir(self.output_dir):
+            path = os.path.realpath(self.output_dir)
+            return path if os.path.isdir(path) else None
+        return None
+
+    def rollback(self, version=None):
+        """Point the output at ``version`` (default: the one before the live one)."""
+        versions = self.versions()
+        current = self.current()
+        if version is None:
+            older = [v for v in versions if current is None or v < current]
+            if not older:
+                raise PublishError("No earlier version to roll back to")
+            version = older[-1]
+        elif version not in versions:
+            raise PublishError(f"Unknown version '{version}'. "
+                               f"Available: {', '.join(versions) or 'none'}")
+        self._acquire_lock()
+        try:
+            self._point_to(os.path.join(self.versions_dir, version))
+        finally:
+            self._release_lock()
+        return version
+
+    def prune(self):
+        """Delete all but the newest ``keep`` versions (never the live one)."""
+        current = self.current()
+        for version in self.versions()[:-self.keep]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.versions_dir, version))
+
+    # ── helpers ───────────────────────────────────────────────────────
+    def _new_version_id(self):
+        """Timestamp plus counter ("20250301T101500-01"), so ids sort by age."""
+        base = datetime.now().strftime("%Y%m%dT%H%M%S")
+        n = 1
+        while os.path.exists(os.path.join(self.versions_dir, f"{base}-{n:02d}")):
+            n += 1
+        return f"{base}-{n:02d}"
+
+    def _point_to(self, target):
+        """Atomically (re)point the output directory symlink at ``target``."""
+        parent = os.path.dirname(self.output_dir)
+        os.makedirs(parent, exist_ok=True)
+        tmp_link = f"{self.output_dir}.{os.getpid()}.link"
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(os.path.relpath(target, parent), tmp_link)
+        os.replace(tmp_link, self.output_dir)
+
+    def _adopt_real_output_dir(self):
+        """Move a plain output directory into the versions dir (first staged run)."""
+        if os.path.islink(self.output_dir) or not os.path.isdir(self.output_dir):
+            return
+        version = self._new_version_id()
+        target = os.path.join(self.versions_dir, version)
+        shutil.move(self.output_dir, target)
+        self._point_to(target)
+        print(f"  Moved existing output into {target} (output is now a symlink)")
+
+    def _acquire_lock(self):
+        while True:
+            try:
+                fd = os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                pid = _read_pid(self._lock_path)
+                if pid is not None and _pid_alive(pid):
+                    raise PublishError(f"Another ETL run (pid {pid}) is publishing "
+                                       f"to {self.versions_dir}")
+                os.remove(self._lock_path)   # stale lock from a killed run
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            self._locked = True
+            return
+
+    def _release_lock(self):
+        if self._locked:
+            self._locked = False
+            if os.path.exists(self._lock_path):
+                os.remove(self._lock_path)
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _read_pid(path):
+    try:
+        with open(path, "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
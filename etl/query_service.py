@@ -0,0 +1,486 @@
+"""
+Query service — dashboard slices served as JSON over HTTP.
+
+The dashboard downloads a retailer's whole pos_data.json and builds the
+monthly / quarterly / YTD / weekly slice in the browser.  This asyncio
+server builds the same slice objects (etl/slices.py) from the ETL output,
+so a client fetches only the slice it shows:
+
+    python -m etl.query_service --output-dir public/data --port 8765
+
+    GET /api/retailers                       manifest entries (display name, hash, range)
+    GET /api/<retailer>/periods              period lists, primary metric, quarter overview
+    GET /api/<retailer>/monthly/2025-06      computeMonthlySlice()
+    GET /api/<retailer>/quarterly/2025-Q2    computeQuarterlySlice()
+    GET /api/<retailer>/weekly/2025-06-07    computeWeeklySlice()
+    GET /api/<retailer>/ytd                  computeYTDSlice()
+    GET /api/health                          cache counters
+
+Encoded responses are kept in an LRU cache bounded by --cache-mb, and the
+parsed output of the last --datasets retailers in a second one.  Both are
+keyed by the retailer's manifest content_hash.  data_manifest.json is
+stat()ed on every request (it is replaced atomically, and a staged publish
+flips the directory symlink), and a retailer whose hash changed is dropped
+from both caches.
+
+ETags are weak and derived from the content hash, so a revalidation
+answers 304 without building the slice.  Bodies of 1 KB or more are
+gzipped once, when cached, for clients that accept it.  Slow work
+(parsing, building, compressing) runs in a thread pool so the event loop
+keeps serving cached slices, and concurrent requests for one slice share
+a single build.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+
+try:
+    import orjson
+except ImportError:  # optional — stdlib json is used instead
+    orjson = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from etl.rollups import build_rollups
+from etl.slices import monthly_slice, period_options, quarterly_slice, weekly_slice, ytd_slice
+
+DEFAULT_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "public", "data")
+MANIFEST_FILE = "data_manifest.json"
+
+# Bumped when a slice's shape changes, so old ETags stop matching
+SLICE_VERSION = 1
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+KEEPALIVE_SECONDS = 15
+MAX_HEADER_LINES = 100
+
+PERIOD_PATTERNS = {
+    "monthly": re.compile(r"\d{4}-\d{2}"),
+    "quarterly": re.compile(r"\d{4}-Q[1-4]"),
+    "weekly": re.compile(r"\d{4}-\d{2}-\d{2}"),
+}
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class QueryError(Exception):
+    """A request that maps to an HTTP error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ── caches ────────────────────────────────────────────────────────────
+class LRUCache:
+    """Least-recently-used mapping bounded by total weight (1 per entry by default)."""
+
+    def __init__(self, capacity, weigh=None):
+        self.capacity = capacity
+        self.weigh = weigh or (lambda value: 1)
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.pop(key)
+        weight = self.weigh(value)
+        if weight > self.capacity:
+            return
+        self._items[key] = value
+        self.weight += weight
+        while self.weight > self.capacity:
+            _, old = self._items.popitem(last=False)
+            self.weight -= self.weigh(old)
+
+    def pop(self, key):
+        value = self._items.pop(key, None)
+        if value is not None:
+            self.weight -= self.weigh(value)
+        return value
+
+    def drop(self, retailers):
+        """Remove every entry whose key starts with one of ``retailers``."""
+        for key in [k for k in self._items if k[0] in retailers]:
+            self.pop(key)
+
+
+class Encoded:
+    """A response body, its gzip copy (when worth it) and its ETag."""
+
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, body, etag=None):
+        self.body = body
+        self.gzipped = (gzip.compress(body, GZIP_LEVEL, mtime=0)
+                        if len(body) >= GZIP_MIN_BYTES else None)
+        self.etag = etag or f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+    @property
+    def size(self):
+        return len(self.body) + len(self.gzipped or b"")
+
+
+class RetailerData:
+    """One retailer's parsed pos_data periods and rollups."""
+
+    def __init__(self, retailer_dir, entry):
+        pos_data = _read_json(os.path.join(retailer_dir, "pos_data.json"))
+        self.periods = pos_data.get("periods") or {}
+        self.weekly_periods = pos_data.get("weekly_periods") or {}
+        rollups_path = os.path.join(retailer_dir, "rollups.json")
+        if "rollups.json" in entry.get("data_files", []) and os.path.isfile(rollups_path):
+            self.rollups = _read_json(rollups_path)
+        else:
+            self.rollups = build_rollups(self.periods)
+        self.options = period_options(pos_data, self.rollups)
+
+    def build(self, grain, period):
+        """The slice object for ``grain`` / ``period``; None if there is no such period."""
+        if grain == "periods":
+            return self.options
+        if grain == "ytd":
+            return ytd_slice(self.rollups)
+        if grain == "monthly":
+            if period not in self.periods:
+                return None
+            return monthly_slice(self.periods, period, self.rollups["month_totals"])
+        if grain == "quarterly":
+            return quarterly_slice(self.rollups, self.periods, period)
+        if grain == "weekly":
+            if period not in self.weekly_periods:
+                return None
+            return weekly_slice(self.weekly_periods, period)
+        raise QueryError(404, f"Unknown grain '{grain}'")
+
+
+# ── service ───────────────────────────────────────────────────────────
+class QueryService:
+    """Slice lookups over one ETL output directory, cached and invalidated by the manifest."""
+
+    def __init__(self, output_dir, cache_bytes=128 * 1024 * 1024, datasets=4,
+                 allow_origin=None, verbose=False):
+        self.output_dir = os.path.abspath(output_dir)
+        self.responses = LRUCache(cache_bytes, weigh=lambda encoded: encoded.size)
+        self.datasets = LRUCache(datasets)
+        self.allow_origin = allow_origin
+        self.verbose = verbose
+        self.manifest = {}
+        self.root = self.output_dir
+        self._signature = None
+        self._inflight = {}
+
+    # ── manifest ──
+    def refresh(self):
+        """Reload the manifest if it changed; drop retailers whose content changed."""
+        path = os.path.join(self.output_dir, MANIFEST_FILE)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise QueryError(503, f"No {MANIFEST_FILE} in {self.output_dir}") from None
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return
+        # Read through the resolved path, so a symlink flip mid-read cannot mix versions
+        root = os.path.realpath(self.output_dir)
+        try:
+            manifest = _read_json(os.path.join(root, MANIFEST_FILE))
+        except (OSError, ValueError) as e:
+            raise QueryError(503, f"Cannot read {MANIFEST_FILE}: {e}") from None
+        old = self.manifest.get("retailers", {})
+        new = manifest.get("retailers", {})
+        changed = {key for key in old.keys() | new.keys()
+                   if (old.get(key) or {}).get("content_hash")
+                   != (new.get(key) or {}).get("content_hash")}
+        if self._signature is not None and changed:
+            self.responses.drop(changed)
+            self.datasets.drop(changed)
+            print(f"  [query] manifest changed: {', '.join(sorted(changed))}")
+        self.manifest, self.root, self._signature = manifest, root, signature
+
+    def entry(self, retailer):
+        entry = self.manifest.get("retailers", {}).get(retailer)
+        if entry is None:
+            raise QueryError(404, f"Unknown retailer '{retailer}'")
+        return entry
+
+    def etag(self, retailer, grain, period):
+        """ETag known before building, from the content hash; None without one."""
+        content_hash = self.entry(retailer).get("content_hash")
+        if not content_hash:
+            return None
+        tag = "-".join(filter(None, (str(SLICE_VERSION), content_hash[:20], grain, period)))
+        return f'W/"{tag}"'
+
+    # ── lookups ──
+    async def _shared(self, key, build):
+        """Run ``build`` in the thread pool once per key, however many requests wait on it."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(None, build)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded: a client that disconnects must not cancel the others' build
+        return await asyncio.shield(future)
+
+    async def dataset(self, retailer):
+        entry = self.entry(retailer)
+        key = (retailer, entry.get("content_hash"))
+        data = self.datasets.get(key)
+        if data is None:
+            retailer_dir = os.path.join(self.root, retailer)
+            started = time.perf_counter()
+            data = await self._shared(("data",) + key, lambda: RetailerData(retailer_dir, entry))
+            if key not in self.datasets:
+                self.datasets.put(key, data)
+                print(f"  [query] loaded {retailer} in {time.perf_counter() - started:.2f}s")
+        return data
+
+    async def response(self, retailer, grain, period=""):
+        """Encoded slice for one retailer / grain / period (cached)."""
+        etag = self.etag(retailer, grain, period)
+        key = (retailer, self.entry(retailer).get("content_hash"), grain, period)
+        encoded = self.responses.get(key)
+        if encoded is not None:
+            return encoded
+        data = await self.dataset(retailer)
+
+        def build():
+            obj = data.build(grain, period)
+            if obj is None:
+                raise QueryError(404, f"No {grain} period '{period}' for '{retailer}'")
+            return Encoded(_dumps(obj), etag)
+
+        encoded = await self._shared(key, build)
+        self.responses.put(key, encoded)
+        return encoded
+
+    def retailers(self):
+        fields = ("display_name", "time_grain", "date_range", "has_weekly", "product_count",
+                  "content_hash")
+        return {
+            key: {name: entry[name] for name in fields if name in entry}
+            for key, entry in self.manifest.get("retailers", {}).items()
+        }
+
+    def health(self):
+        return {
+            "status": "ok",
+            "output_dir": self.root,
+            "retailers": len(self.manifest.get("retailers", {})),
+            "responses": {"entries": len(self.responses), "bytes": self.responses.weight,
+                          "hits": self.responses.hits, "misses": self.responses.misses},
+            "datasets": {"entries": len(self.datasets), "hits": self.datasets.hits,
+                         "misses": self.datasets.misses},
+        }
+
+    # ── routing ──
+    async def route(self, path, headers):
+        """(status, Encoded or None, etag) for a GET of ``path``."""
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        if not parts or parts[0] != "api" or len(parts) < 2:
+            raise QueryError(404, "Not found")
+        self.refresh()
+        if parts[1:] == ["health"]:
+            return 200, Encoded(_dumps(self.health())), None
+        if parts[1:] == ["retailers"]:
+            return 200, Encoded(_dumps(self.retailers())), None
+
+        retailer, rest = parts[1], parts[2:]
+        if rest in (["periods"], ["ytd"]):
+            grain, period = rest[0], ""
+        elif len(rest) == 2 and rest[0] in PERIOD_PATTERNS:
+            grain, period = rest
+            if not PERIOD_PATTERNS[grain].fullmatch(period):
+                raise QueryError(400, f"Bad {grain} period '{period}'")
+        else:
+            raise QueryError(404, "Not found")
+
+        if_none_match = headers.get("if-none-match", "")
+        etag = self.etag(retailer, grain, period)
+        if etag and _etag_matches(if_none_match, etag):
+            return 304, None, etag
+        encoded = await self.response(retailer, grain, period)
+        if _etag_matches(if_none_match, encoded.etag):
+            return 304, None, encoded.etag
+        return 200, encoded, encoded.etag
+
+    # ── HTTP ──
+    async def handle(self, reader, writer):
+        """One client connection: HTTP/1.1 requests until close or idle timeout."""
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                request = line.decode("latin-1").split()
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                else:
+                    await self._send(writer, 400, None, error="Too many headers")
+                    break
+                if len(request) != 3:
+                    await self._send(writer, 400, None, error="Bad request line")
+                    break
+                method, target, version = request
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              if version == "HTTP/1.1"
+                              else headers.get("connection", "").lower() == "keep-alive")
+
+                started = time.perf_counter()
+                status, encoded, etag, error = 200, None, None, None
+                if method not in ("GET", "HEAD"):
+                    status, error = 405, f"{method} not allowed"
+                else:
+                    try:
+                        status, encoded, etag = await self.route(urlsplit(target).path, headers)
+                    except QueryError as e:
+                        status, error = e.status, str(e)
+                    except Exception as e:  # keep serving other requests
+                        print(f"  [query] ERROR {target}: {type(e).__name__}: {e}")
+                        status, error = 500, "Internal error"
+                await self._send(writer, status, encoded, etag, error, keep_alive,
+                                 gzip_ok=_accepts_gzip(headers.get("accept-encoding", "")),
+                                 head=method == "HEAD")
+                if self.verbose:
+                    print(f"  [query] {method} {target} {status} "
+                          f"{(time.perf_counter() - started) * 1000:.1f}ms")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, encoded, etag=None, error=None, keep_alive=False,
+                    gzip_ok=False, head=False):
+        headers = {"Content-Type": "application/json; charset=utf-8",
+                   "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if error is not None:
+            encoded = Encoded(_dumps({"error": error}))
+        body = b""
+        if encoded is not None:
+            body = encoded.body
+            if gzip_ok and encoded.gzipped is not None:
+                body = encoded.gzipped
+                headers["Content-Encoding"] = "gzip"
+        if etag:
+            headers["ETag"] = etag
+        if self.allow_origin:
+            headers["Access-Control-Allow-Origin"] = self.allow_origin
+        headers["Content-Length"] = str(len(body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        head_lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        head_lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1"))
+        if not head and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+
+def _etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)."""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _accepts_gzip(header):
+    for token in header.split(","):
+        name, _, params = token.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle, host, port)
+    service.refresh()
+    addresses = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}"
+                          for s in server.sockets)
+    print(f"Serving {len(service.manifest.get('retailers', {}))} retailer(s) from "
+          f"{service.output_dir} on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard slices from the ETL output")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help=f"ETL output directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-mb", type=float, default=128,
+                        help="Size of the encoded-response cache (default: 128)")
+    parser.add_argument("--datasets", type=int, default=4,
+                        help="Retailers kept parsed in memory (default: 4)")
+    parser.add_argument("--allow-origin", default=None,
+                        help="Access-Control-Allow-Origin value, e.g. http://localhost:5173")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    service = QueryService(args.output_dir, int(args.cache_mb * 1024 * 1024), args.datasets,
+                           args.allow_origin, args.verbose)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except QueryError as e:
+        print(f"ERROR: {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
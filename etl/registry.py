@@ -0,0 +1,174 @@
+"""
+Adapter registry — retailer keys mapped to adapter classes, imported lazily.
+
+Importing an adapter imports pandas and openpyxl, which is most of the
+ETL's startup time.  The registry holds "module:Class" import paths
+instead, and imports an adapter the first time its class is looked up, so
+``--help``, ``--list`` or a run of one retailer only pay for what they use:
+
+    ADAPTER_REGISTRY["tvs"]            # imports etl.adapters.tvs_adapter
+    list(ADAPTER_REGISTRY)             # keys only, nothing imported
+    ADAPTER_REGISTRY.metadata("tvs")   # display_name, source_folder, source_patterns
+
+Built-in entries carry the class attributes that --sync, --watch and
+--changed-only route files by, so those paths import no adapter until one
+runs.  Plugins have no such metadata; their class is imported to read it.
+
+Adapters from other packages register through the "pos_etl.adapters"
+entry-point group, e.g. in the package's pyproject.toml:
+
+    [project.entry-points."pos_etl.adapters"]
+    wholefoods = "pos_wholefoods.adapter:WholeFoodsAdapter"
+
+The entry-point name is the retailer key.  Built-in keys cannot be
+overridden by a plugin.
+"""
+
+from collections.abc import Mapping
+from importlib import import_module
+from importlib.metadata import entry_points
+
+ENTRY_POINT_GROUP = "pos_etl.adapters"
+
+# Adapter class attributes readable without importing the adapter
+METADATA_FIELDS = ("display_name", "source_folder", "source_patterns")
+
+# Built-in adapters: key -> "module:Class" plus METADATA_FIELDS, which must
+# match the class (checked when it is imported)
+BUILTIN_ADAPTERS = {
+    "ngvc": {
+        "adapter": "etl.adapters.ngvc_adapter:NGVCAdapter",
+        "display_name": "NGVC",
+        "source_folder": "NGVC",
+        "source_patterns": (
+            "NGVC/Irwin_Naturals_NGVC.xlsx",
+            "NGVC/P12 - Irwin_Naturals_Pull.xlsx",
+            "NGVC/Irwin Naturals Units*.xlsx",
+        ),
+    },
+    "sprouts": {
+        "adapter": "etl.adapters.sprouts_adapter:SproutsAdapter",
+        "display_name": "Sprouts",
+        "source_folder": "Sprouts",
+        "source_patterns": ("Sprouts/45934e10-2794-4865-a52a-d2c5b10f6374.xlsx",),
+    },
+    "iherb": {
+        "adapter": "etl.adapters.iherb_adapter:IHerbAdapter",
+        "display_name": "iHerb",
+        "source_folder": "iHerb",
+        "source_patterns": ("iHerb/*/*_IRW.csv",),
+    },
+    "tvs": {
+        "adapter": "etl.adapters.tvs_adapter:TVSAdapter",
+        "display_name": "TVS",
+        "source_folder": "TVS",
+        "source_patterns": ("TVS/Irwin Naturals_All In Stock*.xlsx",),
+    },
+    "freshthyme": {
+        "adapter": "etl.adapters.freshthyme_adapter:FreshThymeAdapter",
+        "display_name": "FreshThyme",
+        "source_folder": "FreshThyme",
+        "source_patterns": ("FreshThyme/FreshThyme_*.xlsx",),
+    },
+    "vitacost": {
+        "adapter": "etl.adapters.vitacost_adapter:VitacostAdapter",
+        "display_name": "Vitacost",
+        "source_folder": "Vitacost",
+        "source_patterns": ("Vitacost/History/*OMNI*.xlsx",),
+    },
+}
+
+
+def _plugin_entry_points():
+    """Entry points in the adapter group, across importlib.metadata versions."""
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))  # Python < 3.10
+
+
+class AdapterRegistry(Mapping):
+    """Read-only mapping of retailer key -> adapter class, imported on lookup."""
+
+    def __init__(self, builtins):
+        self._specs = {key: info["adapter"] for key, info in builtins.items()}
+        self._metadata = {key: {name: info[name] for name in METADATA_FIELDS}
+                          for key, info in builtins.items()}
+        self._origins = {key: "built-in" for key in builtins}
+        self._entry_points = {}
+        self._classes = {}
+        self._discovered = False
+
+    def _discover(self):
+        """Add plugin adapters from installed entry points (once)."""
+        if self._discovered:
+            return
+        self._discovered = True
+        for ep in _plugin_entry_points():
+            if ep.name in self._specs:
+                print(f"WARNING: ignoring adapter plugin '{ep.name}' ({ep.value}): "
+                      f"the key is already registered")
+                continue
+            self._specs[ep.name] = ep.value
+            self._entry_points[ep.name] = ep
+            dist = getattr(ep, "dist", None)
+            self._origins[ep.name] = f"plugin ({dist.name})" if dist else "plugin"
+
+    def spec(self, key):
+        """The "module:Class" path of ``key``, without importing it."""
+        self._discover()
+        return self._specs[key]
+
+    def metadata(self, key):
+        """{display_name, source_folder, source_patterns} of ``key``.
+
+        Imports nothing for built-ins; a plugin's class is imported to read them.
+        """
+        self._discover()
+        if key not in self._metadata:
+            cls = self[key]
+            self._metadata[key] = {name: getattr(cls, name) for name in METADATA_FIELDS}
+        return self._metadata[key]
+
+    def origin(self, key):
+        """Where ``key`` comes from: "built-in" or "plugin (<distribution>)"."""
+        self._discover()
+        return self._origins[key]
+
+    def __getitem__(self, key):
+        cls = self._classes.get(key)
+        if cls is not None:
+            return cls
+        self._discover()
+        if key in self._entry_points:
+            cls = self._entry_points[key].load()
+        else:
+            module_name, _, class_name = self._specs[key].partition(":")
+            cls = getattr(import_module(module_name), class_name)
+
+        from etl.base_adapter import BaseAdapter
+
+        if not (isinstance(cls, type) and issubclass(cls, BaseAdapter)):
+            raise TypeError(f"adapter '{key}' ({self._specs[key]}) is not a BaseAdapter")
+        stale = [name for name, value in self._metadata.get(key, {}).items()
+                 if getattr(cls, name) != value]
+        if stale:
+            print(f"WARNING: registry metadata for '{key}' differs from {self._specs[key]}: "
+                  f"{', '.join(stale)}")
+        self._classes[key] = cls
+        return cls
+
+    def __contains__(self, key):
+        self._discover()
+        return key in self._specs
+
+    def __iter__(self):
+        self._discover()
+        return iter(self._specs)
+
+    def __len__(self):
+        self._discover()
+        return len(self._specs)
+
+
+ADAPTER_REGISTRY = AdapterRegistry(BUILTIN_ADAPTERS)
@@ -0,0 +1,232 @@
+"""
+Precomputed quarter and YTD rollups (rollups.json).
+
+The dashboard's quarterly and YTD views (computeQuarterlySlice,
+computeYTDSlice and getAllQuarterOverview in src/utils/timePeriodUtils.js)
+walk every UPC of every period on each click.  build_rollups() does the
+same work once per ETL run, with the same comparable-months rules, so the
+browser only looks values up:
+
+    {
+      "year_a": "2024", "year_b": "2025", "primary_metric": "dollars",
+      "month_totals": {"2025-01": {"dollars": ..., "units": ..., "product_count": ...}},
+      "quarters": {"2025-Q1": {months, comparison_months, full_prev_months,
+                               current, comparison, full_prev, totals,
+                               months_with_data, comparable_months, is_complete,
+                               qep_dollars, qep_units, period_label}},
+      "ytd": {... same blocks ..., yep_dollars, yep_units,
+              pace_dollars_pct, pace_units_pct},
+      "quarter_overview": [{quarter, display_label, current_total, ...}]
+    }
+
+current / comparison / full_prev map UPC -> {"dollars", "units"}.  Sums
+are taken in the same order as the JavaScript, so totals match it exactly.
+"""
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+QUARTER_MONTHS = {
+    "Q1": ["01", "02", "03"],
+    "Q2": ["04", "05", "06"],
+    "Q3": ["07", "08", "09"],
+    "Q4": ["10", "11", "12"],
+}
+
+
+def build_rollups(periods):
+    """Quarter, YTD and quarter-overview rollups for a periods[YYYY-MM][upc] dict."""
+    all_years = sorted({key[:4] for key in periods})
+    year_a, year_b = _year_pair(all_years)
+    years = [year_b] if year_a == year_b else [year_a, year_b]
+
+    quarters = {}
+    for year in years:
+        for q in QUARTER_MONTHS:
+            if any(f"{year}-{mm}" in periods for mm in QUARTER_MONTHS[q]):
+                quarters[f"{year}-{q}"] = _quarter(periods, all_years, year, q)
+
+    primary_metric = _primary_metric(periods)
+    return {
+        "year_a": year_a,
+        "year_b": year_b,
+        "primary_metric": primary_metric,
+        "month_totals": {key: period_totals(periods[key]) for key in sorted(periods)},
+        "quarters": quarters,
+        "ytd": _ytd(periods, year_a, year_b),
+        "quarter_overview": [
+            _overview_row(key, rollup, primary_metric == "dollars")
+            for key, rollup in quarters.items()
+        ],
+    }
+
+
+def quarter_rollup(periods, quarter_key):
+    """The rollup of any "YYYY-QN" with data (not just the latest two years); else None."""
+    year, _, q = quarter_key.partition("-")
+    if q not in QUARTER_MONTHS or not any(f"{year}-{mm}" in periods
+                                          for mm in QUARTER_MONTHS[q]):
+        return None
+    return _quarter(periods, sorted({key[:4] for key in periods}), year, q)
+
+
+# ── slices ────────────────────────────────────────────────────────────
+def _quarter(periods, all_years, year, q):
+    """computeQuarterlySlice() for one "YYYY-QN"."""
+    q_months = QUARTER_MONTHS[q]
+    idx = all_years.index(year)
+    prev_year = all_years[idx - 1] if idx > 0 else None
+
+    current_keys = [f"{year}-{mm}" for mm in q_months if f"{year}-{mm}" in periods]
+    current_months = {k[5:7] for k in current_keys}
+    full_prev_keys = (
+        [f"{prev_year}-{mm}" for mm in q_months if f"{prev_year}-{mm}" in periods]
+        if prev_year else []
+    )
+    comparison_keys = [k for k in full_prev_keys if k[5:7] in current_months]
+
+    rollup = _blocks(periods, current_keys, comparison_keys, full_prev_keys)
+    months_with_data = len(current_keys)
+    current = rollup["totals"]["current"]
+    rollup.update({
+        "months_with_data": months_with_data,
+        "comparable_months": len(comparison_keys),
+        "is_complete": months_with_data == 3,
+        "qep_dollars": current["dollars"] / months_with_data * 3 if months_with_data else 0,
+        "qep_units": current["units"] / months_with_data * 3 if months_with_data else 0,
+        "period_label": f"{q} {year}",
+    })
+    return rollup
+
+
+def _ytd(periods, year_a, year_b):
+    """computeYTDSlice()."""
+    sorted_keys = sorted(periods)
+    year_b_keys = [k for k in sorted_keys if k.startswith(year_b)] if year_b else []
+    year_a_keys = [k for k in sorted_keys if k.startswith(year_a)] if year_a else []
+    year_b_months = [k[5:7] for k in year_b_keys]
+    year_a_months = {k[5:7] for k in year_a_keys}
+    common = [mm for mm in year_b_months if mm in year_a_months] if year_a != year_b else []
+
+    current_keys = [f"{year_b}-{mm}" for mm in common] if common else year_b_keys
+    comparison_keys = [f"{year_a}-{mm}" for mm in common]
+
+    rollup = _blocks(periods, current_keys, comparison_keys, year_a_keys)
+    comparable = len(common) or len(year_b_keys)
+    current = rollup["totals"]["current"]
+    full_prev = rollup["totals"]["full_prev"]
+    yep_dollars = current["dollars"] / comparable * 12 if comparable else 0
+    yep_units = current["units"] / comparable * 12 if comparable else 0
+
+    label_months = common or year_b_months
+    first = MONTH_NAMES[int(label_months[0]) - 1] if label_months else ""
+    last = MONTH_NAMES[int(label_months[-1]) - 1] if label_months else ""
+
+    rollup.update({
+        "months_with_data": len(current_keys),
+        "comparable_months": comparable,
+        "is_complete": len(current_keys) == 12,
+        "yep_dollars": yep_dollars,
+        "yep_units": yep_units,
+        "pace_dollars_pct": _pct(yep_dollars, full_prev["dollars"]) or 0,
+        "pace_units_pct": _pct(yep_units, full_prev["units"]) or 0,
+        "period_label": f"{year_b} YTD ({first}–{last})",
+    })
+    return rollup
+
+
+def _overview_row(key, rollup, use_dollars):
+    """One getAllQuarterOverview() row, read off the quarter rollup."""
+    metric = "dollars" if use_dollars else "units"
+    totals = rollup["totals"]
+    val = totals["current"][metric]
+    comp_val = totals["comparison"][metric]
+    full_prev_val = totals["full_prev"][metric]
+    months_with_data = rollup["months_with_data"]
+    qep = val / months_with_data * 3 if months_with_data else 0
+    year, q = key.split("-")
+    return {
+        "quarter": key,
+        "display_label": f"{q} {year}",
+        "current_total": val,
+        "comparison_total": comp_val,
+        "qep": qep,
+        "months_with_data": months_with_data,
+        "is_complete": months_with_data == 3,
+        "yoy_pct": _pct(val, comp_val),
+        "pace_percent": _pct(qep, full_prev_val),
+        "month_count": f"{months_with_data} of 3 months",
+        "product_count": totals["current"]["product_count"],
+    }
+
+
+# ── helpers ───────────────────────────────────────────────────────────
+def _year_pair(all_years):
+    """getYearPair(): the two most recent years as (older, newer)."""
+    if len(all_years) < 2:
+        year = all_years[0] if all_years else None
+        return year, year
+    return all_years[-2], all_years[-1]
+
+
+def _blocks(periods, current_keys, comparison_keys, full_prev_keys):
+    current = _aggregate(periods, current_keys)
+    comparison = _aggregate(periods, comparison_keys)
+    full_prev = _aggregate(periods, full_prev_keys)
+    return {
+        "months": current_keys,
+        "comparison_months": comparison_keys,
+        "full_prev_months": full_prev_keys,
+        "current": current,
+        "comparison": comparison,
+        "full_prev": full_prev,
+        "totals": {
+            "current": period_totals(current),
+            "comparison": period_totals(comparison),
+            "full_prev": period_totals(full_prev),
+        },
+    }
+
+
+def _num(value):
+    """JavaScript's ``value || 0`` for a metric read from JSON."""
+    return value if value and value == value else 0
+
+
+def _aggregate(periods, keys):
+    """aggregateProductData(): per-UPC dollar/unit sums over ``keys``."""
+    result = {}
+    for key in keys:
+        for upc, metrics in periods.get(key, {}).items():
+            acc = result.get(upc)
+            if acc is None:
+                acc = result[upc] = {"dollars": 0, "units": 0}
+            acc["dollars"] += _num(metrics.get("dollars"))
+            acc["units"] += _num(metrics.get("units"))
+    return result
+
+
+def period_totals(upc_metrics):
+    """sumPeriod(): dollar/unit totals and the count of selling UPCs."""
+    dollars = units = count = 0
+    for metrics in upc_metrics.values():
+        d = _num(metrics.get("dollars"))
+        u = _num(metrics.get("units"))
+        dollars += d
+        units += u
+        if d > 0 or u > 0:
+            count += 1
+    return {"dollars": dollars, "units": units, "product_count": count}
+
+
+def _primary_metric(periods):
+    """detectPrimaryMetric(): "dollars" if the last three periods have any."""
+    total = 0
+    for key in sorted(periods)[-3:]:
+        for metrics in periods[key].values():
+            total += _num(metrics.get("dollars"))
+    return "dollars" if total > 0 else "units"
+
+
+def _pct(value, base):
+    return (value - base) / base * 100 if base > 0 else None
@@ -6,13 +6,33 @@ Usage:
     python -m etl.run_etl --retailer all
     python -m etl.run_etl --retailer ngvc
     python -m etl.run_etl --retailer ngvc sprouts iherb
+    python -m etl.run_etl --retailer all --jobs 4
+    python -m etl.run_etl --retailer vitacost --file-workers 8
+    python -m etl.run_etl --retailer all --incremental
+    python -m etl.run_etl --retailer ngvc sprouts --stream 20000
+    python -m etl.run_etl --retailer ngvc sprouts --lean
+    python -m etl.run_etl --retailer all --compact-json --compress gz br
+    python -m etl.run_etl --retailer all --columnar
+    python -m etl.run_etl --retailer all --shard year
+    python -m etl.run_etl --retailer all --cube
+    python -m etl.run_etl --retailer all --sink pos.sqlite
+    python -m etl.run_etl --retailer all --staged
+    python -m etl.run_etl --retailer all --sync --changed-only
+    python -m etl.run_etl --retailer all --watch
+    python -m etl.run_etl --retailer vitacost --profile --metrics-prom /var/lib/node_exporter/etl.prom
+    python -m etl.run_etl --rollback
+    python -m etl.run_etl --list
 """
 
 import argparse
+import contextlib
+import io
 import json
 import os
 import sys
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
 # Ensure the project root is on sys.path so `etl.*` imports work when run
@@ -21,54 +41,123 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from etl.adapters.ngvc_adapter import NGVCAdapter
-from etl.adapters.sprouts_adapter import SproutsAdapter
-from etl.adapters.iherb_adapter import IHerbAdapter
-from etl.adapters.tvs_adapter import TVSAdapter
-from etl.adapters.freshthyme_adapter import FreshThymeAdapter
-from etl.adapters.vitacost_adapter import VitacostAdapter
-
-# Registry: key -> adapter class
-ADAPTER_REGISTRY = {
-    "ngvc": NGVCAdapter,
-    "sprouts": SproutsAdapter,
-    "iherb": IHerbAdapter,
-    "tvs": TVSAdapter,
-    "freshthyme": FreshThymeAdapter,
-    "vitacost": VitacostAdapter,
-}
+from etl.json_writer import COMPRESSIONS, brotli, write_json
+from etl.metrics import (METRICS_FILE, PROFILERS, profiled, reset_peak_rss, run_metrics,
+                         write_prometheus)
+from etl.publish import PublishError, StagedPublisher
+from etl.registry import ADAPTER_REGISTRY
+from etl.sharding import SHARD_MODES
+from etl.sharepoint_client import (DEFAULT_WORKERS, SharePointClient, SyncError,
+                                   backend_for, changed_folders)
+from etl.sql_sink import load_output
+from etl.watch import SourceWatcher, retailers_for
+
+# Adapters (and with them pandas/openpyxl) are imported only when they run;
+# see etl/registry.py.  Keep in step with xlsx_stream.DEFAULT_BATCH_SIZE,
+# which isn't imported here for the same reason.
+DEFAULT_BATCH_SIZE = 20_000
 
 # Default paths
 DEFAULT_SOURCE_DIR = os.path.dirname(PROJECT_ROOT)  # /Users/natasha/Downloads/SharePoint_POS/
 DEFAULT_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "public", "data")
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".etl_cache")
+DEFAULT_VERSIONS_DIR = os.path.join(PROJECT_ROOT, ".etl_versions")
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_ROOT, ".etl_profiles")
+
 
+def run_adapter(adapter_key, source_dir, output_dir, profile=None, profile_dir=None,
+                **options):
+    """Run a single adapter; return (manifest entry or None on failure, metrics).
 
-def run_adapter(adapter_key, source_dir, output_dir):
-    """Run a single adapter and return its manifest entry (or None on failure)."""
-    cls = ADAPTER_REGISTRY.get(adapter_key)
-    if cls is None:
+    ``options`` are passed to the adapter constructor (cache_dir,
+    incremental, stream_batch_size, ... — see BaseAdapter.__init__).
+    ``profile`` ("cprofile" / "pyinstrument") profiles the run into
+    ``profile_dir``.  ``metrics`` is the adapter's AdapterMetrics.as_dict().
+    """
+    if adapter_key not in ADAPTER_REGISTRY:
         print(f"ERROR: Unknown retailer '{adapter_key}'. "
               f"Available: {', '.join(ADAPTER_REGISTRY.keys())}")
-        return None
+        return None, None
 
-    adapter = cls(source_dir=source_dir, output_dir=output_dir)
+    reset_peak_rss()
     try:
-        manifest_entry = adapter.run()
-        return manifest_entry
+        cls = ADAPTER_REGISTRY[adapter_key]
+        adapter = cls(source_dir=source_dir, output_dir=output_dir, **options)
+    except Exception as e:
+        print(f"ERROR [{adapter_key}]: could not load adapter "
+              f"{ADAPTER_REGISTRY.spec(adapter_key)}: {e}")
+        traceback.print_exc()
+        return None, None
+
+    try:
+        with profiled(profile, profile_dir, adapter_key, adapter.metrics):
+            manifest_entry = adapter.run()
+        return manifest_entry, adapter.metrics.as_dict()
     except FileNotFoundError as e:
         print(f"ERROR [{adapter_key}]: {e}")
-        return None
     except Exception as e:
         print(f"ERROR [{adapter_key}]: {e}")
         traceback.print_exc()
-        return None
+    adapter.metrics.status = "failed"
+    return None, adapter.metrics.as_dict()
+
+
+def _run_adapter_captured(adapter_key, source_dir, output_dir, **options):
+    """Worker entry point for --jobs: run an adapter with its output captured.
+
+    Returns (manifest_entry, metrics, log_text) so the parent process can
+    print each adapter's log as one contiguous block instead of
+    interleaving them.
+    """
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        entry, metrics = run_adapter(adapter_key, source_dir, output_dir, **options)
+    return entry, metrics, buf.getvalue()
+
+
+def run_adapters(retailer_keys, source_dir, output_dir, jobs=1, **options):
+    """Run the given adapters; return ({key: manifest entry or None}, {key: metrics}).
+
+    With jobs > 1 the adapters run in a process pool; each adapter's log is
+    printed as a block when it finishes.  A failing (or crashing) adapter
+    yields None and never aborts the others.
+    """
+    results = {}
+    metrics = {}
+    if jobs <= 1 or len(retailer_keys) <= 1:
+        for key in retailer_keys:
+            print(f"\n{'─' * 50}")
+            results[key], metrics[key] = run_adapter(key, source_dir, output_dir, **options)
+        return results, metrics
+
+    workers = min(jobs, len(retailer_keys))
+    print(f"\nRunning {len(retailer_keys)} adapters with {workers} workers ...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_run_adapter_captured, key, source_dir, output_dir,
+                        **options): key
+            for key in retailer_keys
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            print(f"\n{'─' * 50}")
+            try:
+                entry, adapter_metrics, log = future.result()
+            except Exception as e:
+                print(f"ERROR [{key}]: worker process failed: {e}")
+                entry, adapter_metrics = None, None
+            else:
+                print(log, end="")
+            results[key] = entry
+            metrics[key] = adapter_metrics
+    return results, metrics
 
 
-def write_manifest(manifest, output_dir):
+def write_manifest(manifest, output_dir, compact=False, compression=()):
     """Write data_manifest.json to the output directory."""
     manifest_path = os.path.join(output_dir, "data_manifest.json")
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2, default=str)
+    write_json(manifest_path, manifest, compact=compact, compression=compression)
     print(f"\nManifest written to {manifest_path}")
     return manifest_path
 
@@ -94,6 +183,212 @@ def main():
         default=DEFAULT_OUTPUT_DIR,
         help=f"Output directory for JSON files (default: {DEFAULT_OUTPUT_DIR})",
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Number of adapters to run in parallel worker processes "
+             "(default: 1, 0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--file-workers",
+        type=int,
+        default=1,
+        help="Worker processes per adapter for parsing source files in "
+             "parallel (Vitacost, TVS, FreshThyme, iHerb; default: 1, "
+             "0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for the parsed-source cache (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse source files instead of using the parse cache",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only reprocess source files that changed since the last run "
+             "(state is kept under the cache directory)",
+    )
+    parser.add_argument(
+        "--stream",
+        nargs="?",
+        type=int,
+        const=DEFAULT_BATCH_SIZE,
+        default=None,
+        metavar="ROWS",
+        help="Stream large SPINS workbooks (NGVC, Sprouts) in batches of ROWS "
+             f"rows instead of loading them whole (default: {DEFAULT_BATCH_SIZE}); "
+             "streamed files bypass the parse cache",
+    )
+    parser.add_argument(
+        "--lean",
+        action="store_true",
+        help="Memory-lean source frames (NGVC, Sprouts): keep only the columns "
+             "used, store repeated text as categoricals and narrow numbers to "
+             "32 bits where lossless; output is unchanged",
+    )
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write minified JSON (uses orjson when installed) instead of indented",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Also write pos_data.v2.json (dense per-metric arrays) and "
+             "advertise schema_version 2 in the manifest",
+    )
+    parser.add_argument(
+        "--calendar-periods",
+        action="store_true",
+        help="Also write quarterly_periods and yearly_periods for retailers "
+             "with weekly SPINS data (rolled up from the same sums)",
+    )
+    parser.add_argument(
+        "--shard",
+        choices=SHARD_MODES,
+        default=None,
+        help="Also write pos_data.index.json plus one shard per year or per "
+             "period under shards/, for clients that load history lazily",
+    )
+    parser.add_argument(
+        "--cube",
+        action="store_true",
+        help="Also write cube/: memory-mapped period × UPC × metric .npy arrays "
+             "plus an index, for etl.cube.PosCube queries",
+    )
+    parser.add_argument(
+        "--sink",
+        default=None,
+        metavar="PATH",
+        help="Also load each run's output into a local SQLite database at PATH "
+             "(DuckDB when PATH ends in .duckdb); see etl/sql_sink.py",
+    )
+    parser.add_argument(
+        "--hashed-copies",
+        action="store_true",
+        help="Also link every data file under a content-hashed name "
+             "(e.g. pos_data.3f2a9c1b7d4e.json) for immutable HTTP caching",
+    )
+    parser.add_argument(
+        "--sync",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="SOURCE",
+        help="Sync the retailers' folders into the source directory before "
+             "running: from SharePoint (SHAREPOINT_* env vars), or from SOURCE, "
+             "a directory or http(s) URL standing in for it",
+    )
+    parser.add_argument(
+        "--sync-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent downloads for --sync (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Only run retailers whose folders changed in a sync since the last "
+             "ETL run (per the source directory's sync_log.jsonl)",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        default=None,
+        metavar="PATH",
+        help="Also write run metrics as a Prometheus textfile (e.g. into "
+             "node_exporter's textfile collector directory); etl_metrics.json "
+             "is always written next to the manifest",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        choices=PROFILERS,
+        const="cprofile",
+        default=None,
+        help="Profile each adapter with cProfile (default) or pyinstrument "
+             "(needs the pyinstrument package)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=DEFAULT_PROFILE_DIR,
+        help=f"Where --profile output goes (default: {DEFAULT_PROFILE_DIR})",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running: watch the source directory and rerun only the "
+             "retailers whose source files change",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=10.0,
+        metavar="SECONDS",
+        help="With --watch, wait for SECONDS without new file events before "
+             "rerunning (default: 10)",
+    )
+    parser.add_argument(
+        "--poll",
+        nargs="?",
+        type=float,
+        const=DEFAULT_POLL_INTERVAL,
+        default=None,
+        metavar="SECONDS",
+        help="With --watch, poll the source directory every SECONDS instead of "
+             f"using inotify (default: {DEFAULT_POLL_INTERVAL:g}; polling is also "
+             "the fallback where inotify is unavailable)",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Write into a staging copy, validate it, then publish it as a new "
+             "version by flipping the output directory symlink",
+    )
+    parser.add_argument(
+        "--versions-dir",
+        default=DEFAULT_VERSIONS_DIR,
+        help=f"Where staged versions are kept (default: {DEFAULT_VERSIONS_DIR})",
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=5,
+        help="Number of published versions to keep for rollback (default: 5)",
+    )
+    parser.add_argument(
+        "--rollback",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="VERSION",
+        help="Point the output at an earlier staged version (default: the "
+             "previous one) and exit",
+    )
+    parser.add_argument(
+        "--list-versions",
+        action="store_true",
+        help="List staged versions and exit",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List the available retailers with their last run's status and exit "
+             "(imports no adapter)",
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="+",
+        choices=COMPRESSIONS,
+        default=[],
+        help="Also write precompressed .json.gz and/or .json.br siblings "
+             "(.br needs the brotli package)",
+    )
 
     args = parser.parse_args()
 
@@ -106,15 +401,223 @@ def main():
 
     source_dir = os.path.abspath(args.source_dir)
     output_dir = os.path.abspath(args.output_dir)
-    os.makedirs(output_dir, exist_ok=True)
+    if args.list:
+        return list_retailers(output_dir)
+    publisher = None
+    if args.staged or args.rollback is not None or args.list_versions:
+        publisher = StagedPublisher(output_dir, os.path.abspath(args.versions_dir),
+                                    keep=args.keep_versions)
+    if args.list_versions:
+        current = publisher.current()
+        for version in publisher.versions():
+            print(f"{'*' if version == current else ' '} {version}")
+        return 0
+    if args.rollback is not None:
+        try:
+            version = publisher.rollback(args.rollback or None)
+        except PublishError as e:
+            print(f"ERROR: {e}")
+            return 1
+        print(f"Output {output_dir} now points at version {version}")
+        return 0
+    if not args.staged:
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    file_workers = args.file_workers if args.file_workers > 0 else (os.cpu_count() or 1)
+    cache_dir = None if args.no_cache else os.path.abspath(args.cache_dir)
+    compression = list(dict.fromkeys(args.compress))
+    if "br" in compression and brotli is None:
+        print("WARNING: --compress br needs the brotli package; skipping .br output")
+        compression.remove("br")
+    if args.incremental and cache_dir is None:
+        print("WARNING: --incremental needs the cache directory; ignoring --no-cache")
+        cache_dir = os.path.abspath(args.cache_dir)
 
     print("=" * 60)
     print("  Irwin Naturals POS Dashboard — ETL Pipeline")
     print(f"  Source: {source_dir}")
     print(f"  Output: {output_dir}")
     print(f"  Retailers: {', '.join(retailer_keys)}")
+    if jobs > 1:
+        print(f"  Jobs: {jobs}")
+    if file_workers > 1:
+        print(f"  File workers per adapter: {file_workers}")
+    print(f"  Parse cache: {cache_dir or 'disabled'}")
+    if args.incremental:
+        print("  Mode: incremental")
+    if args.stream:
+        print(f"  Streaming: {args.stream} rows per batch")
+    if args.lean:
+        print("  Memory-lean frames: on")
+    if args.compact_json or compression:
+        print(f"  JSON: {'compact' if args.compact_json else 'indented'}"
+              + (f", precompressed {'/'.join(compression)}" if compression else ""))
+    if publisher is not None:
+        print(f"  Staged publish: versions in {publisher.versions_dir}")
     print("=" * 60)
 
+    if args.sync is not None:
+        folders = [ADAPTER_REGISTRY.metadata(key)["source_folder"] for key in retailer_keys
+                   if key in ADAPTER_REGISTRY]
+        print(f"\nSyncing {', '.join(folders)} ...")
+        try:
+            client = SharePointClient(backend_for(args.sync), workers=args.sync_workers)
+            client.sync(folders, source_dir)
+        except SyncError as e:
+            print(f"ERROR: sync failed: {e}")
+            return 1
+    if args.changed_only:
+        changed = _changed_retailers(retailer_keys, source_dir, output_dir)
+        if changed:
+            print(f"\nChanged since the last run: {', '.join(changed)}")
+        else:
+            print("\nNo retailer folders changed since the last run")
+
+    def run(keys):
+        return _run_once(args, publisher, keys, source_dir, output_dir, jobs, cache_dir,
+                         compression, file_workers)
+
+    if args.watch:
+        status = run(changed) if args.changed_only and changed else 0
+        return _watch(args, retailer_keys, source_dir, run) or status
+    if args.changed_only:
+        return run(changed) if changed else 0
+    return run(retailer_keys)
+
+
+def list_retailers(output_dir):
+    """--list: each retailer with its origin and last run, from the output files."""
+    manifest, metrics = {}, {}
+    for name, target in (("data_manifest.json", manifest), (METRICS_FILE, metrics)):
+        path = os.path.join(output_dir, name)
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    target.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"WARNING: could not read {path}: {e}")
+    entries = manifest.get("retailers", {})
+    runs = metrics.get("retailers", {})
+
+    print(f"{'retailer':<12} {'last run':<8} {'seconds':>8} {'products':>9}  "
+          f"{'date range':<17}  origin")
+    for key in ADAPTER_REGISTRY:
+        entry = entries.get(key) or {}
+        run = runs.get(key) or {}
+        status = run.get("status") or ("ok" if entry else "never")
+        seconds = f"{run['seconds']:.1f}" if run.get("seconds") is not None else "-"
+        products = entry.get("product_count", "-")
+        dates = entry.get("date_range") or {}
+        date_range = f"{dates['start']} – {dates['end']}" if dates else "-"
+        print(f"{key:<12} {status:<8} {seconds:>8} {products:>9}  {date_range:<17}  "
+              f"{ADAPTER_REGISTRY.origin(key)}")
+    print(f"\nLast run: {manifest.get('generated_at') or 'never'} ({output_dir})")
+    return 0
+
+
+def _run_once(args, publisher, retailer_keys, source_dir, output_dir, jobs, cache_dir,
+              compression, file_workers):
+    """One ETL run, published through ``publisher`` when staging is on."""
+    if publisher is None:
+        status = _run(args, retailer_keys, source_dir, output_dir, jobs, cache_dir,
+                      compression, file_workers)
+        return _sink(args, retailer_keys, output_dir) or status
+
+    try:
+        write_dir = publisher.begin()
+    except PublishError as e:
+        print(f"ERROR: {e}")
+        return 1
+    try:
+        status = _run(args, retailer_keys, source_dir, write_dir, jobs, cache_dir,
+                      compression, file_workers)
+        manifest_path = os.path.join(write_dir, "data_manifest.json")
+        with open(manifest_path, "r") as f:
+            problems = publisher.validate(json.load(f))
+    except BaseException:
+        publisher.abort()
+        raise
+    if problems:
+        publisher.abort()
+        print("ERROR: staged output failed validation; live output left unchanged:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    version = publisher.commit()
+    print(f"Published version {version} → {output_dir}")
+    return _sink(args, retailer_keys, output_dir) or status
+
+
+def _sink(args, retailer_keys, output_dir):
+    """--sink: load the retailers just run into the database; 1 on failure."""
+    if not args.sink:
+        return 0
+    print(f"\nLoading into {args.sink} ...")
+    try:
+        failed = load_output(os.path.abspath(args.sink), output_dir, retailer_keys)
+    except Exception as e:
+        print(f"ERROR: sink failed: {e}")
+        traceback.print_exc()
+        return 1
+    return 1 if failed else 0
+
+
+def _watch(args, retailer_keys, source_dir, run):
+    """--watch: rerun the retailers whose source files change, until interrupted."""
+    patterns = {key: ADAPTER_REGISTRY.metadata(key)["source_patterns"] for key in retailer_keys
+                if key in ADAPTER_REGISTRY}
+    watcher = SourceWatcher(source_dir, debounce=args.debounce,
+                            poll_interval=args.poll or DEFAULT_POLL_INTERVAL,
+                            use_inotify=args.poll is None)
+    print(f"\nWatching {source_dir} ({watcher.mode}, {args.debounce:g}s debounce) "
+          f"— Ctrl-C to stop")
+    status = 0
+    try:
+        for paths in watcher.batches():
+            keys = retailers_for(paths, patterns)
+            if not keys:
+                continue
+            print(f"\n{datetime.now():%Y-%m-%d %H:%M:%S}  {len(paths)} changed file(s) "
+                  f"→ rerunning {', '.join(keys)}")
+            status = run(keys)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    return status
+
+
+def write_metrics(metrics, output_dir, prometheus_path=None):
+    """Merge this run's metrics into etl_metrics.json (and the Prometheus textfile)."""
+    metrics_path = os.path.join(output_dir, METRICS_FILE)
+    if os.path.isfile(metrics_path):
+        try:
+            with open(metrics_path, "r") as f:
+                previous = json.load(f).get("retailers", {})
+        except (OSError, ValueError):
+            previous = {}
+        metrics["retailers"] = {**previous, **metrics["retailers"]}
+    write_json(metrics_path, metrics)
+    print(f"Metrics written to {metrics_path}")
+    if prometheus_path:
+        write_prometheus(prometheus_path, metrics)
+        print(f"Prometheus metrics written to {prometheus_path}")
+
+
+def _changed_retailers(retailer_keys, source_dir, output_dir):
+    """The retailers whose source folders a sync changed after the last ETL run."""
+    manifest_path = os.path.join(output_dir, "data_manifest.json")
+    since = None
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, "r") as f:
+            since = json.load(f).get("generated_at")
+    changed = changed_folders(source_dir, since)
+    return [key for key in retailer_keys
+            if key in ADAPTER_REGISTRY
+            and ADAPTER_REGISTRY.metadata(key)["source_folder"] in changed]
+
+
+def _run(args, retailer_keys, source_dir, output_dir, jobs, cache_dir, compression,
+         file_workers):
+    """Run the adapters into output_dir and write the merged manifest there."""
     # Load existing manifest if present (for incremental runs)
     manifest_path = os.path.join(output_dir, "data_manifest.json")
     if os.path.isfile(manifest_path):
@@ -126,12 +629,21 @@ def main():
             "retailers": {},
         }
 
-    # Run each adapter
+    # Run each adapter, then merge entries in the requested order
+    started = time.perf_counter()
+    results, metrics = run_adapters(retailer_keys, source_dir, output_dir, jobs=jobs,
+                                    cache_dir=cache_dir, incremental=args.incremental,
+                                    stream_batch_size=args.stream,
+                                    compact_json=args.compact_json, compression=compression,
+                                    columnar=args.columnar, file_workers=file_workers,
+                                    calendar_periods=args.calendar_periods, shard_by=args.shard,
+                                    hashed_copies=args.hashed_copies, lean=args.lean,
+                                    cube=args.cube, profile=args.profile,
+                                    profile_dir=os.path.abspath(args.profile_dir))
     success_count = 0
     fail_count = 0
     for key in retailer_keys:
-        print(f"\n{'─' * 50}")
-        entry = run_adapter(key, source_dir, output_dir)
+        entry = results.get(key)
         if entry is not None:
             manifest["retailers"][key] = entry
             success_count += 1
@@ -141,7 +653,13 @@ def main():
     manifest["generated_at"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
     # Write manifest
-    write_manifest(manifest, output_dir)
+    write_manifest(manifest, output_dir, compact=args.compact_json,
+                   compression=compression)
+    write_metrics(
+        run_metrics({key: m for key, m in metrics.items() if m is not None},
+                    time.perf_counter() - started, jobs),
+        output_dir, args.metrics_prom,
+    )
 
     print(f"\n{'=' * 60}")
     print(f"  ETL Complete: {success_count} succeeded, {fail_count} failed")
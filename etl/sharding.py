@@ -0,0 +1,97 @@
+"""
+Sharded pos_data — a small index plus one file per year or per period.
+
+pos_data.json holds every period a retailer has ever reported, and the
+dashboard downloads all of it before first paint.  Sharded output splits
+the period blocks so a client fetches only what it shows:
+
+    pos_data.index.json           everything except the period blocks, plus
+                                  period lists, per-period totals and the shard map
+    shards/pos_data.2025.json     {"shard": "2025", "periods": {...}, "weekly_periods": {...}}
+
+Monthly periods go to the shard of their "YYYY-MM" key and weekly periods
+to the shard of their week-ending date, so one shard holds a whole year (or
+month) of both views.  Any other block (quarterly/yearly_periods) is small
+and stays in the index.  pos_data.json is still written alongside.
+"""
+
+import os
+
+from etl.rollups import period_totals
+
+SHARD_MODES = ("year", "period")
+SHARD_DIR = "shards"
+INDEX_FILE = "pos_data.index.json"
+
+# Period blocks split across shards
+SHARDED_BLOCKS = ("periods", "weekly_periods")
+
+
+def shard_file(name):
+    """Output path of a shard, relative to the retailer directory."""
+    return f"{SHARD_DIR}/pos_data.{name}.json"
+
+
+def shard_name(label, by):
+    """Shard holding a "YYYY-MM" or "YYYY-MM-DD" period key."""
+    return label[:4] if by == "year" else label[:7]
+
+
+def shard_pos_data(pos_data, by):
+    """Split a pos_data dict into (index, {shard name: shard doc})."""
+    if by not in SHARD_MODES:
+        raise ValueError(f"Unknown shard mode '{by}' (expected one of {SHARD_MODES})")
+
+    index = {key: value for key, value in pos_data.items() if key not in SHARDED_BLOCKS}
+    index["shard_by"] = by
+
+    shards = {}
+    for block in SHARDED_BLOCKS:
+        if block not in pos_data:
+            continue
+        for label in sorted(pos_data[block]):
+            name = shard_name(label, by)
+            shard = shards.setdefault(name, {"shard": name})
+            shard.setdefault(block, {})[label] = pos_data[block][label]
+    shards = dict(sorted(shards.items()))
+
+    index["period_keys"] = {
+        block: sorted(pos_data[block]) for block in SHARDED_BLOCKS if block in pos_data
+    }
+    index["totals"] = {
+        block: {label: period_totals(pos_data[block][label])
+                for label in sorted(pos_data[block])}
+        for block in SHARDED_BLOCKS if block in pos_data
+    }
+    index["shards"] = {
+        name: {
+            "file": shard_file(name),
+            "period_keys": {block: list(shard[block]) for block in SHARDED_BLOCKS
+                            if block in shard},
+        }
+        for name, shard in shards.items()
+    }
+    return index, shards
+
+
+def remove_stale_shards(output_dir, keep):
+    """Delete the index and shard files (and .gz/.br siblings) not in ``keep``.
+
+    ``keep`` holds paths relative to the retailer directory, as data_files.
+    """
+    stale = []
+    if INDEX_FILE not in keep:
+        stale += [INDEX_FILE + ext for ext in ("", ".gz", ".br")]
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    if os.path.isdir(shard_dir):
+        keep = {os.path.basename(path) for path in keep}
+        for fname in os.listdir(shard_dir):
+            base = fname.rsplit(".", 1)[0] if fname.endswith((".gz", ".br")) else fname
+            if base.startswith("pos_data.") and base not in keep:
+                stale.append(os.path.join(SHARD_DIR, fname))
+    for path in stale:
+        path = os.path.join(output_dir, path)
+        if os.path.exists(path):
+            os.remove(path)
+    if os.path.isdir(shard_dir) and not os.listdir(shard_dir):
+        os.rmdir(shard_dir)
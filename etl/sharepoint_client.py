@@ -1,120 +1,653 @@
 """
-SharePoint client stub for Irwin Naturals POS Dashboard.
+SharePoint sync for Irwin Naturals POS Dashboard.
 
-This module will provide authenticated access to SharePoint Online
-via MSAL (Microsoft Authentication Library) to automatically download
-the latest POS data files before ETL runs.
+Mirrors the retailer folders of the SharePoint POS library into the local
+source directory before an ETL run, so nobody copies files by hand:
 
-TODO: Implement MSAL integration when ready for automated deployment.
+    client = SharePointClient()                           # Graph, creds from env
+    client = SharePointClient(LocalBackend("/mnt/pos"))   # offline stand-in
+    result = client.sync(["NGVC", "Sprouts"], "/data/SharePoint_POS")
+    result["downloaded"]                                  # changed local paths
+
+How a sync works:
+  1. The backend's delta listing reports what changed since the stored delta
+     link (the first sync enumerates everything).  The remote listing is
+     kept in <local_dir>/.sharepoint_sync.json.
+  2. Files whose eTag and size match what was last downloaded, and whose
+     local copy is intact, are skipped.
+  3. The rest download concurrently over one pooled HTTP session, streamed
+     in chunks into "<name>.part".  An interrupted transfer resumes with a
+     Range request on the next attempt if the remote eTag is unchanged.
+     Finished files are renamed into place with the remote modified time.
+  4. Files deleted remotely are removed locally.
+  5. One record per sync is appended to <local_dir>/sync_log.jsonl;
+     changed_folders() reads it back so the ETL reruns only the retailers
+     whose folders changed (run_etl --changed-only).
+
+Backends:
+    GraphBackend    Microsoft Graph drive delta API, MSAL client credentials
+                    (SHAREPOINT_* environment variables)
+    GraphBackend(base_url="http://localhost:8765", token_provider=None)
+                    the same protocol against serve_directory(), a local HTTP
+                    stand-in that publishes a directory as a Graph-shaped drive
+    LocalBackend    a local or mounted directory, read directly
+
+GraphBackend needs the requests package (and msal for SharePoint itself).
 """
 
+import argparse
+import json
 import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # optional — needed only for GraphBackend
+    requests = None
 
-class SharePointClient:
+try:
+    import msal
+except ImportError:  # optional — needed only to authenticate against SharePoint
+    msal = None
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+GRAPH_SCOPES = ["https://graph.microsoft.com/.default"]
+
+STATE_FILE = ".sharepoint_sync.json"
+LOG_FILE = "sync_log.jsonl"
+PART_SUFFIX = ".part"
+
+CHUNK_SIZE = 1 << 20  # bytes per streamed download chunk
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+
+
+class SyncError(RuntimeError):
+    """Raised when a backend cannot list or deliver a file."""
+
+
+# ── item metadata ─────────────────────────────────────────────────────
+def _graph_item(item):
+    """Normalize a Graph driveItem from a delta page; None for folders.
+
+    Returns {"id", "path", "size", "etag", "modified"} for a file, or
+    {"id", "deleted": True} for a deleted item.  "path" is relative to the
+    drive root with "/" separators.
     """
-    Placeholder SharePoint client using MSAL for authentication.
-
-    Future implementation will:
-    1. Authenticate via MSAL with client credentials or device flow
-    2. List files in the shared POS data library
-    3. Download new/updated files to the local source directory
-    4. Maintain a sync log of downloaded files with timestamps
-
-    Configuration will be loaded from environment variables:
-        SHAREPOINT_TENANT_ID     - Azure AD tenant ID
-        SHAREPOINT_CLIENT_ID     - Application (client) ID
-        SHAREPOINT_CLIENT_SECRET - Client secret (for daemon flow)
-        SHAREPOINT_SITE_URL      - SharePoint site URL
-        SHAREPOINT_DRIVE_ID      - Document library drive ID
+    if "deleted" in item:
+        return {"id": item["id"], "deleted": True}
+    if "file" not in item:
+        return None
+    parent = item.get("parentReference", {}).get("path", "")
+    parent = unquote(parent.split("root:", 1)[1]).strip("/") if "root:" in parent else ""
+    return {
+        "id": item["id"],
+        "path": f"{parent}/{item['name']}" if parent else item["name"],
+        "size": item.get("size", 0),
+        "etag": item.get("eTag", ""),
+        "modified": item.get("lastModifiedDateTime"),
+    }
+
+
+def _in_folders(path, folders):
+    return any(path == f or path.startswith(f + "/") for f in folders)
+
+
+def _timestamp(modified):
+    """Epoch seconds of a Graph "2025-03-01T10:15:00Z" time, or None."""
+    if not modified:
+        return None
+    try:
+        return datetime.fromisoformat(modified.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+# ── backends ──────────────────────────────────────────────────────────
+class GraphBackend:
+    """A drive reached over the Microsoft Graph delta/content API.
+
+    ``token_provider`` returns a bearer token (None = no Authorization
+    header, as for the serve_directory() stand-in).  Delta listing is taken
+    on the drive root — Graph supports delta only there on SharePoint — and
+    filtered to the synced folders by the client.
     """
 
-    def __init__(self, tenant_id=None, client_id=None, client_secret=None,
-                 site_url=None, drive_id=None):
-        """
-        Initialize the SharePoint client.
+    name = "graph"
+
+    def __init__(self, drive_id, base_url=GRAPH_URL, token_provider=None,
+                 pool_size=DEFAULT_WORKERS, timeout=60):
+        if requests is None:
+            raise SyncError("GraphBackend needs the 'requests' package")
+        self.drive_id = drive_id
+        self.base_url = base_url.rstrip("/")
+        self.token_provider = token_provider
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls, tenant_id=None, client_id=None, client_secret=None, drive_id=None,
+                 **kwargs):
+        """SharePoint drive authenticated with MSAL client credentials.
 
         Args:
             tenant_id: Azure AD tenant ID (or SHAREPOINT_TENANT_ID env var)
             client_id: Application client ID (or SHAREPOINT_CLIENT_ID env var)
             client_secret: Client secret (or SHAREPOINT_CLIENT_SECRET env var)
-            site_url: SharePoint site URL (or SHAREPOINT_SITE_URL env var)
             drive_id: Document library drive ID (or SHAREPOINT_DRIVE_ID env var)
         """
-        self.tenant_id = tenant_id or os.environ.get("SHAREPOINT_TENANT_ID")
-        self.client_id = client_id or os.environ.get("SHAREPOINT_CLIENT_ID")
-        self.client_secret = client_secret or os.environ.get("SHAREPOINT_CLIENT_SECRET")
-        self.site_url = site_url or os.environ.get("SHAREPOINT_SITE_URL")
-        self.drive_id = drive_id or os.environ.get("SHAREPOINT_DRIVE_ID")
-
-        self._token = None
-
-        # TODO: Initialize MSAL ConfidentialClientApplication
-        # from msal import ConfidentialClientApplication
-        # self._app = ConfidentialClientApplication(
-        #     self.client_id,
-        #     authority=f"https://login.microsoftonline.com/{self.tenant_id}",
-        #     client_credential=self.client_secret,
-        # )
-
-    def authenticate(self):
-        """
-        Acquire an access token via MSAL client credentials flow.
+        tenant_id = tenant_id or os.environ.get("SHAREPOINT_TENANT_ID")
+        client_id = client_id or os.environ.get("SHAREPOINT_CLIENT_ID")
+        client_secret = client_secret or os.environ.get("SHAREPOINT_CLIENT_SECRET")
+        drive_id = drive_id or os.environ.get("SHAREPOINT_DRIVE_ID")
+        missing = [name for name, value in (
+            ("SHAREPOINT_TENANT_ID", tenant_id), ("SHAREPOINT_CLIENT_ID", client_id),
+            ("SHAREPOINT_CLIENT_SECRET", client_secret), ("SHAREPOINT_DRIVE_ID", drive_id),
+        ) if not value]
+        if missing:
+            raise SyncError(f"SharePoint credentials missing: {', '.join(missing)}")
+        if msal is None:
+            raise SyncError("SharePoint authentication needs the 'msal' package")
 
-        TODO: Implement token acquisition:
-            result = self._app.acquire_token_for_client(
-                scopes=["https://graph.microsoft.com/.default"]
-            )
-            self._token = result.get("access_token")
-        """
-        raise NotImplementedError(
-            "SharePoint authentication not yet implemented. "
-            "Set up MSAL credentials and implement acquire_token_for_client."
+        app = msal.ConfidentialClientApplication(
+            client_id,
+            authority=f"https://login.microsoftonline.com/{tenant_id}",
+            client_credential=client_secret,
         )
 
-    def list_files(self, folder_path=""):
-        """
-        List files in a SharePoint document library folder.
+        def token_provider():
+            # MSAL caches the token and refreshes it shortly before expiry
+            result = app.acquire_token_for_client(scopes=GRAPH_SCOPES)
+            if "access_token" not in result:
+                raise SyncError(f"SharePoint authentication failed: "
+                                f"{result.get('error_description') or result.get('error')}")
+            return result["access_token"]
 
-        Args:
-            folder_path: Relative path within the document library
+        return cls(drive_id, token_provider=token_provider, **kwargs)
 
-        Returns:
-            List of dicts with file metadata (name, size, last_modified, download_url)
+    def _get(self, url, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.token_provider is not None:
+            headers["Authorization"] = f"Bearer {self.token_provider()}"
+        response = self.session.get(url, headers=headers, timeout=self.timeout, **kwargs)
+        if response.status_code == 429 or response.status_code >= 500:
+            # Throttled or transient: honour Retry-After once, then give up
+            response.close()
+            time.sleep(min(int(response.headers.get("Retry-After", "5")), 60))
+            response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                        **kwargs)
+        if response.status_code == 410:
+            response.close()
+            raise SyncError("delta link expired")
+        response.raise_for_status()
+        return response
 
-        TODO: Implement via Microsoft Graph API:
-            GET /drives/{drive_id}/root:/{folder_path}:/children
-        """
-        raise NotImplementedError("SharePoint file listing not yet implemented.")
+    def delta(self, token):
+        """(changed items, new token) since ``token`` (None = everything)."""
+        url = token or f"{self.base_url}/drives/{self.drive_id}/root/delta"
+        items = []
+        while url:
+            page = self._get(url).json()
+            for item in page.get("value", []):
+                item = _graph_item(item)
+                if item is not None:
+                    items.append(item)
+            token = page.get("@odata.deltaLink", token)
+            url = page.get("@odata.nextLink")
+        return items, token
+
+    def open(self, item, offset=0):
+        """(chunk iterator, start offset) of ``item``'s content from ``offset``."""
+        url = f"{self.base_url}/drives/{self.drive_id}/items/{quote(item['id'], safe='')}/content"
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        response = self._get(url, headers=headers, stream=True)
+        start = offset if offset and response.status_code == 206 else 0
+        return response.iter_content(CHUNK_SIZE), start
+
+
+class _DirectoryDrive:
+    """A local directory listed as Graph driveItems, with snapshot deltas."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def items(self):
+        """{item id: Graph driveItem} for every file under the root."""
+        items = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            rel_dir = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            rel_dir = "" if rel_dir == "." else rel_dir
+            for name in sorted(filenames):
+                if name.startswith(".") or name.endswith(PART_SUFFIX):
+                    continue
+                st = os.stat(os.path.join(dirpath, name))
+                path = f"{rel_dir}/{name}" if rel_dir else name
+                items[path] = {
+                    "id": path,
+                    "name": name,
+                    "size": st.st_size,
+                    "eTag": f'"{st.st_size}-{st.st_mtime_ns}"',
+                    "lastModifiedDateTime": datetime.fromtimestamp(
+                        st.st_mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "file": {},
+                    "parentReference": {"path": f"/drive/root:/{rel_dir}" if rel_dir
+                                        else "/drive/root:"},
+                }
+        return items
+
+    def delta(self, snapshot):
+        """(changed driveItems, new snapshot) against a {id: eTag} snapshot."""
+        items = self.items()
+        current = {item_id: item["eTag"] for item_id, item in items.items()}
+        if snapshot is None:
+            return list(items.values()), current
+        changed = [item for item_id, item in items.items()
+                   if snapshot.get(item_id) != item["eTag"]]
+        changed += [{"id": item_id, "deleted": {}} for item_id in snapshot
+                    if item_id not in current]
+        return changed, current
+
+    def open(self, item_id, offset=0):
+        path = os.path.join(self.root, *item_id.split("/"))
+        if not os.path.isfile(path):
+            raise SyncError(f"{item_id} no longer exists")
+        f = open(path, "rb")
+        f.seek(offset)
+        return f
+
+
+class LocalBackend:
+    """A local or mounted directory standing in for the SharePoint library.
+
+    The delta token is the previous {id: eTag} snapshot, kept in the sync
+    state like a Graph delta link.
+    """
+
+    name = "local"
+
+    def __init__(self, root):
+        if not os.path.isdir(root):
+            raise SyncError(f"Local SharePoint stand-in not found: {root}")
+        self.drive = _DirectoryDrive(root)
+
+    def delta(self, token):
+        """(changed items, new token) since ``token`` (None = everything)."""
+        items, snapshot = self.drive.delta(token)
+        return [i for i in map(_graph_item, items) if i is not None], snapshot
+
+    def open(self, item, offset=0):
+        """(chunk iterator, start offset) of ``item``'s content from ``offset``."""
+        f = self.drive.open(item["id"], offset)
+
+        def chunks():
+            with f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return chunks(), offset
+
+
+def backend_for(source, drive_id=None):
+    """Backend for a --sync source: None = SharePoint, a URL or a directory."""
+    if not source:
+        return GraphBackend.from_env(drive_id=drive_id)
+    if source.startswith(("http://", "https://")):
+        return GraphBackend(drive_id or "local", base_url=source)
+    return LocalBackend(source)
+
+
+# ── sync engine ───────────────────────────────────────────────────────
+class SharePointClient:
+    """Delta-based, concurrent mirror of SharePoint folders into a local directory."""
+
+    def __init__(self, backend=None, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES):
+        self.backend = backend if backend is not None else GraphBackend.from_env()
+        self.workers = max(1, workers)
+        self.retries = retries
+
+    # ── public API ────────────────────────────────────────────────────
+    def list_files(self, folder_path=""):
+        """Remote files under ``folder_path`` as {id, path, size, etag, modified} dicts."""
+        items, _ = self.backend.delta(None)
+        folder = folder_path.strip("/")
+        return [item for item in items if not item.get("deleted")
+                and (not folder or _in_folders(item["path"], [folder]))]
 
     def download_file(self, remote_path, local_path):
-        """
-        Download a file from SharePoint to a local path.
+        """Download one remote file (path relative to the drive root) to ``local_path``."""
+        remote_path = remote_path.strip("/")
+        for item in self.list_files(os.path.dirname(remote_path)):
+            if item["path"] == remote_path:
+                self._download(item, local_path, resume=False)
+                return local_path
+        raise SyncError(f"{remote_path} not found on {self.backend.name} backend")
 
-        Args:
-            remote_path: Path within the document library
-            local_path: Local filesystem path to save the file
+    def sync_retailer_folder(self, retailer_folder, local_dir):
+        """Sync one retailer folder (e.g. "NGVC"); return the changed local paths."""
+        result = self.sync([retailer_folder], local_dir)
+        return result["downloaded"] + result["deleted"]
 
-        TODO: Implement via Microsoft Graph API:
-            GET /drives/{drive_id}/root:/{remote_path}:/content
-        """
-        raise NotImplementedError("SharePoint file download not yet implemented.")
+    def sync(self, folders, local_dir, log=True):
+        """Bring ``folders`` under ``local_dir`` up to date with the remote drive.
 
-    def sync_retailer_folder(self, retailer_key, local_dir):
+        Returns the sync record also appended to the sync log: downloaded /
+        deleted local paths, changed folders, skipped and failed files.
         """
-        Sync all files for a retailer from SharePoint to local directory.
+        folders = [f.strip("/") for f in folders]
+        started = time.perf_counter()
+        state = self._load_state(local_dir)
+        self._apply_delta(state)
 
-        Args:
-            retailer_key: Retailer folder name (e.g. "NGVC", "Sprouts")
-            local_dir: Local directory to sync files into
+        remote = {item["path"]: item for item in state["remote"].values()
+                  if _in_folders(item["path"], folders)}
+        local = state["local"]
+        todo = []
+        skipped = 0
+        for path, item in sorted(remote.items()):
+            target = os.path.join(local_dir, *path.split("/"))
+            known = local.get(path)
+            if (known and known["etag"] == item["etag"] and known["size"] == item["size"]
+                    and os.path.isfile(target) and os.path.getsize(target) == item["size"]):
+                skipped += 1
+            else:
+                todo.append((item, target))
 
-        Returns:
-            List of newly downloaded/updated file paths
+        deleted = []
+        for path in sorted(local):
+            if _in_folders(path, folders) and path not in remote:
+                target = os.path.join(local_dir, *path.split("/"))
+                if os.path.isfile(target):
+                    os.remove(target)
+                    deleted.append(path)
+                del local[path]
 
-        TODO: Implement incremental sync:
-            1. List remote files in retailer folder
-            2. Compare with local files (by name + modified date)
-            3. Download only new/updated files
-            4. Return list of changed files
-        """
-        raise NotImplementedError("SharePoint folder sync not yet implemented.")
+        # Record in-flight transfers first so a killed run can resume them;
+        # a .part left by a different remote version is started over
+        for item, target in todo:
+            if state["partial"].get(item["path"]) != item["etag"] \
+                    and os.path.isfile(target + PART_SUFFIX):
+                os.remove(target + PART_SUFFIX)
+            state["partial"][item["path"]] = item["etag"]
+        self._save_state(local_dir, state)
+
+        downloaded, failed = [], []
+        total_bytes = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._download_with_retries, item, target): item
+                       for item, target in todo}
+            for future, item in futures.items():
+                try:
+                    total_bytes += future.result()
+                except Exception as e:
+                    failed.append({"path": item["path"], "error": str(e)})
+                    print(f"  [sync] FAILED {item['path']}: {e}")
+                    continue
+                downloaded.append(item["path"])
+                local[item["path"]] = {"etag": item["etag"], "size": item["size"]}
+                state["partial"].pop(item["path"], None)
+        self._save_state(local_dir, state)
+
+        changed = sorted({f for f in folders
+                          if any(_in_folders(p, [f]) for p in downloaded + deleted)})
+        record = {
+            "synced_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+            "backend": self.backend.name,
+            "folders": folders,
+            "changed_folders": changed,
+            "downloaded": downloaded,
+            "deleted": deleted,
+            "skipped": skipped,
+            "failed": failed,
+            "bytes": total_bytes,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        print(f"  [sync] {len(downloaded)} downloaded ({total_bytes:,} bytes), "
+              f"{len(deleted)} deleted, {skipped} unchanged"
+              + (f", {len(failed)} FAILED" if failed else ""))
+        if log:
+            append_sync_log(local_dir, record)
+        return record
+
+    # ── state ─────────────────────────────────────────────────────────
+    def _load_state(self, local_dir):
+        path = os.path.join(local_dir, STATE_FILE)
+        state = None
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+        if not state or state.get("backend") != self.backend.name:
+            state = {"backend": self.backend.name, "delta_token": None}
+        for key in ("remote", "local", "partial"):
+            state.setdefault(key, {})
+        return state
+
+    def _save_state(self, local_dir, state):
+        os.makedirs(local_dir, exist_ok=True)
+        path = os.path.join(local_dir, STATE_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def _apply_delta(self, state):
+        """Fold the backend's changes since the stored token into state["remote"]."""
+        try:
+            items, token = self.backend.delta(state["delta_token"])
+        except SyncError as e:
+            if state["delta_token"] is None:
+                raise
+            print(f"  [sync] {e}; re-enumerating the drive")
+            state["remote"], state["delta_token"] = {}, None
+            items, token = self.backend.delta(None)
+        if state["delta_token"] is None:
+            state["remote"] = {}
+        for item in items:
+            if item.get("deleted"):
+                state["remote"].pop(item["id"], None)
+            else:
+                state["remote"][item["id"]] = item
+        state["delta_token"] = token
+
+    # ── downloads ─────────────────────────────────────────────────────
+    def _download_with_retries(self, item, target):
+        """_download(), retried with backoff; each retry resumes the .part file."""
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download(item, target)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _download(self, item, target, resume=True):
+        """Stream ``item`` into ``target`` via a .part file; return bytes transferred."""
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        part = target + PART_SUFFIX
+        offset = os.path.getsize(part) if resume and os.path.isfile(part) else 0
+        if offset > item["size"]:
+            offset = 0
+        chunks, start = self.backend.open(item, offset)
+        transferred = 0
+        with open(part, "r+b" if start and os.path.isfile(part) else "wb") as f:
+            f.seek(start)
+            f.truncate()
+            for chunk in chunks:
+                f.write(chunk)
+                transferred += len(chunk)
+        size = os.path.getsize(part)
+        if size != item["size"]:
+            raise SyncError(f"{item['path']}: got {size} bytes, expected {item['size']}")
+        mtime = _timestamp(item.get("modified"))
+        if mtime is not None:
+            os.utime(part, (mtime, mtime))
+        os.replace(part, target)
+        return transferred
+
+
+# ── sync log ──────────────────────────────────────────────────────────
+def append_sync_log(local_dir, record):
+    """Append one sync record to <local_dir>/sync_log.jsonl."""
+    with open(os.path.join(local_dir, LOG_FILE), "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def read_sync_log(local_dir):
+    """Every sync record in <local_dir>/sync_log.jsonl, oldest first."""
+    path = os.path.join(local_dir, LOG_FILE)
+    if not os.path.isfile(path):
+        return []
+    records = []
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # a line cut short by a killed sync
+    return records
+
+
+def changed_folders(local_dir, since=None):
+    """Folders with downloads or deletions in syncs after ``since`` ("YYYY-MM-DDTHH:MM:SS")."""
+    folders = set()
+    for record in read_sync_log(local_dir):
+        if since is None or record.get("synced_at", "") > since:
+            folders.update(record.get("changed_folders", []))
+    return folders
+
+
+# ── local HTTP stand-in ───────────────────────────────────────────────
+def serve_directory(root, host="127.0.0.1", port=8765, page_size=200):
+    """HTTP server publishing ``root`` as a Graph-shaped drive (delta + content).
+
+    Delta links carry a token naming a listing snapshot held in memory, so
+    repeated syncs see only what changed.  Call serve_forever() on the
+    result, or run ``python -m etl.sharepoint_client --serve DIR``.
+    """
+    drive = _DirectoryDrive(root)
+    snapshots = {}  # delta token -> {id: eTag}
+    listings = {}   # listing id -> (items, delta token), for paging
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _json(self, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip("/").split("/")
+            query = parse_qs(url.query)
+            base = f"http://{self.headers.get('Host', f'{host}:{port}')}"
+            if len(parts) == 4 and parts[0] == "drives" and parts[2:] == ["root", "delta"]:
+                return self._delta(base + url.path, query)
+            if len(parts) == 5 and parts[0] == "drives" and parts[2] == "items" \
+                    and parts[4] == "content":
+                return self._content(unquote(parts[3]))
+            self.send_error(404)
+
+        def _delta(self, delta_url, query):
+            token = query.get("token", [None])[0]
+            listing_id = query.get("listing", [None])[0]
+            skip = int(query.get("skip", ["0"])[0])
+            with lock:
+                if token is not None and token not in snapshots:
+                    return self.send_error(410, "delta token expired")
+                if listing_id is None:
+                    # First page: diff against the token's snapshot once,
+                    # later pages of this delta read the stored listing
+                    items, snapshot = drive.delta(snapshots[token] if token else None)
+                    snapshots[str(len(snapshots) + 1)] = snapshot
+                    listing_id = str(len(listings) + 1)
+                    listings[listing_id] = (items, str(len(snapshots)))
+                if listing_id not in listings:
+                    return self.send_error(410, "delta listing expired")
+                items, new_token = listings[listing_id]
+            page = {"value": items[skip:skip + page_size]}
+            if skip + page_size < len(items):
+                page["@odata.nextLink"] = (f"{delta_url}?listing={listing_id}"
+                                           f"&skip={skip + page_size}")
+            else:
+                page["@odata.deltaLink"] = f"{delta_url}?token={new_token}"
+            self._json(page)
+
+        def _content(self, item_id):
+            try:
+                f = drive.open(item_id)
+            except SyncError:
+                return self.send_error(404)
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                start = 0
+                range_header = self.headers.get("Range", "")
+                if range_header.startswith("bytes=") and range_header.endswith("-"):
+                    start = min(int(range_header[6:-1]), size)
+                f.seek(start)
+                self.send_response(206 if start else 200)
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(size - start))
+                self.end_headers()
+                shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync SharePoint POS folders locally")
+    parser.add_argument("--local-dir", help="Local source directory to sync into")
+    parser.add_argument("--folders", nargs="+", default=[],
+                        help='Remote folders to sync (e.g. "NGVC" "Sprouts")')
+    parser.add_argument("--source", default=None,
+                        help="Directory or http(s) URL standing in for SharePoint "
+                             "(default: SharePoint via SHAREPOINT_* env vars)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent downloads (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--serve", metavar="DIR",
+                        help="Serve DIR as a local Graph-shaped drive instead of syncing")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        server = serve_directory(args.serve, port=args.port)
+        print(f"Serving {os.path.abspath(args.serve)} at http://127.0.0.1:{args.port}")
+        server.serve_forever()
+        return 0
+    if not args.local_dir or not args.folders:
+        parser.error("--local-dir and --folders are required to sync")
+    try:
+        client = SharePointClient(backend_for(args.source), workers=args.workers)
+        result = client.sync(args.folders, os.path.abspath(args.local_dir))
+    except SyncError as e:
+        print(f"ERROR: {e}")
+        return 1
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
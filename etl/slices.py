@@ -0,0 +1,241 @@
+"""
+Dashboard time slices — the objects the React views consume, built in Python.
+
+Ports of computeMonthlySlice, computeWeeklySlice and the rollup readers
+(quarterlySliceFromRollups, ytdSliceFromRollups, quarterOverviewFromRollups)
+in src/utils/timePeriodUtils.js, returning the same camelCase keys, so a
+slice served by etl/query_service.py can be dropped in where the browser
+computed one:
+
+    {"currentData", "comparisonData", "trendData", "periodLabel",
+     "fullPrevYearData", "comparableMonths", "monthsWithData", "isComplete",
+     + qepDollars / qepUnits (quarterly),
+     + yepDollars / yepUnits / paceDollarsPct / paceUnitsPct / yearA / yearB (YTD)}
+
+Quarter and YTD slices read a rollups.json dict (etl/rollups.py), which
+uses the same comparable-months rules and summation order as the
+JavaScript.
+"""
+
+from datetime import date, timedelta
+
+from etl.rollups import MONTH_NAMES, period_totals, quarter_rollup
+
+GRAINS = ("weekly", "monthly", "quarterly", "ytd")
+
+
+def month_name(period_key):
+    """periodToMonthName()."""
+    try:
+        return MONTH_NAMES[int(period_key[5:7]) - 1]
+    except (ValueError, IndexError):
+        return period_key
+
+
+def _year_pair(periods):
+    years = sorted({key[:4] for key in periods})
+    if len(years) < 2:
+        year = years[0] if years else None
+        return year, year
+    return years[-2], years[-1]
+
+
+def _trend_row(key, label, totals):
+    return {
+        "period": key,
+        "label": label,
+        "year": key[:4],
+        "month": key[5:7],
+        "dollars": totals["dollars"],
+        "units": totals["units"],
+        "productCount": totals["product_count"],
+    }
+
+
+def _month_trend(month_totals, keys):
+    """trendFromTotals()."""
+    empty = {"dollars": 0, "units": 0, "product_count": 0}
+    return [_trend_row(key, f"{month_name(key)} '{key[2:4]}", month_totals.get(key, empty))
+            for key in keys]
+
+
+# ── period lists ──────────────────────────────────────────────────────
+def available_months(periods):
+    """getAvailableMonths(): periods of the latest two years."""
+    year_a, year_b = _year_pair(periods)
+    keys = sorted(periods)
+    if year_a == year_b:
+        return keys
+    return [k for k in keys if k.startswith(year_a) or k.startswith(year_b)]
+
+
+def available_quarters(periods):
+    """getAvailableQuarters(): "YYYY-QN" with data in the latest two years."""
+    year_a, year_b = _year_pair(periods)
+    years = [year_b] if year_a == year_b else [year_a, year_b]
+    return [
+        f"{year}-Q{q}"
+        for year in years if year
+        for q in range(1, 5)
+        if any(f"{year}-{(q - 1) * 3 + m:02d}" in periods for m in range(1, 4))
+    ]
+
+
+def available_weeks(weekly_periods):
+    """getAvailableWeeks(): week-ending keys of the last two years."""
+    keys = sorted(weekly_periods or {})
+    if not keys:
+        return keys
+    latest = date.fromisoformat(keys[-1])
+    try:
+        cutoff = latest.replace(year=latest.year - 2)
+    except ValueError:  # Feb 29 -> Mar 1, as Date.setFullYear() rolls over
+        cutoff = latest.replace(year=latest.year - 2, day=28) + timedelta(days=1)
+    return [k for k in keys if k >= cutoff.isoformat()]
+
+
+def period_options(pos_data, rollups):
+    """What the view selectors need: period lists, primary metric, quarter overview."""
+    periods = pos_data.get("periods") or {}
+    weekly = pos_data.get("weekly_periods") or {}
+    return {
+        "primaryMetric": rollups.get("primary_metric"),
+        "availableMonths": available_months(periods),
+        "availableQuarters": available_quarters(periods),
+        "availableWeeks": available_weeks(weekly),
+        "hasWeekly": bool(weekly),
+        "quarterOverview": quarter_overview(rollups),
+    }
+
+
+# ── slices ────────────────────────────────────────────────────────────
+def monthly_slice(periods, month_key, month_totals):
+    """computeMonthlySlice(); ``month_totals`` is rollups["month_totals"]."""
+    comparison_year = str(int(month_key[:4]) - 1)
+    comparison_key = f"{comparison_year}-{month_key[5:7]}"
+    keys = sorted(periods)
+
+    full_prev = {}
+    for key in keys:
+        if not key.startswith(comparison_year):
+            continue
+        for upc, metrics in periods[key].items():
+            acc = full_prev.setdefault(upc, {"dollars": 0, "units": 0})
+            acc["dollars"] += metrics.get("dollars") or 0
+            acc["units"] += metrics.get("units") or 0
+
+    return {
+        "currentData": periods.get(month_key, {}),
+        "comparisonData": periods.get(comparison_key, {}),
+        "trendData": _month_trend(month_totals, keys),
+        "periodLabel": f"{month_name(month_key)} {month_key[:4]}",
+        "fullPrevYearData": full_prev,
+        "comparableMonths": 1,
+        "monthsWithData": 1,
+        "isComplete": True,
+    }
+
+
+def quarterly_slice(rollups, periods, quarter_key):
+    """quarterlySliceFromRollups(), or the quarter computed when the rollups lack it."""
+    q = rollups.get("quarters", {}).get(quarter_key) or quarter_rollup(periods, quarter_key)
+    if q is None:
+        return None
+    return {
+        "currentData": q["current"],
+        "comparisonData": q["comparison"],
+        "trendData": _month_trend(rollups["month_totals"],
+                                  sorted(q["full_prev_months"] + q["months"])),
+        "periodLabel": q["period_label"],
+        "fullPrevYearData": q["full_prev"],
+        "comparableMonths": q["comparable_months"],
+        "monthsWithData": q["months_with_data"],
+        "isComplete": q["is_complete"],
+        "qepDollars": q["qep_dollars"],
+        "qepUnits": q["qep_units"],
+    }
+
+
+def ytd_slice(rollups):
+    """ytdSliceFromRollups()."""
+    y = rollups.get("ytd")
+    if not y:
+        return None
+    year_a, year_b = rollups["year_a"], rollups["year_b"]
+    keys = sorted(k for k in rollups["month_totals"]
+                  if k.startswith(year_b) or (year_a != year_b and k.startswith(year_a)))
+    return {
+        "currentData": y["current"],
+        "comparisonData": y["comparison"],
+        "trendData": _month_trend(rollups["month_totals"], keys),
+        "periodLabel": y["period_label"],
+        "fullPrevYearData": y["full_prev"],
+        "comparableMonths": y["comparable_months"],
+        "monthsWithData": y["months_with_data"],
+        "isComplete": y["is_complete"],
+        "yepDollars": y["yep_dollars"],
+        "yepUnits": y["yep_units"],
+        "paceDollarsPct": y["pace_dollars_pct"],
+        "paceUnitsPct": y["pace_units_pct"],
+        "yearA": year_a,
+        "yearB": year_b,
+    }
+
+
+def quarter_overview(rollups):
+    """quarterOverviewFromRollups()."""
+    return [
+        {
+            "quarter": row["quarter"],
+            "displayLabel": row["display_label"],
+            "currentTotal": row["current_total"],
+            "comparisonTotal": row["comparison_total"],
+            "qep": row["qep"],
+            "monthsWithData": row["months_with_data"],
+            "isComplete": row["is_complete"],
+            "yoyPct": row["yoy_pct"],
+            "pacePercent": row["pace_percent"],
+            "monthCount": row["month_count"],
+            "productCount": row["product_count"],
+        }
+        for row in rollups.get("quarter_overview", [])
+    ]
+
+
+def week_label(week_key):
+    """weekKeyToLabel(): "Mar 7, '25"."""
+    d = date.fromisoformat(week_key)
+    return f"{MONTH_NAMES[d.month - 1]} {d.day}, '{str(d.year)[2:]}"
+
+
+def weekly_slice(weekly_periods, week_key):
+    """computeWeeklySlice(): the week, its closest week 52 weeks back (±7 days), 12-week trend."""
+    keys = sorted(weekly_periods)
+    idx = keys.index(week_key) if week_key in keys else -1
+    selected = date.fromisoformat(week_key)
+    target = selected - timedelta(days=364)
+
+    comparison_key = None
+    best = None
+    for key in keys:
+        diff = abs((date.fromisoformat(key) - target).days)
+        if diff <= 7 and (best is None or diff < best):
+            best, comparison_key = diff, key
+    comparison = weekly_periods.get(comparison_key, {}) if comparison_key else {}
+
+    trend = []
+    for key in keys[max(0, idx - 11):idx + 1]:
+        d = date.fromisoformat(key)
+        trend.append(_trend_row(key, f"{MONTH_NAMES[d.month - 1]} {d.day}",
+                                period_totals(weekly_periods[key])))
+
+    return {
+        "currentData": weekly_periods.get(week_key, {}),
+        "comparisonData": comparison,
+        "trendData": trend,
+        "periodLabel": f"Week ending {week_label(week_key)}",
+        "fullPrevYearData": comparison,
+        "comparableMonths": 1,
+        "monthsWithData": 1,
+        "isComplete": True,
+    }
@@ -0,0 +1,252 @@
+"""
+SQL sink — the ETL output as tables in a local SQLite or DuckDB database.
+
+With --sink PATH, run_etl loads each retailer it ran into PATH after the
+run is written (and published, with --staged): a DuckDB database when PATH
+ends in .duckdb (needs the duckdb package), SQLite otherwise.
+The same load works on an existing output directory:
+
+    python -m etl.sql_sink --output-dir public/data --db pos.sqlite
+
+Tables (all keyed by retailer first):
+
+    retailers       retailer, display_name, time_grain, last_updated, content_hash, loaded_at
+    products        retailer, upc, product_name, brand, category, subcategory,
+                    set_status, acv, store_count, attributes (other keys, JSON)
+    period_facts    retailer, grain, period, upc, dollars, units, dollars_yago,
+                    units_yago, dollars_yoy_pct, units_yoy_pct
+                    (monthly, plus quarterly / yearly with --calendar-periods)
+    weekly_facts    retailer, week_end, upc, <same metrics>
+    inventory       retailer, upc, period, as_of, product_name, record (JSON)
+    ltoos           retailer, upc, as_of, ltoos, days_on_ltoos, product_name
+
+Each retailer is replaced as a whole in one transaction, so a reader never
+sees half a load and reloading the same output is a no-op (the manifest's
+content_hash is compared first).  Facts are indexed on (retailer, period,
+upc) and on (upc, period) for cross-retailer lookups.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+try:
+    import duckdb
+except ImportError:  # optional — only for .duckdb sinks
+    duckdb = None
+
+METRIC_COLUMNS = ("dollars", "units", "dollars_yago", "units_yago",
+                  "dollars_yoy_pct", "units_yoy_pct")
+
+# pos_data period block -> grain stored in period_facts
+PERIOD_GRAINS = {
+    "periods": "monthly",
+    "quarterly_periods": "quarterly",
+    "yearly_periods": "yearly",
+}
+
+PRODUCT_COLUMNS = ("upc", "product_name", "brand", "category", "subcategory",
+                   "set_status", "acv", "store_count")
+
+_METRIC_DDL = ", ".join(f"{name} DOUBLE" for name in METRIC_COLUMNS)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS retailers (
+        retailer TEXT NOT NULL, display_name TEXT, time_grain TEXT,
+        last_updated TEXT, content_hash TEXT, loaded_at TEXT)""",
+    """CREATE TABLE IF NOT EXISTS products (
+        retailer TEXT NOT NULL, upc TEXT NOT NULL, product_name TEXT, brand TEXT,
+        category TEXT, subcategory TEXT, set_status TEXT, acv DOUBLE, store_count DOUBLE,
+        attributes TEXT)""",
+    f"""CREATE TABLE IF NOT EXISTS period_facts (
+        retailer TEXT NOT NULL, grain TEXT NOT NULL, period TEXT NOT NULL,
+        upc TEXT NOT NULL, {_METRIC_DDL})""",
+    f"""CREATE TABLE IF NOT EXISTS weekly_facts (
+        retailer TEXT NOT NULL, week_end TEXT NOT NULL, upc TEXT NOT NULL,
+        {_METRIC_DDL})""",
+    """CREATE TABLE IF NOT EXISTS inventory (
+        retailer TEXT NOT NULL, upc TEXT, period TEXT, as_of TEXT,
+        product_name TEXT, record TEXT)""",
+    """CREATE TABLE IF NOT EXISTS ltoos (
+        retailer TEXT NOT NULL, upc TEXT, as_of TEXT, ltoos INTEGER,
+        days_on_ltoos INTEGER, product_name TEXT)""",
+    "CREATE {unique}INDEX IF NOT EXISTS retailers_key ON retailers (retailer)",
+    "CREATE {unique}INDEX IF NOT EXISTS products_key ON products (retailer, upc)",
+    "CREATE {unique}INDEX IF NOT EXISTS period_facts_key ON period_facts (retailer, period, upc)",
+    "CREATE {unique}INDEX IF NOT EXISTS weekly_facts_key ON weekly_facts (retailer, week_end, upc)",
+    "CREATE INDEX IF NOT EXISTS period_facts_grain ON period_facts (retailer, grain, period)",
+    "CREATE INDEX IF NOT EXISTS period_facts_upc ON period_facts (upc, period)",
+    "CREATE INDEX IF NOT EXISTS weekly_facts_upc ON weekly_facts (upc, week_end)",
+    "CREATE INDEX IF NOT EXISTS inventory_key ON inventory (retailer, period, upc)",
+    "CREATE INDEX IF NOT EXISTS ltoos_key ON ltoos (retailer, as_of, upc)",
+)
+
+# Tables cleared when a retailer is replaced
+RETAILER_TABLES = ("products", "period_facts", "weekly_facts", "inventory", "ltoos")
+
+
+def _metrics(rec):
+    return tuple(rec.get(name) for name in METRIC_COLUMNS)
+
+
+def _read_json(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class SqlSink:
+    """Per-retailer replace of ETL output into one SQLite/DuckDB database file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.engine = "duckdb" if path.endswith(".duckdb") else "sqlite"
+        if self.engine == "duckdb" and duckdb is None:
+            raise RuntimeError("a .duckdb sink needs the 'duckdb' package")
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        if self.engine == "duckdb":
+            self.conn = duckdb.connect(path)
+        else:
+            # Autocommit; transactions are opened explicitly per retailer
+            self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        # Keys are unique in SQLite only: DuckDB rejects deleting and re-inserting
+        # a unique key inside one transaction, which is how a retailer is replaced
+        unique = "UNIQUE " if self.engine == "sqlite" else ""
+        for statement in SCHEMA:
+            self.conn.execute(statement.replace("{unique}", unique))
+
+    def close(self):
+        self.conn.close()
+
+    def loaded_hash(self, retailer):
+        row = self.conn.execute(
+            "SELECT content_hash FROM retailers WHERE retailer = ?", [retailer]
+        ).fetchone()
+        return row[0] if row else None
+
+    def load_retailer(self, retailer, retailer_dir, entry):
+        """Replace ``retailer``'s rows from its output directory; return row counts.
+
+        Returns None when the database already holds this content_hash.
+        """
+        content_hash = entry.get("content_hash")
+        if content_hash and self.loaded_hash(retailer) == content_hash:
+            return None
+        pos_data = _read_json(os.path.join(retailer_dir, "pos_data.json"))
+        if pos_data is None:
+            raise FileNotFoundError(f"{retailer_dir}/pos_data.json not found")
+        inventory = _read_json(os.path.join(retailer_dir, "inventory.json")) or {}
+        ltoos = _read_json(os.path.join(retailer_dir, "ltoos_history.json")) or {}
+
+        rows = {
+            "products": [self._product_row(retailer, p) for p in pos_data.get("products", [])],
+            "period_facts": [
+                (retailer, grain, period, upc) + _metrics(rec)
+                for block, grain in PERIOD_GRAINS.items()
+                for period, upc_metrics in pos_data.get(block, {}).items()
+                for upc, rec in upc_metrics.items()
+            ],
+            "weekly_facts": [
+                (retailer, week_end, upc) + _metrics(rec)
+                for week_end, upc_metrics in pos_data.get("weekly_periods", {}).items()
+                for upc, rec in upc_metrics.items()
+            ],
+            "inventory": [
+                (retailer, rec.get("upc"), rec.get("period") or rec.get("as_of"),
+                 rec.get("as_of"), rec.get("product_name"), json.dumps(rec))
+                for rec in inventory.get("records", [])
+            ],
+            "ltoos": [
+                (retailer, rec.get("upc"), rec.get("as_of"), int(bool(rec.get("ltoos"))),
+                 rec.get("days_on_ltoos"), rec.get("product_name"))
+                for rec in ltoos.get("records", [])
+            ],
+        }
+
+        self.conn.execute("BEGIN IMMEDIATE" if self.engine == "sqlite" else "BEGIN TRANSACTION")
+        try:
+            for table in RETAILER_TABLES:
+                self.conn.execute(f"DELETE FROM {table} WHERE retailer = ?", [retailer])
+                if rows[table]:
+                    marks = ", ".join("?" * len(rows[table][0]))
+                    self.conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows[table])
+            self.conn.execute("DELETE FROM retailers WHERE retailer = ?", [retailer])
+            self.conn.execute(
+                "INSERT INTO retailers VALUES (?, ?, ?, ?, ?, ?)",
+                [retailer, entry.get("display_name"), pos_data.get("time_grain"),
+                 pos_data.get("last_updated"), content_hash,
+                 time.strftime("%Y-%m-%dT%H:%M:%S")],
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {table: len(table_rows) for table, table_rows in rows.items()}
+
+    @staticmethod
+    def _product_row(retailer, product):
+        extra = {k: v for k, v in product.items() if k not in PRODUCT_COLUMNS}
+        return ((retailer,) + tuple(product.get(name) for name in PRODUCT_COLUMNS)
+                + (json.dumps(extra) if extra else None,))
+
+
+def load_output(db_path, output_dir, retailer_keys=None):
+    """Load the retailers of ``output_dir``'s manifest (or just ``retailer_keys``).
+
+    A retailer that fails to load keeps its previous rows; returns the
+    keys that failed.
+    """
+    manifest = _read_json(os.path.join(output_dir, "data_manifest.json"))
+    if manifest is None:
+        raise FileNotFoundError(f"No data_manifest.json in {output_dir}")
+    entries = manifest.get("retailers", {})
+    keys = [key for key in (retailer_keys or entries) if key in entries]
+
+    sink = SqlSink(db_path)
+    started = time.perf_counter()
+    failed = []
+    try:
+        for key in keys:
+            try:
+                counts = sink.load_retailer(key, os.path.join(output_dir, key), entries[key])
+            except (OSError, ValueError) as e:
+                print(f"  [sink] ERROR {key}: {e}")
+                failed.append(key)
+                continue
+            if counts is None:
+                print(f"  [sink] {key}: unchanged")
+            else:
+                print(f"  [sink] {key}: " + ", ".join(f"{n} {table}"
+                                                     for table, n in counts.items() if n))
+    finally:
+        sink.close()
+    print(f"Loaded {len(keys) - len(failed)} retailer(s) into {db_path} ({sink.engine}) "
+          f"in {time.perf_counter() - started:.2f}s")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load ETL output into SQLite/DuckDB")
+    parser.add_argument("--output-dir", required=True,
+                        help="ETL output directory (holding data_manifest.json)")
+    parser.add_argument("--db", required=True,
+                        help="Database file; DuckDB when it ends in .duckdb")
+    parser.add_argument("--retailer", nargs="+", default=None,
+                        help="Retailer key(s) to load (default: all in the manifest)")
+    args = parser.parse_args(argv)
+    try:
+        failed = load_output(args.db, os.path.abspath(args.output_dir), args.retailer)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"ERROR: {e}")
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+"""
+Synthetic source data — every adapter's input layout, at any scale.
+
+Writes a SharePoint_POS-style tree that the adapters read exactly like the
+real one, so optimizations can be measured without the real files:
+
+    Vitacost/History/Vitacost - Vendor Report-OMNI for Monday - MM-DD-YYYY.xlsx
+        monthly workbooks: YesterDay-, WTD-, MTD- (4-row merged header),
+        YTD-, Current Inventory- and Glossary- sheets; OMNIw weekly files
+        for the months after the last monthly one
+    TVS/Irwin Naturals_All In Stock M.D.YY.xlsx       two snapshots a month
+    FreshThyme/FreshThyme_<Month>_<YYYY>.xlsx          "Unnamed:" column reports
+                                                       with a Grand Total row
+    iHerb/<YYYY>/<YYYYMM>_IRW.csv                      rolling 14-month units
+    NGVC/Irwin_Naturals_NGVC.xlsx                      SPINS 4-week periods
+    NGVC/P12 - Irwin_Naturals_Pull.xlsx                SPINS weeks
+    NGVC/Irwin Naturals Units <MON> <YYYY>.xlsx        units + set status
+    Sprouts/45934e10-2794-4865-a52a-d2c5b10f6374.xlsx  SPINS weeks
+
+``scale`` multiplies the catalog (BASE_UPCS UPCs at 1x) and so every row
+count; the history length stays fixed at HISTORY_MONTHS.  Output is fully
+determined by (scale, seed), and a generated tree records both in
+.synthetic.json so it can be reused:
+
+    python -m etl.synthetic --out /tmp/pos_synth --scale 10
+"""
+
+import argparse
+import calendar
+import json
+import os
+import shutil
+from datetime import date, timedelta
+
+import numpy as np
+from openpyxl import Workbook
+
+# Bump when the generated layout or values change, to invalidate trees on disk
+GENERATOR_VERSION = 1
+MARKER_FILE = ".synthetic.json"
+
+BASE_UPCS = 100         # catalog size at scale 1
+HISTORY_MONTHS = 24     # months of history, ending at END_MONTH
+END_MONTH = (2025, 12)
+SPROUTS_WEEKS = 52
+NGVC_WEEKS = 12
+
+BRAND = "IRWIN NATURALS"
+CATEGORIES = {
+    "VITAMINS & MINERALS": ["MULTIVITAMINS", "VITAMIN D", "MAGNESIUM"],
+    "HERBS & BOTANICALS": ["SINGLE HERBS", "HERBAL FORMULAS"],
+    "WEIGHT MANAGEMENT": ["FAT BURNERS", "APPETITE CONTROL"],
+    "SLEEP & STRESS": ["SLEEP AIDS", "STRESS & MOOD"],
+}
+PRODUCT_WORDS = ["Triple-Boost", "Steel-Libido", "Mega D3+K2", "Ashwagandha", "Sleep-Well",
+                 "Brain-Awake", "Liver Detox", "CBD+ Calm", "Turmeric", "Magnesium",
+                 "Prostate", "Hair Skin & Nails", "Testosterone UP", "Kelp"]
+
+
+class Catalog:
+    """The synthetic UPC universe shared by every retailer."""
+
+    def __init__(self, n_upcs, rng):
+        self.upcs = [f"71036{n:06d}" for n in
+                     rng.choice(np.arange(100000, 999999), size=n_upcs, replace=False)]
+        categories = list(CATEGORIES)
+        self.category = [categories[i % len(categories)] for i in range(n_upcs)]
+        self.subcategory = [CATEGORIES[c][i % len(CATEGORIES[c])]
+                            for i, c in enumerate(self.category)]
+        self.name = [f"{PRODUCT_WORDS[i % len(PRODUCT_WORDS)]} {30 + 30 * (i % 4)} CT"
+                     for i in range(n_upcs)]
+        self.price = np.round(rng.uniform(9.99, 44.99, n_upcs), 2)
+        # Weekly unit velocity: a few best sellers, a long tail
+        self.velocity = rng.lognormal(mean=1.2, sigma=0.9, size=n_upcs)
+        self.growth = rng.normal(1.05, 0.15, n_upcs).clip(0.5, 1.8)  # YoY multiplier
+
+    def __len__(self):
+        return len(self.upcs)
+
+
+# ── calendar ──────────────────────────────────────────────────────────
+def _months():
+    """(year, month) pairs of the history, oldest first."""
+    year, month = END_MONTH
+    months = []
+    for _ in range(HISTORY_MONTHS):
+        months.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def _saturdays(end, count):
+    """``count`` week-ending Saturdays up to ``end``, oldest first."""
+    last = end - timedelta(days=(end.weekday() - 5) % 7)
+    return [last - timedelta(weeks=i) for i in range(count)][::-1]
+
+
+def _season(month):
+    """Retail seasonality: a January bump and a summer dip."""
+    return 1.0 + 0.15 * np.cos((month - 1) / 12 * 2 * np.pi)
+
+
+def _units(catalog, rng, weeks, month, years_back=0):
+    """Units sold per UPC over ``weeks`` weeks (integers, some zero)."""
+    mean = catalog.velocity * weeks * _season(month) / catalog.growth ** years_back
+    units = rng.poisson(mean)
+    units[rng.random(len(catalog)) < 0.04] = 0  # out of stock / not ranged
+    return units
+
+
+# ── writers ───────────────────────────────────────────────────────────
+def _write_rows(path, header, rows):
+    """Single-sheet XLSX (header row + rows) written in streaming mode."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def _mkdir(*parts):
+    path = os.path.join(*parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# ── retailers ─────────────────────────────────────────────────────────
+MTD_HEADER = ["Category Name", "Secondary Category", "Third Category", "Vendor ID", "Product",
+              "Brand ID", "Kroger GTIN", "Product Name", "UPC", "Net Sales", "Units", "Orders",
+              "AOV", "ASP", "Avg Cost", "Product Margin%"]
+INVENTORY_HEADER = ["UPC", "GTIN", "Description", "BrandName", "Primary Vendor",
+                    "VITACOST Status", "STH Status", "NC OnHand", "LV OnHand", "MZ OnHand",
+                    "NC PO On Order", "LV PO On Order", "MZ PO On Order", "Inventory Date"]
+
+
+def _vitacost_workbook(path, catalog, rng, units, file_date):
+    wb = Workbook()
+    wb.remove(wb.active)
+    for title in ("YesterDay-", "WTD-"):
+        wb.create_sheet(title).append(["Vendor Report - OMNI"])
+
+    ws = wb.create_sheet("MTD-")
+    ws.append([f"Vendor Report - OMNI - Month To Date ({file_date:%m/%d/%Y})"])
+    ws.append([BRAND])
+    ws.append([])
+    ws.append(MTD_HEADER)
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(MTD_HEADER))
+    ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=len(MTD_HEADER))
+    for i, upc in enumerate(catalog.upcs):
+        if units[i] == 0 and rng.random() < 0.5:
+            continue  # no sales this month: not listed
+        orders = max(int(units[i] * 0.8), 1 if units[i] else 0)
+        sales = round(float(units[i] * catalog.price[i] * rng.uniform(0.85, 1.0)), 2)
+        ws.append([catalog.category[i], catalog.subcategory[i], "", 5512, 100000 + i, BRAND, "",
+                   catalog.name[i], int(upc), sales, int(units[i]), orders,
+                   round(sales / orders, 2) if orders else 0,
+                   round(sales / units[i], 2) if units[i] else 0,
+                   round(float(catalog.price[i]) * 0.45, 2), 0.42])
+
+    wb.create_sheet("YTD-").append(["Vendor Report - OMNI - Year To Date"])
+    ws = wb.create_sheet("Current Inventory-")
+    ws.append(INVENTORY_HEADER)
+    for i, upc in enumerate(catalog.upcs):
+        on_hand = rng.poisson(catalog.velocity[i] * 6, 3)
+        ws.append([int(upc), 0, catalog.name[i], "Irwin Naturals", "IRWIN NATURALS",
+                   "Active" if rng.random() > 0.05 else "Discontinued", "Y",
+                   *map(int, on_hand), 0, int(rng.integers(0, 2)) * 24, 0,
+                   file_date.strftime("%Y-%m-%d")])
+    wb.create_sheet("Glossary-").append(["Net Sales", "Sales net of returns and discounts"])
+    wb.save(path)
+
+
+def _vitacost(root, catalog, rng):
+    history = _mkdir(root, "Vitacost", "History")
+    months = _months()
+    files = 0
+    # Monthly OMNI files for all but the last two months, weekly OMNIw after
+    for year, month in months[:-2]:
+        last = date(year, month, calendar.monthrange(year, month)[1])
+        name = f"Vitacost - Vendor Report-OMNI for Monday - {last:%m-%d-%Y}.xlsx"
+        _vitacost_workbook(os.path.join(history, name), catalog, rng,
+                           _units(catalog, rng, 4.3, month), last)
+        files += 1
+    for year, month in months[-2:]:
+        for day in (7, 14, 21, 28):
+            week = date(year, month, day)
+            name = f"Vitacost - Vendor Report-OMNIw for Monday - {week:%m-%d-%Y}.xlsx"
+            _vitacost_workbook(os.path.join(history, name), catalog, rng,
+                               _units(catalog, rng, 1, month), week)
+            files += 1
+    return files
+
+
+TVS_HEADER = ["SKU ID", "SKU DESC", "Department DESC", "Sub Department DESC", "Class DESC",
+              "UPC ID", "Brand Name ID", "Overall Status ID", "Store Counts",
+              "Avg 08 Weeks Sales Units", "InStock %", "Store WOS (8 Weeks) Units",
+              "OH Units Store", "OH Units DC", "OH Units"]
+
+
+def _tvs(root, catalog, rng):
+    tvs_dir = _mkdir(root, "TVS")
+    files = 0
+    for year, month in _months()[-13:]:
+        for day in (1, 15):
+            stores = rng.integers(50, 650, len(catalog))
+            avg_units = np.round(catalog.velocity * _season(month) * rng.uniform(0.8, 1.2,
+                                                                                len(catalog)), 2)
+            store_oh = rng.poisson(stores * 2)
+            dc_oh = rng.poisson(catalog.velocity * 40)
+            rows = (
+                [200000 + i, catalog.name[i], catalog.category[i], catalog.subcategory[i],
+                 "SUPPLEMENTS", int(upc), BRAND, "A", int(stores[i]), float(avg_units[i]),
+                 round(float(rng.uniform(0.7, 1.0)), 4),
+                 round(float(store_oh[i] / max(avg_units[i], 0.1)), 2),
+                 int(store_oh[i]), int(dc_oh[i]), int(store_oh[i] + dc_oh[i])]
+                for i, upc in enumerate(catalog.upcs)
+            )
+            name = f"Irwin Naturals_All In Stock {month}.{day}.{year % 100}.xlsx"
+            _write_rows(os.path.join(tvs_dir, name), TVS_HEADER, rows)
+            files += 1
+    return files
+
+
+FRESHTHYME_HEADER = ([f"Unnamed: {i}" for i in range(7)]
+                     + ["Items Selling TY", "Stores Selling TY", "ACV", "Sales TY",
+                        "Sales vs LY %", "Sales Trend vs Category Trend",
+                        "% of Total Sales - Category", "Volume TY", "Volume vs LY %",
+                        "Volume Trend vs Category Trend", "% of Total Volume - Category",
+                        "My Sales LY", "My Sales TY ", "My Volume LY", "My Volume TY"])
+
+
+def _freshthyme(root, catalog, rng):
+    ft_dir = _mkdir(root, "FreshThyme")
+    for year, month in _months():
+        units = _units(catalog, rng, 4.3, month) // 3
+        units_ly = _units(catalog, rng, 4.3, month, years_back=1) // 3
+        sales = np.round(units * catalog.price, 2)
+        sales_ly = np.round(units_ly * catalog.price, 2)
+        rows = [["Grand Total", None, None, None, None, None, None, len(catalog), 71, 0.93,
+                 float(sales.sum()), None, None, 1.0, int(units.sum()), None, None, 1.0,
+                 float(sales_ly.sum()), float(sales.sum()), int(units_ly.sum()),
+                 int(units.sum())]]
+        for i, upc in enumerate(catalog.upcs):
+            rows.append([
+                catalog.name[i].upper() if i % 4 == 0 else None,
+                f"{upc} {catalog.name[i].upper()}",
+                catalog.category[i], catalog.subcategory[i], "SUPPLEMENTS", BRAND,
+                "Natural Living", 1, int(rng.integers(10, 72)),
+                round(float(rng.uniform(0.2, 1.0)), 4), float(sales[i]),
+                round(float(sales[i] / sales_ly[i] - 1), 4) if sales_ly[i] else None,
+                round(float(rng.normal(0, 0.1)), 4), round(float(rng.uniform(0, 0.02)), 5),
+                int(units[i]),
+                round(float(units[i] / units_ly[i] - 1), 4) if units_ly[i] else None,
+                round(float(rng.normal(0, 0.1)), 4), round(float(rng.uniform(0, 0.02)), 5),
+                float(sales_ly[i]), float(sales[i]), int(units_ly[i]), int(units[i]),
+            ])
+        name = f"FreshThyme_{calendar.month_name[month]}_{year}.xlsx"
+        _write_rows(os.path.join(ft_dir, name), FRESHTHYME_HEADER, rows)
+    return HISTORY_MONTHS
+
+
+IHERB_HEADER = ["Part Number", "UPCCode", "Vendor_Code", "Vendor Name", "Brand Code",
+                "Brand Name", "Product Description", "Status Name", "LTOOS",
+                "Days on LTOOS", "Quantity Available"]
+
+
+def _iherb(root, catalog, rng):
+    months = _months()
+    # Units per month over the history plus the 13 months before it
+    year, month = months[0]
+    window = []
+    for _ in range(13):
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        window.append((year, month))
+    window = window[::-1] + months
+    units = {ym: _units(catalog, rng, 4.3, ym[1]) for ym in window}
+
+    for index, (year, month) in enumerate(months):
+        columns = window[index:index + 14]
+        ltoos = rng.random(len(catalog)) < 0.03
+        lines = [",".join(IHERB_HEADER + [f"{y}-{m:02d}" for y, m in columns])]
+        for i, upc in enumerate(catalog.upcs):
+            lines.append(",".join(str(v) for v in [
+                f"IRW-{upc[-5:]}", f"{float(upc)}", "V1234", "Irwin Naturals", "IRW",
+                "Irwin Naturals", f'"{catalog.name[i]}"', "Active",
+                "Yes" if ltoos[i] else "No", int(rng.integers(1, 90)) if ltoos[i] else "",
+                int(rng.poisson(catalog.velocity[i] * 20)),
+                *(int(units[ym][i]) for ym in columns),
+            ]))
+        path = os.path.join(_mkdir(root, "iHerb", str(year)), f"{year}{month:02d}_IRW.csv")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+    return len(months)
+
+
+SPINS_HEADER = ["UPC", "Time Period End Date", "Description", "Brand", "Category",
+                "Subcategory", "Dollars", "Dollars, Yago", "Units", "Units, Yago",
+                "Dollars % Chg, Yago", "Units % Chg, Yago"]
+
+
+def _spins_rows(catalog, rng, end_dates, weeks, date_format):
+    for end in end_dates:
+        units = _units(catalog, rng, weeks, end.month)
+        units_ly = _units(catalog, rng, weeks, end.month, years_back=1)
+        dollars = np.round(units * catalog.price, 2)
+        dollars_ly = np.round(units_ly * catalog.price, 2)
+        for i, upc in enumerate(catalog.upcs):
+            yield [upc, end.strftime(date_format), catalog.name[i], BRAND, catalog.category[i],
+                   catalog.subcategory[i], float(dollars[i]), float(dollars_ly[i]),
+                   int(units[i]), int(units_ly[i]),
+                   round(float(dollars[i] / dollars_ly[i] - 1), 4) if dollars_ly[i] else 0,
+                   round(float(units[i] / units_ly[i] - 1), 4) if units_ly[i] else 0]
+
+
+def _ngvc(root, catalog, rng):
+    ngvc_dir = _mkdir(root, "NGVC")
+    year, month = END_MONTH
+    end = date(year, month, calendar.monthrange(year, month)[1])
+    # 4-week SPINS periods over the history, ending on Saturdays
+    quads = _saturdays(end, HISTORY_MONTHS * 13 // 12 * 4)[3::4]
+    _write_rows(os.path.join(ngvc_dir, "Irwin_Naturals_NGVC.xlsx"), SPINS_HEADER,
+                _spins_rows(catalog, rng, quads, 4, "%Y-%m-%d"))
+    _write_rows(os.path.join(ngvc_dir, "P12 - Irwin_Naturals_Pull.xlsx"), SPINS_HEADER,
+                _spins_rows(catalog, rng, _saturdays(end, NGVC_WEEKS), 1, "%m/%d/%Y"))
+    label = f"{calendar.month_name[month]} {year}"
+    _write_rows(
+        os.path.join(ngvc_dir, f"Irwin Naturals Units {calendar.month_abbr[month].upper()} "
+                               f"{year}.xlsx"),
+        [" UPC ", "Description", "Brand Name", "Set Status", f"Units sold in {label}"],
+        ([f" {int(upc)} ", catalog.name[i], "Irwin Naturals",
+          "Core" if catalog.velocity[i] > 2 else "Optional",
+          int(rng.poisson(catalog.velocity[i] * 4))]
+         for i, upc in enumerate(catalog.upcs)),
+    )
+    return 3
+
+
+SPROUTS_HEADER = ["TIME FRAME", "TIME PERIOD", "GEOGRAPHY", "CATEGORY", "SUBCATEGORY", "BRAND",
+                  "UPC", "DESCRIPTION", "Dollars", "Dollars, Yago", "Units", "Units, Yago"]
+
+
+def _sprouts(root, catalog, rng):
+    sprouts_dir = _mkdir(root, "Sprouts")
+    year, month = END_MONTH
+    end = date(year, month, calendar.monthrange(year, month)[1])
+
+    def rows():
+        for row in _spins_rows(catalog, rng, _saturdays(end, SPROUTS_WEEKS), 1, "%m/%d/%Y"):
+            upc, week_end, name, brand, category, subcategory = row[:6]
+            yield [f"Week Ending {week_end}", "1 Week", "SPROUTS TOTAL US", category,
+                   subcategory, brand, upc, name, *row[6:10]]
+
+    _write_rows(os.path.join(sprouts_dir, "45934e10-2794-4865-a52a-d2c5b10f6374.xlsx"),
+                SPROUTS_HEADER, rows())
+    return 1
+
+
+GENERATORS = {
+    "vitacost": _vitacost,
+    "tvs": _tvs,
+    "freshthyme": _freshthyme,
+    "iherb": _iherb,
+    "ngvc": _ngvc,
+    "sprouts": _sprouts,
+}
+
+
+# ── public API ────────────────────────────────────────────────────────
+def generate(root, scale=1, seed=0, retailers=None):
+    """Write a synthetic source tree under ``root``; return {retailer: files written}.
+
+    An existing tree generated with the same scale, seed and generator
+    version is reused as is.
+    """
+    retailers = list(retailers or GENERATORS)
+    marker = {"version": GENERATOR_VERSION, "scale": scale, "seed": seed,
+              "upcs": int(BASE_UPCS * scale)}
+    marker_path = os.path.join(root, MARKER_FILE)
+    files = {}
+    if os.path.isfile(marker_path):
+        with open(marker_path, "r") as f:
+            existing = json.load(f)
+        files = existing.pop("files", {})
+        if existing != marker:
+            shutil.rmtree(root)
+            files = {}
+
+    for key in retailers:
+        if key in files:
+            continue
+        # Each retailer gets its own stream, so subsets generate identical files
+        rng = np.random.default_rng([seed, list(GENERATORS).index(key)])
+        catalog = Catalog(int(BASE_UPCS * scale), np.random.default_rng(seed))
+        files[key] = GENERATORS[key](root, catalog, rng)
+        os.makedirs(root, exist_ok=True)
+        with open(marker_path, "w") as f:
+            json.dump({**marker, "files": files}, f, indent=2)
+    return {key: files[key] for key in retailers}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic POS source files")
+    parser.add_argument("--out", required=True, help="Directory to write the source tree into")
+    parser.add_argument("--scale", type=float, default=1,
+                        help=f"Catalog multiplier ({BASE_UPCS} UPCs at 1x; default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--retailer", nargs="+", choices=list(GENERATORS), default=None)
+    args = parser.parse_args(argv)
+    files = generate(os.path.abspath(args.out), args.scale, args.seed, args.retailer)
+    for key, count in files.items():
+        print(f"  {key}: {count} file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
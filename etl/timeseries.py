@@ -0,0 +1,178 @@
+"""
+Time-series engine — period-over-period metrics as array shifts.
+
+TimeSeriesGrid lays one retailer's periods[period][upc] block out as a
+UPC × period grid per metric, on a dense calendar axis (one slot per month,
+or per week for "YYYY-MM-DD" week-ending keys), so that "the same UPC n
+periods ago" is a column shift of the whole grid:
+
+    grid = TimeSeriesGrid(pos_data["periods"], ("dollars", "units"))
+    yago, pct = grid.yoy("units")              # month - 12 (or week - 52)
+    prev, mom = grid.mom("units")              # previous period
+    r3 = grid.rolling_sum("dollars", 3)        # 3/6/12-month sums
+    grid.fill_yoy("units")                     # write units_yago / units_yoy_pct back
+
+Slots with no period, and UPCs absent from a period, are NaN in the float
+grids.  The original Python values are kept next to them, so values written
+back into the schema keep their int/float type.
+"""
+
+from datetime import date
+
+import numpy as np
+
+# Year-ago lag per grain, in slots
+YEAR_LAG = {"monthly": 12, "weekly": 52}
+
+
+def pct_change(current, previous):
+    """(current - previous) / previous * 100 elementwise (inf/NaN where previous is 0)."""
+    cur = np.asarray(current, dtype=float)
+    prev = np.asarray(previous, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (cur - prev) / prev * 100
+
+
+def yoy_pct(current, yago):
+    """round((cur - yago) / yago * 100, 2) where yago is truthy, else 0.0."""
+    pct = pct_change(current, yago)
+    prev = np.asarray(yago, dtype=float)
+    return [round(p, 2) if y else 0.0 for p, y in zip(pct.tolist(), prev.tolist())]
+
+
+def _slot_number(label, grain):
+    """Calendar position of a period key, or None if it does not parse."""
+    try:
+        if grain == "weekly":
+            return date.fromisoformat(label).toordinal() // 7
+        year, month = int(label[:4]), int(label[5:7])
+        if len(label) != 7 or label[4] != "-" or not 1 <= month <= 12:
+            return None
+        return year * 12 + month - 1
+    except ValueError:
+        return None
+
+
+class TimeSeriesGrid:
+    """UPC × period grids for one periods[period][upc] block.
+
+    ``grain`` is "monthly" ("YYYY-MM" keys) or "weekly" ("YYYY-MM-DD"
+    week-ending keys, all on the same weekday).  Keys that do not parse
+    are left off the grid.
+    """
+
+    def __init__(self, periods, fields, grain="monthly"):
+        self.grain = grain
+        self.fields = list(fields)
+
+        slots = {}
+        for label in periods:
+            n = _slot_number(label, grain)
+            if n is not None:
+                slots[label] = n
+        first = min(slots.values(), default=0)
+        width = max(slots.values(), default=first - 1) - first + 1
+
+        # Period axis: label per slot (None where there is no period)
+        self.labels = [None] * width
+        for label, n in slots.items():
+            self.labels[n - first] = label
+        self.present = np.array([label is not None for label in self.labels], dtype=bool)
+
+        # UPC axis in first-seen order; one pass collects every cell
+        self.upcs = {}
+        rows, cols, records = [], [], []
+        for label, n in slots.items():
+            for upc, rec in periods[label].items():
+                rows.append(self.upcs.setdefault(upc, len(self.upcs)))
+                cols.append(n - first)
+                records.append(rec)
+        shape = (len(self.upcs), width)
+
+        self.has = np.zeros(shape, dtype=bool)
+        self.has[rows, cols] = True
+        self.records = np.empty(shape, dtype=object)
+        self.records[rows, cols] = _object_array(records)
+
+        self.raw = {}
+        self.values = {}
+        for name in self.fields:
+            column = [rec.get(name) for rec in records]
+            self.raw[name] = np.empty(shape, dtype=object)
+            self.raw[name][rows, cols] = _object_array(column)
+            self.values[name] = np.full(shape, np.nan)
+            self.values[name][rows, cols] = np.array(column, dtype=float)
+
+    # ── shifts ────────────────────────────────────────────────────────
+    @staticmethod
+    def shift(grid, lag, fill=np.nan):
+        """``grid`` moved ``lag`` slots later along the period axis (lag > 0)."""
+        out = np.full(grid.shape, fill, dtype=grid.dtype)
+        if 0 < lag < grid.shape[-1]:
+            out[..., lag:] = grid[..., :-lag]
+        return out
+
+    def lagged(self, name, lag):
+        """Value of ``name`` ``lag`` periods earlier; 0 where the UPC had no record."""
+        return np.where(self.shift(self.has, lag, fill=False),
+                        self.shift(self.values[name], lag), 0.0)
+
+    def yoy(self, name):
+        """(year-ago value, YoY %) grids."""
+        prev = self.lagged(name, YEAR_LAG[self.grain])
+        return prev, pct_change(self.values[name], prev)
+
+    def mom(self, name):
+        """(previous-period value, period-over-period %) grids."""
+        prev = self.lagged(name, 1)
+        return prev, pct_change(self.values[name], prev)
+
+    def rolling_sum(self, name, window):
+        """Sum over the last ``window`` slots, missing cells counting as 0.
+
+        NaN until the window fits on the grid (the first window - 1 slots).
+        """
+        base = np.nan_to_num(self.values[name], nan=0.0)
+        total = base.copy()
+        for lag in range(1, window):
+            total += self.shift(base, lag, fill=0.0)
+        total[:, :window - 1] = np.nan
+        return total
+
+    def trailing_52w(self, name):
+        """Trailing 52-week sum (weekly grids)."""
+        return self.rolling_sum(name, 52)
+
+    # ── write-back ────────────────────────────────────────────────────
+    def fill_yoy(self, name, ndigits=2):
+        """Set ``{name}_yago`` and ``{name}_yoy_pct`` on the grid's records.
+
+        Only records whose year-ago period exists are touched.  The year-ago
+        value is the original one (0 when the UPC had no record then),
+        rounded to ``ndigits`` unless that is None; the percentage is set
+        only where the year-ago value is non-zero.
+        """
+        lag = YEAR_LAG[self.grain]
+        target = self.has & self.shift(self.present, lag, fill=False)
+        if not target.any():
+            return
+
+        yago_raw = self.shift(self.raw[name], lag, fill=None)
+        yago_raw[~self.shift(self.has, lag, fill=False)] = 0
+        yago, pct = self.yoy(name)
+
+        yago_key, pct_key = f"{name}_yago", f"{name}_yoy_pct"
+        for rec, value, prev, p in zip(self.records[target].tolist(),
+                                       yago_raw[target].tolist(),
+                                       yago[target].tolist(),
+                                       pct[target].tolist()):
+            rec[yago_key] = value if ndigits is None else round(value, ndigits)
+            if prev:
+                rec[pct_key] = round(p, 2)
+
+
+def _object_array(values):
+    """1-D object array of ``values`` (np.array would nest dicts/sequences)."""
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
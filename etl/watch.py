@@ -0,0 +1,218 @@
+"""
+Watch mode — rerun only the retailers whose source files changed.
+
+SourceWatcher follows the source directory with inotify (Linux, through
+libc, no extra package) or by polling file sizes and mtimes elsewhere, and
+yields batches of changed paths relative to the source directory:
+
+    watcher = SourceWatcher(source_dir, debounce=10)
+    for paths in watcher.batches():
+        keys = retailers_for(paths, {key: meta["source_patterns"] for key, meta in ...})
+
+A batch is released once no new event has arrived for ``debounce`` seconds
+(or ``max_wait`` after its first event), so a drop of many files — or a
+workbook written in several flushes — becomes one batch.  Events that
+arrive while a run is in progress are kept and form the next batch, so
+repeated triggers coalesce into one run per retailer.
+
+Each adapter lists its inputs as ``source_patterns``: globs relative to the
+source directory, matched segment by segment and case-insensitively, e.g.
+"Vitacost/History/*OMNI*.xlsx".
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from fnmatch import fnmatchcase
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Reported instead of paths when inotify dropped events: everything may have changed
+RESCAN = "*"
+
+
+def _ignored(name):
+    """Lock/partial files written while a file is being saved or synced."""
+    return name.startswith((".", "~$")) or name.endswith((".part", ".tmp"))
+
+
+def matches(path, pattern):
+    """Whether a "/"-separated relative path matches a source pattern."""
+    parts = path.lower().split("/")
+    pattern_parts = pattern.lower().split("/")
+    return len(parts) == len(pattern_parts) and all(
+        fnmatchcase(part, pat) for part, pat in zip(parts, pattern_parts)
+    )
+
+
+def retailers_for(paths, patterns):
+    """Retailer keys (in ``patterns`` order) whose patterns match any of ``paths``.
+
+    ``patterns`` maps retailer key -> source patterns; RESCAN matches all.
+    """
+    if RESCAN in paths:
+        return list(patterns)
+    return [key for key, globs in patterns.items()
+            if any(matches(path, glob) for path in paths for glob in globs)]
+
+
+class _Inotify:
+    """Recursive inotify watch of a directory tree via libc."""
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.dirs = {}  # watch descriptor -> directory
+        self._add_tree(root)
+
+    def _add_tree(self, top):
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not _ignored(d)]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {dirpath}")
+            self.dirs[wd] = dirpath
+
+    def read(self, timeout):
+        """Changed paths (absolute) seen within ``timeout`` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                paths.append(RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name or _ignored(name):
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(path):
+                    # A new folder (e.g. iHerb/2026) may already hold files
+                    self._add_tree(path)
+                    paths.extend(_files_under(path))
+                continue
+            paths.append(path)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _files_under(top):
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = [d for d in dirnames if not _ignored(d)]
+        for name in filenames:
+            if not _ignored(name):
+                yield os.path.join(dirpath, name)
+
+
+class _Poller:
+    """Directory-tree watch by comparing (size, mtime) snapshots."""
+
+    def __init__(self, root, interval):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in _files_under(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # removed between listing and stat
+            snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout):
+        """Changed paths (absolute) after waiting up to ``timeout`` seconds."""
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = [path for path, sig in current.items() if self.snapshot.get(path) != sig]
+        changed += [path for path in self.snapshot if path not in current]
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class SourceWatcher:
+    """Debounced batches of changed source paths under ``root``."""
+
+    def __init__(self, root, debounce=10.0, max_wait=120.0, poll_interval=5.0,
+                 use_inotify=True):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.backend = None
+        if use_inotify:
+            try:
+                self.backend = _Inotify(self.root)
+            except (OSError, AttributeError, TypeError):
+                self.backend = None  # not Linux, or out of watches: poll instead
+        if self.backend is None:
+            self.backend = _Poller(self.root, poll_interval)
+        self.mode = "inotify" if isinstance(self.backend, _Inotify) else "polling"
+
+    def _relative(self, path):
+        if path == RESCAN:
+            return path
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def batches(self):
+        """Yield sets of changed relative paths, one per quiet period (forever)."""
+        try:
+            while True:
+                pending = set()
+                first = last = None
+                while True:
+                    if pending:
+                        timeout = (min(last + self.debounce, first + self.max_wait)
+                                   - time.monotonic())
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = 3600
+                    paths = self.backend.read(timeout)
+                    if paths:
+                        last = time.monotonic()
+                        first = first if pending else last
+                        pending.update(self._relative(p) for p in paths)
+                yield pending
+        finally:
+            self.backend.close()
@@ -0,0 +1,277 @@
+"""
+Streaming XLSX reader — iterate a worksheet as bounded DataFrame batches.
+
+pd.read_excel materialises the whole sheet (every cell, as Python objects)
+before building the frame, so peak memory grows with the file.  The SPINS
+pulls for NGVC and Sprouts are tens of thousands of rows, which is enough to
+spike memory on the ETL VM.  XlsxBatchReader opens the workbook with
+openpyxl in read_only mode and walks rows lazily, handing out DataFrames of
+at most ``batch_size`` rows, so memory depends on the batch size instead.
+
+Each batch goes through the same cell conversion and pandas TextParser
+that read_excel uses (NA strings, header de-duplication, blank rows), so a
+batch equals the matching slice of pd.read_excel(path) except that column
+dtypes are inferred per batch rather than over the whole sheet.
+
+GroupSums folds the batches into groupby sums that are bit-identical to a
+single groupby over the whole sheet.
+"""
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+
+DEFAULT_BATCH_SIZE = 20_000
+
+
+def _convert_cell(cell):
+    """Cell value exactly as pandas' openpyxl reader converts it."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+
+def _convert_row(row):
+    values = [_convert_cell(cell) for cell in row]
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+class XlsxBatchReader:
+    """Iterate one worksheet of an XLSX file as DataFrames of batch_size rows.
+
+    The first row is the header, as with pd.read_excel(path).  Opening the
+    reader checks that the workbook and sheet exist; rows are read only
+    while iterating, and each iteration re-reads the file from the start.
+    The first iteration reuses the workbook opened for that check, since
+    loading it (shared strings included) costs as much as a full row pass.
+    """
+
+    def __init__(self, path, sheet_name=0, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.sheet_name = sheet_name
+        self.batch_size = max(1, int(batch_size))
+        self.rows_read = 0
+        self._wb = self._open()
+        try:
+            self._sheet(self._wb)
+        except Exception:
+            self._wb.close()
+            raise
+
+    def __iter__(self):
+        wb, self._wb = self._wb or self._open(), None
+        try:
+            rows = self._sheet(wb).iter_rows()
+            header = None
+            for row in rows:
+                header = _convert_row(row)
+                break
+            if header is None:
+                return
+
+            self.rows_read = 0
+            batch = []
+            blanks = []   # blank rows kept only if data follows (trailing ones are dropped)
+            for row in rows:
+                values = _convert_row(row)
+                if not values:
+                    blanks.append(values)
+                    continue
+                if blanks:
+                    batch.extend(blanks)
+                    blanks = []
+                batch.append(values)
+                if len(batch) >= self.batch_size:
+                    yield self._frame(header, batch)
+                    batch = []
+            if batch:
+                yield self._frame(header, batch)
+        finally:
+            wb.close()
+
+    # ── helpers ───────────────────────────────────────────────────────
+    def _open(self):
+        return load_workbook(self.path, read_only=True, data_only=True, keep_links=False)
+
+    def _sheet(self, wb):
+        if isinstance(self.sheet_name, int):
+            return wb.worksheets[self.sheet_name]
+        if self.sheet_name not in wb.sheetnames:
+            raise ValueError(f"Worksheet named '{self.sheet_name}' not found")
+        return wb[self.sheet_name]
+
+    def _frame(self, header, batch):
+        """Build one batch with the TextParser settings read_excel uses."""
+        self.rows_read += len(batch)
+        width = max(len(header), max(len(r) for r in batch))
+        data = [header + [""] * (width - len(header))]
+        data.extend(r + [""] * (width - len(r)) for r in batch)
+        return TextParser(data, header=0, skip_blank_lines=False).read()
+
+
+class GroupSums:
+    """Running df.groupby(keys)[metrics].sum() over a sequence of batches.
+
+    Nothing is kept per row, and no Python object per group: key values are
+    coded per column, each group is one packed int64 code, and its running
+    sums and compensation terms are float64 array rows, so memory follows
+    the batch size and the number of groups.  Adding up per-batch sums
+    would change the float summation order and can flip a 2-decimal
+    rounding tie, so each batch instead continues the Kahan-compensated
+    summation pandas' groupby sum uses, vectorized across groups: the k-th
+    row of every group in the batch is folded in one array step.  As with
+    groupby, rows with a null key are dropped and NaN values are skipped, so
+    frame() matches one groupby over all rows bit for bit.  A metric stays
+    integer unless some batch holds floats, as with whole-file dtype
+    inference.  With a single batch pandas sums it directly.
+    """
+
+    def __init__(self, keys, metrics):
+        self.keys = list(keys)
+        self.metrics = list(metrics)
+        self._bits = 63 // len(self.keys)       # bits per key column in a group code
+        self._first = None      # the only batch so far, not yet folded
+        self._levels = None     # per key column: Index of distinct values
+        self._n = 0             # groups so far
+        self._codes = np.zeros(0, dtype=np.int64)    # group codes, first-appearance order
+        self._sorted = np.zeros(0, dtype=np.int64)   # the same codes, sorted ...
+        self._sorted_pos = np.zeros(0, dtype=np.int64)   # ... and their group positions
+        self._sums = np.zeros((0, len(self.metrics)))
+        self._comp = np.zeros((0, len(self.metrics)))
+        self._is_float = dict.fromkeys(self.metrics, False)
+
+    def add(self, df):
+        """Fold one batch (a DataFrame holding the key and metric columns)."""
+        df = df[self.keys + self.metrics]
+        for m in self.metrics:
+            if df[m].dtype.kind == "f":
+                self._is_float[m] = True
+        if self._first is None and self._levels is None:
+            self._first = df
+            return
+        if self._first is not None:
+            self._fold(self._first)
+            self._first = None
+        self._fold(df)
+
+    def frame(self, sort=True):
+        """Summed frame (as groupby(sort=sort).sum().reset_index()), or None.
+
+        Groups are sorted by key, or with ``sort=False`` in order of first
+        appearance.
+        """
+        if self._first is not None:
+            return self._first.groupby(self.keys, sort=sort).agg(
+                {m: "sum" for m in self.metrics}
+            ).reset_index()
+        if not self._n:
+            return None
+
+        codes = self._codes[:self._n]
+        mask = (1 << self._bits) - 1
+        shifts = range(self._bits * (len(self.keys) - 1), -1, -self._bits)
+        columns = {k: self._levels[i].take((codes >> shift) & mask)
+                   for i, (k, shift) in enumerate(zip(self.keys, shifts))}
+        for i, m in enumerate(self.metrics):
+            values = self._sums[:self._n, i].copy()
+            columns[m] = values if self._is_float[m] else values.astype(np.int64)
+        df = pd.DataFrame(columns)
+        if sort:
+            df = df.sort_values(self.keys, kind="stable", ignore_index=True)
+        return df
+
+    # ── helpers ───────────────────────────────────────────────────────
+    def _fold(self, df):
+        df = df.dropna(subset=self.keys)
+        if self._levels is None:
+            self._levels = [pd.Index(df[k].iloc[:0]) for k in self.keys]
+        if df.empty:
+            return
+        pos = self._positions(self._group_codes(df))
+        values = df[self.metrics].to_numpy(dtype=float, na_value=np.nan)
+
+        # Rank of each row within its group in this batch: rows of equal rank
+        # touch distinct groups, so one rank is one vectorized Kahan step
+        order = np.argsort(pos, kind="stable")
+        ordered = pos[order]
+        run = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        rank = np.empty_like(pos)
+        rank[order] = np.arange(len(pos)) - np.repeat(run, np.diff(np.r_[run, len(pos)]))
+
+        sums, comp = self._sums, self._comp
+        for r in range(int(rank.max()) + 1):
+            rows = rank == r if r or rank.any() else slice(None)
+            p = pos[rows]
+            val = values[rows]
+            total, c = sums[p], comp[p]
+            y = val - c
+            t = total + y
+            c_new = t - total - y
+            c_new[c_new != c_new] = 0.0          # NaN after +/-inf
+            keep = val == val                     # NaN values are skipped
+            sums[p] = np.where(keep, t, total)
+            comp[p] = np.where(keep, c_new, c)
+
+    def _group_codes(self, df):
+        """One int64 per row packing the per-column codes of its key values."""
+        codes = np.zeros(len(df), dtype=np.int64)
+        for i, k in enumerate(self.keys):
+            col = df[k]
+            level = self._levels[i]
+            level_codes = level.get_indexer(col)
+            new = level_codes < 0
+            if new.any():
+                level = self._levels[i] = level.append(pd.Index(pd.unique(col[new])))
+                if len(level) >> self._bits:
+                    raise OverflowError(f"too many distinct '{k}' values to group")
+                level_codes[new] = level.get_indexer(col[new])
+            codes = (codes << self._bits) | level_codes
+        return codes
+
+    def _positions(self, codes):
+        """Group position of each code, adding unseen groups in order of first appearance."""
+        at = np.searchsorted(self._sorted, codes)
+        found = at < len(self._sorted)
+        found[found] = self._sorted[at[found]] == codes[found]
+        pos = np.empty(len(codes), dtype=np.int64)
+        pos[found] = self._sorted_pos[at[found]]
+        if found.all():
+            return pos
+
+        new_codes, first = np.unique(codes[~found], return_index=True)
+        # Positions follow first appearance in the batch, as groupby(sort=False)
+        new_pos = np.empty(len(new_codes), dtype=np.int64)
+        new_pos[np.argsort(first, kind="stable")] = self._n + np.arange(len(new_codes))
+        pos[~found] = new_pos[np.searchsorted(new_codes, codes[~found])]
+
+        self._grow(self._n + len(new_codes))
+        self._codes[new_pos] = new_codes
+        self._n += len(new_codes)
+        at = np.searchsorted(self._sorted, new_codes)
+        self._sorted = np.insert(self._sorted, at, new_codes)
+        self._sorted_pos = np.insert(self._sorted_pos, at, new_pos)
+        return pos
+
+    def _grow(self, n):
+        """Make room for ``n`` groups (amortized doubling)."""
+        if n <= len(self._codes):
+            return
+        size = max(n, 2 * len(self._codes), 1024)
+        codes = np.zeros(size, dtype=np.int64)
+        codes[:self._n] = self._codes[:self._n]
+        self._codes = codes
+        for name in ("_sums", "_comp"):
+            grown = np.zeros((size, len(self.metrics)))
+            grown[:self._n] = getattr(self, name)[:self._n]
+            setattr(self, name, grown)
@@ -1,12 +1,13 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { theme } from './styles/theme';
 import { useResponsive } from './hooks/useResponsive';
-import { loadManifest, loadRetailerData } from './utils/dataLoader';
+import { loadManifest, loadRetailerData, hasUnloadedShards, loadShards } from './utils/dataLoader';
 import { getAvailableFeatures } from './config/featureRegistry';
 import {
   getAvailableMonths, getAvailableQuarters, getAvailableWeeks,
   computeMonthlySlice, computeQuarterlySlice, computeYTDSlice, computeWeeklySlice,
   detectPrimaryMetric, getAllQuarterOverview, periodToMonthName, weekKeyToLabel,
+  quarterlySliceFromRollups, ytdSliceFromRollups, quarterOverviewFromRollups,
   getSortedPeriods, getQuarterMonths, aggregateProductData,
 } from './utils/timePeriodUtils';
 import RetailerSelector from './components/RetailerSelector';
@@ -110,7 +111,7 @@ export default function App() {
     if (!activeRetailer || !manifest) return;
     setLoading(true);
     setError(null);
-    loadRetailerData(activeRetailer)
+    loadRetailerData(activeRetailer, manifest.retailers[activeRetailer])
       .then(data => {
         if (!data) {
           setError(`Failed to load data for ${activeRetailer}.`);
@@ -129,6 +130,20 @@ export default function App() {
       });
   }, [activeRetailer, manifest]);
 
+  // Sharded retailers load their recent years first; the monthly trend spans
+  // the whole history, so the older shards are fetched once that view is shown
+  useEffect(() => {
+    const posData = retailerData?.posData;
+    if (timePeriod !== 'monthly' || !hasUnloadedShards(posData)) return;
+    let cancelled = false;
+    loadShards(posData).then(ok => {
+      if (!ok || cancelled) return;
+      setRetailerData(prev => (prev?.posData === posData
+        ? { ...prev, posData: { ...posData } } : prev));
+    });
+    return () => { cancelled = true; };
+  }, [retailerData, timePeriod]);
+
   // Reset time period selections when switching retailers
   useEffect(() => {
     setSelectedMonth(null);
@@ -171,6 +186,7 @@ export default function App() {
   const timePeriodData = useMemo(() => {
     if (!retailerData?.posData?.periods) return null;
     const periods = retailerData.posData.periods;
+    const rollups = retailerData.rollups;
 
     const detectedMetric = detectPrimaryMetric(periods);
     const primaryMetric = metricMode === 'auto' ? detectedMetric : metricMode;
@@ -185,13 +201,14 @@ export default function App() {
     } else if (timePeriod === 'monthly' && selectedMonth) {
       slice = computeMonthlySlice(periods, selectedMonth);
     } else if (timePeriod === 'quarterly' && selectedQuarter) {
-      slice = computeQuarterlySlice(periods, selectedQuarter);
+      slice = quarterlySliceFromRollups(rollups, selectedQuarter)
+        || computeQuarterlySlice(periods, selectedQuarter);
     } else if (timePeriod === 'ytd') {
-      slice = computeYTDSlice(periods);
+      slice = ytdSliceFromRollups(rollups) || computeYTDSlice(periods);
     }
 
     const quarterOverview = timePeriod === 'quarterly'
-      ? getAllQuarterOverview(periods) : null;
+      ? (quarterOverviewFromRollups(rollups) || getAllQuarterOverview(periods)) : null;
 
     return {
       ...slice,
@@ -236,6 +253,8 @@ export default function App() {
       const priorYear = qNum === 1 ? year - 1 : year;
       const priorQ = qNum === 1 ? 'Q4' : `Q${qNum - 1}`;
       const priorMonths = getQuarterMonths(priorQ);
+      const priorRollup = retailerData.rollups?.quarters?.[`${priorYear}-${priorQ}`];
+      if (priorRollup) return priorRollup.current;
       const priorKeys = priorMonths.map(mm => `${priorYear}-${mm}`).filter(k => periods[k]);
       if (priorKeys.length === 0) return null;
       return aggregateProductData(periods, priorKeys);
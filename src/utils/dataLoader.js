@@ -3,10 +3,11 @@
  */
 
 const cache = new Map();
+const retailerCache = new Map();
 
-async function fetchJSON(url) {
-  if (cache.has(url)) return cache.get(url);
-  const res = await fetch(url);
+async function fetchJSON(url, options) {
+  if (!options && cache.has(url)) return cache.get(url);
+  const res = await fetch(url, options);
   if (!res.ok) return null;
   const contentType = res.headers.get('content-type') || '';
   if (!contentType.includes('application/json')) return null;
@@ -15,32 +16,210 @@ async function fetchJSON(url) {
   return data;
 }
 
+/**
+ * Fetch the manifest, revalidating with the server every time (it is
+ * small, and its content hashes decide whether anything else is fetched).
+ */
 export async function loadManifest() {
-  return fetchJSON('/data/data_manifest.json');
+  return fetchJSON('/data/data_manifest.json', { cache: 'no-cache' });
+}
+
+/**
+ * URL of one of a retailer's data files.  Newer manifests record a content
+ * hash per file: the hash-named copy is used when the ETL wrote one, else
+ * the hash is added as a version parameter, so a changed file never comes
+ * from a cache and an unchanged one is never downloaded twice.
+ */
+function fileUrl(base, entry, fname) {
+  const info = entry?.files?.[fname];
+  if (info?.hashed) return `${base}/${info.hashed}`;
+  if (info?.sha256) return `${base}/${fname}?v=${info.sha256.slice(0, 12)}`;
+  return `${base}/${fname}`;
 }
 
-export async function loadRetailerData(retailerKey) {
+/**
+ * Whether a data file may exist: manifests with per-file hashes list every
+ * file, older ones do not, so then every file is tried.
+ */
+function mayHaveFile(entry, fname) {
+  return !entry?.files || fname in entry.files;
+}
+
+// v2 (columnar) metric arrays and the v1 periods key they expand into
+const COLUMNAR_BLOCKS = {
+  periods: 'metrics',
+  weekly_periods: 'weekly_metrics',
+  quarterly_periods: 'quarterly_metrics',
+  yearly_periods: 'yearly_metrics',
+};
+
+/**
+ * Expand a schema v2 pos_data document (dense period × UPC arrays per
+ * metric, null = no data) into the v1 shape periods[period][upc] = {...}
+ * that the rest of the app reads.
+ */
+function inflateColumnar(doc) {
+  const { upcs, metric_fields: fields } = doc;
+  const posData = {};
+  for (const [key, value] of Object.entries(doc)) {
+    if (key === 'schema_version' || key === 'upcs' || key === 'metric_fields') continue;
+    if (key in COLUMNAR_BLOCKS || Object.values(COLUMNAR_BLOCKS).includes(key)) continue;
+    posData[key] = value;
+  }
+
+  for (const [key, metricsKey] of Object.entries(COLUMNAR_BLOCKS)) {
+    if (!doc[key]) continue;
+    const metrics = doc[metricsKey];
+    const periods = {};
+    doc[key].forEach((label, pi) => {
+      const columns = fields.map(name => metrics[name][pi]);
+      const upcMetrics = {};
+      upcs.forEach((upc, ui) => {
+        let rec = null;
+        fields.forEach((name, fi) => {
+          const v = columns[fi][ui];
+          if (v !== null) {
+            if (!rec) rec = {};
+            rec[name] = v;
+          }
+        });
+        if (rec) upcMetrics[upc] = rec;
+      });
+      periods[label] = upcMetrics;
+    });
+    posData[key] = periods;
+  }
+  return posData;
+}
+
+// Period blocks split across shards (etl/sharding.py)
+const SHARDED_BLOCKS = ['periods', 'weekly_periods'];
+
+// Years of sharded history fetched up front: the two years the dashboard
+// compares plus the one before, so every selectable month has its YoY month.
+// Views that span the whole history fetch the rest with loadShards().
+const RECENT_SHARD_YEARS = 3;
+
+function mergeShards(posData, shards) {
+  shards.forEach(shard => {
+    SHARDED_BLOCKS.forEach(block => {
+      if (shard[block]) posData[block] = { ...posData[block], ...shard[block] };
+    });
+  });
+}
+
+async function fetchShards(posData, names) {
+  const shards = await Promise.all(names.map(name => fetchJSON(posData.shardUrls[name])));
+  return shards.some(s => !s) ? null : shards;
+}
+
+/**
+ * Load a sharded retailer from its index plus the most recent shards.
+ * The index stays on posData.shardIndex for loadShards().
+ */
+async function loadShardedPosData(base, entry) {
+  const index = await fetchJSON(fileUrl(base, entry, entry.shards.index));
+  if (!index) return null;
+  const names = Object.keys(index.shards);
+  const years = [...new Set(names.map(n => n.slice(0, 4)))].sort().slice(-RECENT_SHARD_YEARS);
+  const recent = names.filter(n => years.includes(n.slice(0, 4)));
+
+  const { shard_by, period_keys, totals, shards: _, ...meta } = index;
+  const posData = { ...meta };
+  SHARDED_BLOCKS.forEach(block => {
+    if (period_keys[block]) posData[block] = {};
+  });
+  posData.shardIndex = index;
+  posData.shardUrls = Object.fromEntries(
+    names.map(name => [name, fileUrl(base, entry, index.shards[name].file)])
+  );
+  const shards = await fetchShards(posData, recent);
+  if (!shards) return null;
+  mergeShards(posData, shards);
+  posData.loadedShards = recent;
+  return posData;
+}
+
+/**
+ * Whether a sharded retailer still has shards (older years) not yet loaded.
+ */
+export function hasUnloadedShards(posData) {
+  const index = posData?.shardIndex;
+  return !!index && Object.keys(index.shards).some(n => !posData.loadedShards.includes(n));
+}
+
+/**
+ * Fetch more shards (all remaining ones by default) of a sharded retailer and
+ * merge them into `posData` in place.  Returns false if any shard failed to load.
+ */
+export async function loadShards(posData, names = Object.keys(posData?.shardIndex?.shards || {})) {
+  const index = posData?.shardIndex;
+  if (!index) return false;
+  const missing = names.filter(n => index.shards[n] && !posData.loadedShards.includes(n));
+  if (missing.length === 0) return true;
+  const shards = await fetchShards(posData, missing);
+  if (!shards) return false;
+  mergeShards(posData, shards);
+  posData.loadedShards = [...new Set([...posData.loadedShards, ...missing])];
+  return true;
+}
+
+async function loadPosData(base, entry) {
+  if (entry && entry.shards) {
+    const posData = await loadShardedPosData(base, entry);
+    if (posData) return posData;
+  }
+  if (entry && entry.schema_version >= 2) {
+    const doc = await fetchJSON(fileUrl(base, entry, 'pos_data.v2.json'));
+    if (doc) return inflateColumnar(doc);
+  }
+  return fetchJSON(fileUrl(base, entry, 'pos_data.json'));
+}
+
+/**
+ * Load a retailer's POS data and supplemental files.  `entry` is the
+ * retailer's manifest entry; when it describes shards only the index and
+ * the recent shards are fetched, when it advertises schema_version 2 the
+ * smaller columnar file is fetched instead of pos_data.json, and when it
+ * lists rollups.json the precomputed quarter/YTD aggregates are loaded too.
+ * Results are kept per content hash, so an unchanged retailer is not
+ * fetched again.
+ */
+export async function loadRetailerData(retailerKey, entry) {
+  // Same content hash as last time: nothing changed, reuse the loaded data
+  const cacheKey = entry?.content_hash ? `${retailerKey}@${entry.content_hash}` : null;
+  if (cacheKey && retailerCache.has(cacheKey)) return retailerCache.get(cacheKey);
+
   const base = `/data/${retailerKey}`;
-  const posData = await fetchJSON(`${base}/pos_data.json`);
+  const posData = await loadPosData(base, entry);
   if (!posData) return null;
 
   // Attempt to load supplemental files (may not exist for every retailer)
-  const [inventory, ltoos, forecast, ecommerce] = await Promise.all([
-    fetchJSON(`${base}/inventory.json`),
-    fetchJSON(`${base}/ltoos_history.json`),
-    fetchJSON(`${base}/forecast_data.json`),
-    fetchJSON(`${base}/ecommerce.json`),
+  const optional = fname => (mayHaveFile(entry, fname)
+    ? fetchJSON(fileUrl(base, entry, fname)) : null);
+  const [inventory, ltoos, forecast, ecommerce, rollups] = await Promise.all([
+    optional('inventory.json'),
+    optional('ltoos_history.json'),
+    optional('forecast_data.json'),
+    optional('ecommerce.json'),
+    // Precomputed quarter/YTD rollups, only listed by newer ETL runs
+    entry?.data_files?.includes('rollups.json')
+      ? fetchJSON(fileUrl(base, entry, 'rollups.json')) : null,
   ]);
 
-  return {
+  const data = {
     posData,
     inventory,
     ltoos,
     forecast,
     ecommerce,
+    rollups,
   };
+  if (cacheKey) retailerCache.set(cacheKey, data);
+  return data;
 }
 
 export function clearCache() {
   cache.clear();
+  retailerCache.clear();
 }
@@ -491,6 +491,95 @@ export function getAllQuarterOverview(periods) {
   return result;
 }
 
+// ── Precomputed Rollups (rollups.json) ──────────────────────────────
+// The ETL writes rollups.json with the quarter/YTD aggregates below already
+// computed (etl/rollups.py), so these only reshape lookups into the slice
+// objects the compute* functions return.
+
+function trendFromTotals(monthTotals, periodKeys) {
+  return periodKeys.map(key => {
+    const t = monthTotals[key] || { dollars: 0, units: 0, product_count: 0 };
+    return {
+      period: key,
+      label: `${periodToMonthName(key)} '${key.slice(2, 4)}`,
+      year: key.slice(0, 4),
+      month: key.slice(5, 7),
+      dollars: t.dollars,
+      units: t.units,
+      productCount: t.product_count,
+    };
+  });
+}
+
+/**
+ * computeQuarterlySlice() read from rollups; null if the quarter is missing.
+ */
+export function quarterlySliceFromRollups(rollups, quarterKey) {
+  const q = rollups?.quarters?.[quarterKey];
+  if (!q) return null;
+  const trendKeys = [...q.full_prev_months, ...q.months].sort();
+  return {
+    currentData: q.current,
+    comparisonData: q.comparison,
+    trendData: trendFromTotals(rollups.month_totals, trendKeys),
+    periodLabel: q.period_label,
+    fullPrevYearData: q.full_prev,
+    comparableMonths: q.comparable_months,
+    monthsWithData: q.months_with_data,
+    isComplete: q.is_complete,
+    qepDollars: q.qep_dollars,
+    qepUnits: q.qep_units,
+  };
+}
+
+/**
+ * computeYTDSlice() read from rollups; null if there are none.
+ */
+export function ytdSliceFromRollups(rollups) {
+  const y = rollups?.ytd;
+  if (!y) return null;
+  const { year_a: yearA, year_b: yearB } = rollups;
+  const trendKeys = Object.keys(rollups.month_totals)
+    .filter(k => k.startsWith(yearB) || (yearA !== yearB && k.startsWith(yearA)))
+    .sort();
+  return {
+    currentData: y.current,
+    comparisonData: y.comparison,
+    trendData: trendFromTotals(rollups.month_totals, trendKeys),
+    periodLabel: y.period_label,
+    fullPrevYearData: y.full_prev,
+    comparableMonths: y.comparable_months,
+    monthsWithData: y.months_with_data,
+    isComplete: y.is_complete,
+    yepDollars: y.yep_dollars,
+    yepUnits: y.yep_units,
+    paceDollarsPct: y.pace_dollars_pct,
+    paceUnitsPct: y.pace_units_pct,
+    yearA,
+    yearB,
+  };
+}
+
+/**
+ * getAllQuarterOverview() read from rollups; null if there are none.
+ */
+export function quarterOverviewFromRollups(rollups) {
+  if (!rollups?.quarter_overview) return null;
+  return rollups.quarter_overview.map(row => ({
+    quarter: row.quarter,
+    displayLabel: row.display_label,
+    currentTotal: row.current_total,
+    comparisonTotal: row.comparison_total,
+    qep: row.qep,
+    monthsWithData: row.months_with_data,
+    isComplete: row.is_complete,
+    yoyPct: row.yoy_pct,
+    pacePercent: row.pace_percent,
+    monthCount: row.month_count,
+    productCount: row.product_count,
+  }));
+}
+
 // ── Weekly Period Functions ──────────────────────────────────────────
 
 /**